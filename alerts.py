@@ -0,0 +1,66 @@
+import logging
+import re
+import time
+
+from exceptions import CustomStatusesError
+
+logger = logging.getLogger(__name__)
+
+VOLATILE_PARTS = re.compile(r'0x[0-9a-fA-F]+|\d+')
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип и сообщение без изменчивых чисел."""
+    name = type(error).__name__
+    if isinstance(error, CustomStatusesError):
+        return f'{name}:{error.status_code}'
+    return f'{name}:{VOLATILE_PARTS.sub("#", str(error))}'
+
+
+class Incident:
+    """Серия одинаковых ошибок одной подписки."""
+
+    def __init__(self, fingerprint, started_at):
+        """Начинает серию с первой ошибки."""
+        self.fingerprint = fingerprint
+        self.started_at = started_at
+        self.count = 1
+
+
+class ErrorAggregator:
+    """Схлопывает повторяющиеся сообщения об ошибках.
+
+    Первая ошибка серии отправляется в чат, одинаковые повторы только
+    подсчитываются, а после первого успешного опроса отправляется
+    итог: сколько было сбоев и сколько длилась проблема.
+    """
+
+    def __init__(self, clock=time.time):
+        """Создаёт агрегатор без активных серий."""
+        self.clock = clock
+        self.incidents = {}
+
+    def on_error(self, key, error):
+        """Учитывает ошибку. Возвращает сообщение для чата или None."""
+        error_print = fingerprint(error)
+        incident = self.incidents.get(key)
+        if incident is not None and incident.fingerprint == error_print:
+            incident.count += 1
+            logger.info(
+                f'Ошибка {error_print} повторилась {incident.count} раз, '
+                'сообщение не отправлено'
+            )
+            return None
+        self.incidents[key] = Incident(error_print, self.clock())
+        return f'Сбой в работе программы: {error}'
+
+    def on_success(self, key):
+        """Закрывает серию ошибок. Возвращает итоговое сообщение или None."""
+        incident = self.incidents.pop(key, None)
+        if incident is None:
+            return None
+        minutes = (self.clock() - incident.started_at) / 60
+        return (
+            f'Работа восстановлена после {incident.count} сбоев '
+            f'за {minutes:.0f} мин'
+        )
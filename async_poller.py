@@ -0,0 +1,292 @@
+import asyncio
+import contextvars
+import logging
+import signal
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import checkpoint
+from alerts import ErrorAggregator
+import history
+import homework
+import http_session
+import logs
+import metrics
+import outbox
+import rate_limit
+import retry
+import schema
+import singleflight
+from config import CONFIG
+from exceptions import ApiUnavailableError
+from response_cache import NOT_MODIFIED, ResponseCache
+from scheduler import AdaptiveScheduler
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+ASYNC_CONCURRENCY = CONFIG.async_concurrency
+REQUEST_TIMEOUT = 30
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPoller:
+    """Опрашивает все подписки в одном цикле событий asyncio.
+
+    Если установлен aiohttp, запросы к API Практикума идут через общую
+    aiohttp-сессию, иначе синхронные функции из homework выполняются
+    в пуле потоков цикла событий. Сообщения в Telegram отправляет
+    очередь sender, без неё — send_chat_message в пуле потоков.
+    """
+
+    def __init__(self, subscriptions, bot=None, session=None,
+                 concurrency=ASYNC_CONCURRENCY, checkpoints=False,
+                 scheduler=None, sender=None):
+        """Сохраняет подписки, клиентов и ограничение параллелизма."""
+        self.subscriptions = subscriptions
+        self.scheduler = scheduler or AdaptiveScheduler(
+            base_interval=homework.RETRY_TIME
+        )
+        self.bot = bot
+        self.session = session
+        self.sender = sender
+        self.concurrency = concurrency
+        self.caches = {
+            subscription.key: ResponseCache() for subscription in subscriptions
+        }
+        self.alerts = ErrorAggregator()
+        self.store = None
+        if checkpoints:
+            self.store = homework.open_checkpoints(subscriptions, self.caches)
+            homework.restore_pauses(subscriptions, self.scheduler)
+        self.flights = singleflight.AsyncSingleFlight('practicum')
+        self._semaphore = None
+        self._stop = None
+
+    async def get_api_answer(self, subscription):
+        """Асинхронно запрашивает статусы работ подписки."""
+        cache = self.caches[subscription.key]
+        if self.session is None:
+            # Потоковый ответ нельзя дочитывать в цикле событий.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                contextvars.copy_context().run,
+                homework.request_shared,
+                subscription,
+                cache,
+                False
+            )
+        key = homework.flight_key(subscription, cache)
+        (result, source), shared = await self.flights.do(
+            key, self.request_as_leader, subscription, cache, key[1]
+        )
+        if shared:
+            logger.info('Ответ API получен вместе с другой подпиской аккаунта')
+            cache.adopt(source)
+        return result
+
+    async def request_as_leader(self, subscription, cache, from_date):
+        """Запрос и разбор ответа, результат которых получают все ожидающие.
+        Тело разбирается один раз: ожидающие с тем же ключом получают
+        уже разобранный ответ и кеш, из которого берут валидаторы.
+        """
+        status, headers, body = await retry.call_with_retry_async(
+            self.fetch, subscription, cache, from_date,
+            breaker=retry.PRACTICUM_BREAKER
+        )
+        if cache.is_unchanged(status, body):
+            logger.info('Ответ API не изменился')
+            return NOT_MODIFIED, cache
+        homework.check_status(
+            SimpleNamespace(status_code=status, headers=headers)
+        )
+        result = schema.loads(body)
+        cache.remember(headers)
+        return result, cache
+
+    async def fetch(self, subscription, cache, from_date=None):
+        """Выполняет один запрос к API через aiohttp."""
+        timestamp = from_date or subscription.current_date or int(time.time())
+        await rate_limit.PRACTICUM_BUCKET.acquire_async()
+        started = time.perf_counter()
+        try:
+            async with self.session.get(
+                homework.ENDPOINT,
+                headers={
+                    **subscription.headers, **cache.conditional_headers()
+                },
+                params={'from_date': timestamp}
+            ) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            metrics.API_LATENCY.observe(
+                time.perf_counter() - started, status='error'
+            )
+            raise ApiUnavailableError(f'Ошибка соединения с API: {error!r}')
+        metrics.API_LATENCY.observe(
+            time.perf_counter() - started, status=response.status
+        )
+        if response.status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            homework.check_status(SimpleNamespace(
+                status_code=response.status, headers=response.headers
+            ))
+        return response.status, response.headers, body
+
+    async def send_message(self, chat_id, message):
+        """Отправляет сообщение в Telegram чат через очередь или пул потоков.
+        Сообщения в Telegram не уходят через aiohttp: очередь отправки
+        повторяет их при 429 и сбоях сети и сохраняет в журнал.
+        """
+        if self.sender is not None:
+            self.sender.put(chat_id, message)
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, homework.send_chat_message, self.bot, chat_id, message
+        )
+
+    async def sleep(self, seconds):
+        """Ждёт следующего цикла. Возвращает True, если пришла остановка."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def poll_subscription(self, subscription):
+        """Опрашивает одну подписку и возвращает сообщения для её чата."""
+        async with self._semaphore:
+            if self._stop is not None and self._stop.is_set():
+                return []
+            with logs.log_context(account=subscription.key):
+                return await self.poll_account(subscription)
+
+    async def poll_account(self, subscription):
+        """Запрос и разбор ответа одной подписки с учётом ошибок."""
+        try:
+            response = await self.get_api_answer(subscription)
+            messages = homework.handle_response(
+                subscription, response, self.caches[subscription.key]
+            )
+        except Exception as error:
+            return homework.report_error(subscription, error, self.alerts)
+        return homework.report_success(subscription, messages, self.alerts)
+
+    async def poll_all(self):
+        """Опрашивает подписки, которым пора, и рассылает сообщения."""
+        with logs.log_context(cycle=logs.next_cycle()), \
+                metrics.POLL_CYCLE.time():
+            outgoing = await self.poll_due()
+        if self.sender is not None:
+            homework.send_batch(self.sender, outgoing)
+        else:
+            await asyncio.gather(*(
+                self.send_message(chat_id, text)
+                for chat_id, messages in outgoing.items()
+                for text in outbox.coalesce_messages(messages)
+            ))
+        if self.store is not None:
+            checkpoint.save(self.store, self.subscriptions, self.caches)
+
+    async def poll_due(self):
+        """Опрашивает подписки, которым пора, и собирает сообщения по чатам."""
+        due = set(self.scheduler.due(self.caches))
+        subscriptions = [
+            item for item in self.subscriptions if item.key in due
+        ]
+        results = await asyncio.gather(
+            *(self.poll_subscription(item) for item in subscriptions)
+        )
+        outgoing = {}
+        for subscription, messages in zip(subscriptions, results):
+            self.scheduler.observe(
+                subscription.key, self.caches[subscription.key]
+            )
+            if messages:
+                outgoing.setdefault(subscription.chat_id, []).extend(
+                    messages
+                )
+        return outgoing
+
+    async def run_cycle(self, timeout=homework.SHUTDOWN_TIMEOUT):
+        """Выполняет цикл опроса.
+        При остановке новые запросы не начинаются, а начатые получают
+        timeout секунд на завершение, после чего цикл прерывается.
+        """
+        cycle = asyncio.ensure_future(self.poll_all())
+        stopper = asyncio.ensure_future(self._stop.wait())
+        await asyncio.wait(
+            {cycle, stopper}, return_when=asyncio.FIRST_COMPLETED
+        )
+        stopper.cancel()
+        if not cycle.done():
+            await asyncio.wait({cycle}, timeout=timeout)
+        if not cycle.done():
+            cycle.cancel()
+            logger.info('Цикл опроса прерван остановкой')
+
+    async def run(self):
+        """Основной цикл опроса до вызова stop()."""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stop = asyncio.Event()
+        while not self._stop.is_set():
+            await self.run_cycle()
+            if await self.sleep(self.scheduler.sleep_time()):
+                break
+        if self.store is not None:
+            checkpoint.save(self.store, self.subscriptions, self.caches)
+            self.store.close()
+        logger.info('Асинхронный опрос остановлен')
+
+    def stop(self):
+        """Останавливает опрос на ближайшей точке ожидания."""
+        if self._stop is not None:
+            self._stop.set()
+
+
+async def run_async():
+    """Создаёт клиентов и запускает асинхронный опрос.
+    Сообщения в Telegram всегда уходят через очередь отправки.
+    """
+    import telegram
+
+    bot = telegram.Bot(token=homework.TELEGRAM_TOKEN)
+    sender = outbox.Outbox(bot).start()
+    session = None
+    if aiohttp is None:
+        http_session.configure(pool_size=ASYNC_CONCURRENCY)
+        logger.info('aiohttp не установлен, запросы идут в пуле потоков')
+    else:
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        )
+    poller = AsyncPoller(
+        homework.get_subscriptions(), bot, session, checkpoints=True,
+        sender=sender
+    )
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, poller.stop)
+    history.configure()
+    metrics_server = metrics.start_server()
+    try:
+        await poller.run()
+    finally:
+        metrics.stop_server(metrics_server)
+        if session is not None:
+            await session.close()
+        sender.stop(homework.SHUTDOWN_TIMEOUT)
+        http_session.close()
+        history.close()
+
+
+def main():
+    """Точка входа асинхронного режима."""
+    if not homework.check_tokens():
+        return
+    asyncio.run(run_async())
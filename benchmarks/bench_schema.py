@@ -0,0 +1,108 @@
+"""Сравнение проверки ответа API: цепочка проверок против schema.
+
+Запуск: python benchmarks/bench_schema.py [число работ ...]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import schema  # noqa: E402
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+STATUSES = tuple(homework.HOMEWORK_STATUSES)
+legacy_loads = simplejson.loads if simplejson else json.loads
+
+
+def make_response(size):
+    """Синтетический ответ API с size работами."""
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'status': STATUSES[number % len(STATUSES)],
+                'homework_name': f'student__hw{number:05d}.zip',
+                'reviewer_comment': 'Всё нравится',
+                'date_updated': '2022-01-10T12:00:00Z',
+                'lesson_name': 'Итоговый проект',
+            }
+            for number in range(size)
+        ],
+        'current_date': 1641816000,
+    }
+
+
+def legacy_check_response(response):
+    """check_response до перехода на schema."""
+    if response is None:
+        raise ValueError
+    if not isinstance(response, dict):
+        raise TypeError('Некорректный тип данных response на входе')
+    if 'homeworks' not in response:
+        raise KeyError('Ошибка с ключем homeworks')
+    if not response['homeworks']:
+        return {}
+    homework = response['homeworks']
+    if not isinstance(homework, list):
+        raise TypeError('По ключу homework данные не ввиде списка')
+    return homework
+
+
+def legacy_parse_status(item):
+    """parse_status до перехода на schema."""
+    if 'homework_name' not in item:
+        raise KeyError('Ошибка с ключем homework_name')
+    homework_name = item['homework_name']
+    if 'status' not in item:
+        raise KeyError('Ошибка с ключем status')
+    homework_status = item['status']
+    if homework_status not in homework.HOMEWORK_STATUSES:
+        raise KeyError('Ошибка с ключем homework_status')
+    verdict = homework.HOMEWORK_STATUSES[homework_status]
+    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+
+
+def legacy(body):
+    """Разбор ответа исходными функциями."""
+    response = legacy_loads(body)
+    for item in legacy_check_response(response):
+        legacy_parse_status(item)
+
+
+def fast(body):
+    """Разбор ответа через schema."""
+    records = schema.parse_response(
+        schema.loads(body), homework.HOMEWORK_STATUSES
+    )
+    for record in records:
+        homework.parse_status(record)
+
+
+def bench(size, repeat=5):
+    """Печатает лучшее время обоих вариантов на ответе из size работ."""
+    body = json.dumps(make_response(size)).encode()
+    number = max(1, 20000 // size)
+    results = {}
+    for name, func in (('legacy', legacy), ('schema', fast)):
+        best = min(timeit.repeat(
+            lambda: func(body), number=number, repeat=repeat
+        ))
+        results[name] = best / number
+    print(
+        f'{size:>7} работ: legacy {results["legacy"] * 1000:8.2f} мс, '
+        f'schema {results["schema"] * 1000:8.2f} мс, '
+        f'ускорение x{results["legacy"] / results["schema"]:.2f}'
+    )
+
+
+if __name__ == '__main__':
+    print(f'JSON декодер schema: {schema.loads.__module__}')
+    for size in map(int, sys.argv[1:] or ('10', '1000', '100000')):
+        bench(size)
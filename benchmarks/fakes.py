@@ -0,0 +1,197 @@
+"""Локальные заменители API Практикума и Telegram Bot API для нагрузки.
+
+Оба сервера работают в фоновых потоках, умеют добавлять задержку и
+отвечать ошибкой 500 с заданной вероятностью и записывают время
+изменений и доставки, чтобы считать задержку уведомлений из конца в конец.
+"""
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ('reviewing', 'rejected', 'approved')
+
+
+class FakeServer(ABC):
+    """Общая часть: HTTP сервер в потоке, задержка и доля ошибок."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None):
+        """Настраивает задержку ответа в секундах и долю ответов 500."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def start(self):
+        """Запускает сервер на свободном порту. Возвращает его адрес."""
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                owner.dispatch(self, 'GET')
+
+            def do_POST(self):
+                owner.dispatch(self, 'POST')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def stop(self):
+        """Останавливает сервер."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def dispatch(self, handler, method):
+        """Задержка, случайная ошибка и передача запроса в handle()."""
+        with self.lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            status, answer = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                'ok': False, 'error_code': 500, 'description': 'fake error'
+            }
+        else:
+            status, answer = self.handle(handler, method, body)
+        payload = json.dumps(answer, ensure_ascii=False).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    @abstractmethod
+    def handle(self, handler, method, body):
+        """Ответ на запрос: HTTP статус и JSON."""
+
+
+class FakePracticum(FakeServer):
+    """API статусов домашних работ с изменяемыми работами аккаунтов."""
+
+    def __init__(self, *args, **kwargs):
+        """Создаёт сервер без аккаунтов."""
+        super().__init__(*args, **kwargs)
+        self.accounts = {}
+        self.changed_at = {}
+        self._ids = 0
+
+    def add_account(self, token, homeworks=1):
+        """Добавляет аккаунт с homeworks работами в статусе reviewing."""
+        items = []
+        for _ in range(homeworks):
+            self._ids += 1
+            items.append({
+                'id': self._ids,
+                'homework_name': f'{token}__hw{self._ids}.zip',
+                'status': 'reviewing',
+                'reviewer_comment': '',
+                'lesson_name': f'Спринт {self._ids % 15 + 1}',
+                'date_updated': iso_now(),
+                'updated': int(time.time()),
+            })
+        with self.lock:
+            self.accounts[token] = items
+
+    def change(self, token, index=0):
+        """Меняет статус работы и запоминает момент изменения."""
+        with self.lock:
+            item = self.accounts[token][index]
+            position = STATUSES.index(item['status'])
+            item['status'] = STATUSES[(position + 1) % len(STATUSES)]
+            item['reviewer_comment'] = f'Раунд {position + 1}'
+            item['date_updated'] = iso_now()
+            item['updated'] = int(time.time())
+            self.changed_at[item['homework_name']] = time.perf_counter()
+            return item['homework_name']
+
+    def handle(self, handler, method, body):
+        """Работы аккаунта, изменённые не раньше from_date."""
+        token = handler.headers.get('Authorization', '')[len('OAuth '):]
+        query = parse_qs(urlparse(handler.path).query)
+        from_date = int(query.get('from_date', ['0'])[0])
+        with self.lock:
+            items = self.accounts.get(token)
+            if items is None:
+                return HTTPStatus.UNAUTHORIZED, {'code': 'not_authenticated'}
+            homeworks = [
+                {key: value for key, value in item.items()
+                 if key != 'updated'}
+                for item in reversed(items) if item['updated'] >= from_date
+            ]
+        return HTTPStatus.OK, {
+            'homeworks': homeworks, 'current_date': int(time.time())
+        }
+
+
+class FakeTelegram(FakeServer):
+    """Bot API, который принимает sendMessage и запоминает сообщения."""
+
+    def __init__(self, *args, **kwargs):
+        """Создаёт сервер без сообщений."""
+        super().__init__(*args, **kwargs)
+        self.messages = []
+
+    def bot_url(self, url):
+        """base_url для telegram.Bot."""
+        return f'{url}/bot'
+
+    def handle(self, handler, method, body):
+        """Ответ на sendMessage в формате Bot API."""
+        if not urlparse(handler.path).path.endswith('/sendMessage'):
+            return HTTPStatus.NOT_FOUND, {'ok': False, 'error_code': 404}
+        if handler.headers.get('Content-Type', '').startswith(
+            'application/json'
+        ):
+            data = json.loads(body or b'{}')
+        else:
+            data = {
+                key: values[0]
+                for key, values in parse_qs(body.decode()).items()
+            }
+        received = time.perf_counter()
+        with self.lock:
+            self.messages.append((data['chat_id'], data['text'], received))
+            message_id = len(self.messages)
+        return HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id, 'date': int(time.time()),
+            'chat': {'id': int(data['chat_id']), 'type': 'private'},
+            'text': data['text'],
+        }}
+
+    def delivered_at(self, name, after=0.0):
+        """Момент доставки первого после after сообщения о работе."""
+        with self.lock:
+            for _, text, received in self.messages:
+                if received >= after and f'"{name}"' in text:
+                    return received
+        return None
+
+
+def iso_now():
+    """Текущее время в формате date_updated API."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
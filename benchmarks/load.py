@@ -0,0 +1,198 @@
+"""Нагрузочный прогон цикла main() против локальных API Практикума и Telegram.
+
+Запуск: python benchmarks/load.py --accounts 200 --homeworks 20 --cycles 5
+Задержку и долю ошибок серверов задают --api-latency, --api-errors,
+--telegram-latency, --telegram-errors. По умолчанию лимиты частоты
+запросов сняты, чтобы мерить сам бот; --limits включает их обратно.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telegram  # noqa: E402
+
+import homework  # noqa: E402
+import http_session  # noqa: E402
+import outbox  # noqa: E402
+import rate_limit  # noqa: E402
+from alerts import ErrorAggregator  # noqa: E402
+from benchmarks.fakes import FakePracticum, FakeTelegram  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from scheduler import AdaptiveScheduler  # noqa: E402
+from subscriptions import Subscription  # noqa: E402
+
+API_PATH = '/api/user_api/homework_statuses/'
+UNLIMITED = 1e9
+
+
+@contextmanager
+def unlimited_rates():
+    """Временно снимает общие лимиты частоты запросов."""
+    buckets = (rate_limit.PRACTICUM_BUCKET, rate_limit.TELEGRAM_BUCKET)
+    saved = [(bucket.rate, bucket.capacity) for bucket in buckets]
+    for bucket in buckets:
+        bucket.rate = bucket.capacity = bucket.tokens = UNLIMITED
+    try:
+        yield
+    finally:
+        for bucket, (rate, capacity) in zip(buckets, saved):
+            bucket.rate, bucket.capacity = rate, capacity
+            bucket.tokens = float(capacity)
+
+
+@contextmanager
+def fake_endpoint(url):
+    """Временно направляет запросы бота на заменитель API."""
+    saved = homework.ENDPOINT
+    homework.ENDPOINT = f'{url}{API_PATH}'
+    try:
+        yield
+    finally:
+        homework.ENDPOINT = saved
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу, None для пустого списка."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def wait_drained(sender, timeout):
+    """Ждёт, пока очередь отправки опустеет."""
+    deadline = time.monotonic() + timeout
+    while sender.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def run_load(accounts=100, homeworks=10, cycles=3, changes=0.2,
+             api_latency=0.0, api_errors=0.0, telegram_latency=0.0,
+             telegram_errors=0.0, limits=False, drain_timeout=30, seed=1):
+    """Прогоняет cycles циклов main() и возвращает словарь с замерами."""
+    rand = random.Random(seed)
+    practicum = FakePracticum(api_latency, api_errors, seed)
+    telegram_api = FakeTelegram(telegram_latency, telegram_errors, seed)
+    api_url = practicum.start()
+    bot_url = telegram_api.start()
+    subscriptions = []
+    for number in range(accounts):
+        token = f'token{number}'
+        practicum.add_account(token, homeworks)
+        subscriptions.append(Subscription(token, number + 1, current_date=1))
+    caches = {item.key: ResponseCache() for item in subscriptions}
+    scheduler = AdaptiveScheduler(0, 0, 0, 0)
+    alerts = ErrorAggregator()
+    bot = telegram.Bot('123:fake', base_url=telegram_api.bot_url(bot_url))
+    sender = outbox.Outbox(
+        bot, journal_path=None,
+        per_chat_interval=outbox.PER_CHAT_INTERVAL if limits else 0
+    )
+    rates = nullcontext() if limits else unlimited_rates()
+    http_session.configure()
+    report = {'accounts': accounts, 'homeworks': homeworks}
+    try:
+        with rates, fake_endpoint(api_url):
+            sender.start()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            started = time.perf_counter()
+            homework.run_cycle(subscriptions, caches, scheduler, alerts,
+                               sender)
+            report['history_cycle'] = time.perf_counter() - started
+            wait_drained(sender, drain_timeout)
+            report['memory_per_account'] = (
+                tracemalloc.get_traced_memory()[0] - before
+            ) / accounts
+            tracemalloc.stop()
+            changed = []
+            cycle_times = []
+            for _ in range(cycles):
+                for subscription in rand.sample(
+                    subscriptions, max(int(accounts * changes), 1)
+                ):
+                    name = practicum.change(
+                        subscription.token, rand.randrange(homeworks)
+                    )
+                    changed.append((name, practicum.changed_at[name]))
+                started = time.perf_counter()
+                homework.run_cycle(subscriptions, caches, scheduler, alerts,
+                                   sender)
+                cycle_times.append(time.perf_counter() - started)
+            wait_drained(sender, drain_timeout)
+    finally:
+        sender.stop()
+        http_session.close()
+        practicum.stop()
+        telegram_api.stop()
+    latencies = []
+    for name, changed_at in changed:
+        delivered = telegram_api.delivered_at(name, changed_at)
+        if delivered is not None:
+            latencies.append(delivered - changed_at)
+    report.update({
+        'cycles': cycle_times,
+        'polls_per_second': accounts * cycles / (sum(cycle_times) or 1e-9),
+        'changes': len(changed),
+        'delivered': len(latencies),
+        'latency_p50': percentile(latencies, 0.5),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_max': max(latencies, default=None),
+        'api_requests': practicum.requests,
+        'api_errors': practicum.errors,
+        'telegram_requests': telegram_api.requests,
+        'telegram_errors': telegram_api.errors,
+    })
+    return report
+
+
+def format_seconds(value):
+    """Секунды в миллисекундах для отчёта."""
+    return '—' if value is None else f'{value * 1000:.1f} мс'
+
+
+def main():
+    """Разбирает аргументы, запускает прогон и печатает отчёт."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--homeworks', type=int, default=10)
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--changes', type=float, default=0.2,
+                        help='доля аккаунтов с новым статусом за цикл')
+    parser.add_argument('--api-latency', type=float, default=0.0)
+    parser.add_argument('--api-errors', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.0)
+    parser.add_argument('--telegram-errors', type=float, default=0.0)
+    parser.add_argument('--limits', action='store_true',
+                        help='соблюдать лимиты частоты запросов')
+    args = parser.parse_args()
+    report = run_load(
+        args.accounts, args.homeworks, args.cycles, args.changes,
+        args.api_latency, args.api_errors, args.telegram_latency,
+        args.telegram_errors, args.limits
+    )
+    print(f'Аккаунтов: {report["accounts"]}, '
+          f'работ в аккаунте: {report["homeworks"]}')
+    print(f'Цикл с полной историей: {format_seconds(report["history_cycle"])}')
+    print(f'Память на аккаунт: {report["memory_per_account"] / 1024:.1f} КБ')
+    print('Циклы: ' + ', '.join(map(format_seconds, report['cycles'])))
+    print(f'Опросов в секунду: {report["polls_per_second"]:.0f}')
+    print(f'Доставлено изменений: {report["delivered"]} '
+          f'из {report["changes"]}')
+    print(f'Задержка уведомления p50 {format_seconds(report["latency_p50"])},'
+          f' p95 {format_seconds(report["latency_p95"])},'
+          f' максимум {format_seconds(report["latency_max"])}')
+    print(f'Запросов к API: {report["api_requests"]} '
+          f'(ошибок {report["api_errors"]}), к Telegram: '
+          f'{report["telegram_requests"]} '
+          f'(ошибок {report["telegram_errors"]})')
+
+
+if __name__ == '__main__':
+    main()
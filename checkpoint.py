@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+
+from config import CONFIG
+from subscriptions import SQLITE_SUFFIXES
+
+CHECKPOINT_INTERVAL = CONFIG.checkpoint_interval
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore(ABC):
+    """Хранилище состояния подписок: current_date и отправленные статусы.
+
+    Изменения копятся в памяти и пишутся на диск одной пачкой не чаще,
+    чем раз в flush_interval секунд, чтобы стоимость записи не росла
+    с числом отслеживаемых аккаунтов.
+    """
+
+    def __init__(self, path, flush_interval=CHECKPOINT_INTERVAL):
+        """Открывает хранилище и читает сохранённое состояние."""
+        self.path = path
+        self.flush_interval = flush_interval
+        self.states = self._read()
+        self.dirty = set()
+        self.flushed_at = time.monotonic()
+
+    def get(self, key):
+        """Возвращает сохранённое состояние подписки или None."""
+        return self.states.get(key)
+
+    def update(self, key, state):
+        """Обновляет состояние подписки, если оно изменилось."""
+        if self.states.get(key) != state:
+            self.states[key] = state
+            self.dirty.add(key)
+
+    def flush(self, force=False):
+        """Записывает изменения, если подошёл интервал или force=True."""
+        if not self.dirty:
+            return False
+        if not force and (
+            time.monotonic() - self.flushed_at < self.flush_interval
+        ):
+            return False
+        self._write({key: self.states[key] for key in self.dirty})
+        logger.info(f'Сохранено состояние подписок: {len(self.dirty)}')
+        self.dirty.clear()
+        self.flushed_at = time.monotonic()
+        return True
+
+    def close(self):
+        """Сохраняет все изменения."""
+        self.flush(force=True)
+
+    @abstractmethod
+    def _read(self):
+        """Читает сохранённые состояния подписок по ключам."""
+
+    @abstractmethod
+    def _write(self, changed):
+        """Записывает изменённые состояния подписок."""
+
+
+class JsonCheckpointStore(CheckpointStore):
+    """Состояние в JSON-файле, заменяемом атомарным переименованием."""
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def _write(self, changed):
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.states, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """Состояние в базе SQLite в режиме WAL."""
+
+    def __init__(self, path, flush_interval=CHECKPOINT_INTERVAL):
+        """Открывает базу и создаёт таблицу checkpoints."""
+        import sqlite3
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints '
+            '(key TEXT PRIMARY KEY, state TEXT NOT NULL)'
+        )
+        super().__init__(path, flush_interval)
+
+    def _read(self):
+        rows = self.connection.execute('SELECT key, state FROM checkpoints')
+        return {key: json.loads(state) for key, state in rows}
+
+    def _write(self, changed):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO checkpoints (key, state) '
+                'VALUES (?, ?)',
+                [
+                    (key, json.dumps(state, ensure_ascii=False))
+                    for key, state in changed.items()
+                ]
+            )
+
+    def close(self):
+        """Сохраняет изменения и закрывает базу."""
+        super().close()
+        self.connection.close()
+
+
+def open_checkpoint_store(path, flush_interval=CHECKPOINT_INTERVAL):
+    """Открывает хранилище состояния по расширению файла."""
+    if str(path).endswith(SQLITE_SUFFIXES):
+        return SqliteCheckpointStore(path, flush_interval)
+    return JsonCheckpointStore(path, flush_interval)
+
+
+def restore(store, subscriptions, caches):
+    """Восстанавливает current_date, отправленные статусы и паузу."""
+    restored = 0
+    for subscription in subscriptions:
+        state = store.get(subscription.key)
+        if state is None:
+            continue
+        subscription.current_date = state['current_date']
+        caches[subscription.key].seen = {
+            key: (status, date_updated)
+            for key, status, date_updated in state['seen']
+        }
+        subscription.paused = state.get('paused', False)
+        restored += 1
+    logger.info(f'Восстановлено состояние подписок: {restored}')
+
+
+def save(store, subscriptions, caches):
+    """Запоминает состояние подписок после цикла и сбрасывает на диск."""
+    for subscription in subscriptions:
+        seen = caches[subscription.key].seen
+        store.update(subscription.key, {
+            'current_date': subscription.current_date,
+            'seen': [
+                [key, status, date_updated]
+                for key, (status, date_updated) in seen.items()
+            ],
+            'paused': subscription.paused,
+        })
+    store.flush()
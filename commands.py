@@ -0,0 +1,176 @@
+"""Команды бота в чате Telegram: /status, /history, /pause и /resume.
+
+Слушатель забирает обновления long-polling запросом getUpdates в своём
+потоке, параллельно с опросом API Практикума, и отвечает из кешей
+ответов и журнала статусов, не обращаясь к API. Поэтому ответ на
+команду не ждёт ни цикла опроса, ни очереди уведомлений.
+"""
+import logging
+import threading
+import time
+
+import history
+import homework
+import metrics
+from config import CONFIG
+from retry import Backoff
+
+TELEGRAM_COMMANDS = CONFIG.telegram_commands
+COMMAND_POLL_TIMEOUT = CONFIG.command_poll_timeout
+DATE_FORMAT = '%d.%m.%Y %H:%M UTC'
+HELP = (
+    'Команды бота:\n'
+    '/status — последний статус работы\n'
+    '/history — статистика проверок\n'
+    '/pause — приостановить уведомления\n'
+    '/resume — возобновить уведомления'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_command(text):
+    """Команда из текста сообщения без @имени бота или None."""
+    words = (text or '').split()
+    if not words or not words[0].startswith('/'):
+        return None
+    return words[0].split('@', 1)[0].lower()
+
+
+class CommandListener:
+    """Отвечает на команды из чатов подписок.
+
+    Команды из чатов без подписки игнорируются. Если чат следит за
+    несколькими аккаунтами, ответ собирается по каждому из них.
+    """
+
+    def __init__(self, bot, subscriptions, caches, scheduler,
+                 poll_timeout=COMMAND_POLL_TIMEOUT, backoff=None):
+        """Запоминает подписки по чатам, их кеши и планировщик опроса."""
+        self.bot = bot
+        self.chats = {}
+        for subscription in subscriptions:
+            self.chats.setdefault(str(subscription.chat_id), []).append(
+                subscription
+            )
+        self.caches = caches
+        self.scheduler = scheduler
+        self.poll_timeout = poll_timeout
+        self.backoff = backoff or Backoff()
+        self.offset = None
+        self.handlers = {
+            '/status': self.status,
+            '/history': self.history,
+            '/pause': self.pause,
+            '/resume': self.resume,
+        }
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Запускает поток получения обновлений."""
+        self._thread = threading.Thread(
+            target=self.run, name='commands', daemon=True
+        )
+        self._thread.start()
+        logger.info(f'Команды бота включены, чатов: {len(self.chats)}')
+
+    def stop(self, timeout=None):
+        """Останавливает поток, не дожидаясь конца запроса getUpdates."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """Получает обновления и отвечает на команды до stop()."""
+        from telegram.error import TelegramError
+
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                updates = self.bot.get_updates(
+                    offset=self.offset, timeout=self.poll_timeout,
+                    allowed_updates=['message']
+                )
+            except TelegramError as error:
+                delay = self.backoff.delay(failures)
+                failures += 1
+                logger.error(
+                    f'Не удалось получить команды: {error}, '
+                    f'повтор через {delay:.1f} с'
+                )
+                self._stop.wait(delay)
+                continue
+            failures = 0
+            for update in updates:
+                self.offset = update.update_id + 1
+                if not self._stop.is_set():
+                    self.dispatch(update)
+
+    def dispatch(self, update):
+        """Отвечает на сообщение из обновления, если это команда."""
+        message = update.effective_message
+        if message is None:
+            return
+        reply = self.reply(message.chat_id, message.text)
+        if reply is not None:
+            homework.send_chat_message(self.bot, message.chat_id, reply)
+
+    def reply(self, chat_id, text):
+        """Текст ответа на команду или None, если отвечать не нужно."""
+        command = parse_command(text)
+        subscriptions = self.chats.get(str(chat_id))
+        if command is None or not subscriptions:
+            return None
+        handler = self.handlers.get(command)
+        started = time.perf_counter()
+        if handler is None:
+            answer = HELP
+        else:
+            answer = '\n\n'.join(
+                handler(subscription) for subscription in subscriptions
+            )
+        logger.info(f'Команда {command} из чата {chat_id}')
+        metrics.COMMAND_LATENCY.observe(
+            time.perf_counter() - started,
+            command=command if handler is not None else 'help'
+        )
+        return answer
+
+    def status(self, subscription):
+        """Последний известный статус работы без запроса к API."""
+        cache = self.caches.get(subscription.key)
+        last = cache.last_homework if cache is not None else None
+        if last is not None:
+            text = homework.MESSAGE_TEMPLATES.render(
+                last, subscription.locale
+            )
+            answer = f'Последний статус:\n{text}'
+        else:
+            latest = history.latest(subscription.account)
+            if latest is None:
+                answer = 'Статус работы ещё не получен.'
+            else:
+                name, status, updated_at = latest
+                verdict = homework.HOMEWORK_STATUSES.get(status, status)
+                date = time.strftime(DATE_FORMAT, time.gmtime(updated_at))
+                answer = f'Последний статус «{name}» на {date}:\n{verdict}'
+        if subscription.paused:
+            answer += '\nУведомления приостановлены, /resume — возобновить.'
+        return answer
+
+    def history(self, subscription):
+        """Статистика проверок аккаунта из журнала статусов."""
+        return history.stats_message(subscription.account)
+
+    def pause(self, subscription):
+        """Приостанавливает опрос и уведомления подписки."""
+        subscription.paused = True
+        self.scheduler.pause(subscription.key)
+        return 'Уведомления приостановлены. /resume — возобновить.'
+
+    def resume(self, subscription):
+        """Возобновляет опрос подписки с сохранённой даты."""
+        subscription.paused = False
+        self.scheduler.resume(subscription.key)
+        return 'Уведомления возобновлены.'
@@ -0,0 +1,137 @@
+import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+def parse_flag(value):
+    """Флаг включён значением 1."""
+    return value == '1'
+
+
+def parse_optional_int(value):
+    """Целое число или None для пустого значения."""
+    return int(value) if value else None
+
+
+def parse_nodes(value):
+    """Номера шардов через запятую."""
+    return tuple(int(node) for node in value.split(',') if node)
+
+
+PARSERS = {
+    'shard': parse_optional_int,
+    'shard_nodes': parse_nodes,
+    'log_queue': lambda value: value != '0',
+}
+FALLBACKS = {'webhook_port': 'PORT'}
+
+
+@dataclass(frozen=True)
+class Config:
+    """Настройки бота из окружения, прочитанные один раз при запуске.
+
+    Каждое поле читается из переменной окружения с тем же именем
+    в верхнем регистре. Модули берут свои настройки из CONFIG при
+    импорте, поэтому .env загружается раньше, чем их читает любой
+    модуль, в каком бы порядке модули ни импортировались.
+    """
+
+    practicum_token: Optional[str] = None
+    telegram_token: Optional[str] = None
+    telegram_chat_id: Optional[str] = None
+    subscriptions_file: Optional[str] = None
+    poll_mode: str = 'sync'
+    checkpoint_file: Optional[str] = None
+    checkpoint_interval: float = 60.0
+    message_templates_file: Optional[str] = None
+    default_locale: str = 'ru'
+    shutdown_timeout: float = 20.0
+    stream_after: int = 7 * 24 * 60 * 60
+    notification_limit: int = 20
+    history_file: Optional[str] = None
+    # Опрос API и соединения
+    http_pool_size: int = 10
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 30.0
+    http2: bool = False
+    async_concurrency: int = 100
+    poll_threads: int = 8
+    cycle_deadline: float = 30.0
+    singleflight_bucket: int = 60
+    min_poll_interval: float = 60.0
+    max_poll_interval: float = 3600.0
+    poll_jitter: float = 0.1
+    # Лимиты, повторы и предохранитель
+    practicum_rate: float = 10.0
+    practicum_burst: int = 20
+    telegram_rate: float = 30.0
+    telegram_burst: int = 30
+    retry_attempts: int = 3
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    breaker_threshold: int = 5
+    breaker_reset: float = 60.0
+    # Очередь сообщений и команды
+    outbox_capacity: int = 10000
+    outbox_journal: Optional[str] = None
+    per_chat_interval: float = 1.0
+    telegram_commands: bool = False
+    command_poll_timeout: int = 30
+    # Логирование и метрики
+    log_file: str = 'myapp.log'
+    log_format: str = 'text'
+    log_level: str = 'INFO'
+    log_queue: bool = True
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_rotate_when: Optional[str] = None
+    log_backups: int = 5
+    log_sample_limit: int = 10
+    log_sample_window: float = 60.0
+    metrics_host: str = '127.0.0.1'
+    metrics_port: Optional[str] = None
+    # Режимы webhook и shards
+    webhook_host: str = '127.0.0.1'
+    webhook_port: int = 8080
+    webhook_secret: Optional[str] = None
+    shard: Optional[int] = None
+    shard_nodes: Tuple[int, ...] = ()
+    shards: int = os.cpu_count() or 1
+    ring_replicas: int = 64
+    shard_poll_mode: str = 'sync'
+    shard_stop_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """Собирает настройки из переменных окружения."""
+        values = {}
+        for item in fields(cls):
+            value = environ.get(item.name.upper())
+            if value is None and item.name in FALLBACKS:
+                value = environ.get(FALLBACKS[item.name])
+            if value is not None:
+                values[item.name] = parser(item)(value)
+        return cls(**values)
+
+
+def parser(item):
+    """Функция, переводящая строку окружения в значение поля item."""
+    if item.name in PARSERS:
+        return PARSERS[item.name]
+    if isinstance(item.default, bool):
+        return parse_flag
+    if item.default is None:
+        return str
+    return type(item.default)
+
+
+@lru_cache(maxsize=None)
+def load():
+    """Читает .env и окружение один раз за процесс."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Config.from_env()
+
+
+CONFIG = load()
@@ -4,10 +4,11 @@ class CustomStatusesError(Exception):
     def __init__(self, homework_statuses):
         """Обработка homework_statuses."""
         self.homework_statuses = homework_statuses
-        super().__init__(homework_statuses)
-        return (
-            f'Статус код не 200!.'
-            f'Статус код {homework_statuses.status_code}.'
+        self.status_code = getattr(
+            homework_statuses, 'status_code', homework_statuses
+        )
+        super().__init__(
+            f'Статус код не 200! Статус код {self.status_code}.'
         )
 
 
@@ -17,3 +18,33 @@ class ResponseIsNone(Exception):
     def __init__(self, message='Пустой ответный запрос'):
         """Функция вывода сообщения ошибки."""
         super().__init__(message)
+
+
+class TooManyRequestsError(CustomStatusesError):
+    """Сервис ограничил частоту запросов. Статус код 429."""
+
+    def __init__(self, homework_statuses, retry_after):
+        """Сохраняет рекомендованную паузу из Retry-After."""
+        super().__init__(homework_statuses)
+        self.retry_after = retry_after
+
+
+class ApiUnavailableError(Exception):
+    """Сервис недоступен: таймаут, обрыв соединения или редиректы."""
+
+    def __init__(self, message='Сервис недоступен'):
+        """Функция вывода сообщения ошибки."""
+        super().__init__(message)
+
+
+class CircuitOpenError(Exception):
+    """Запросы к сервису временно отключены после серии сбоев."""
+
+    def __init__(self, name, retry_in):
+        """Сохраняет имя сервиса и время до пробного запроса."""
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(
+            f'Запросы к {name} приостановлены после серии сбоев, '
+            f'повтор через {retry_in:.0f} с'
+        )
@@ -0,0 +1,280 @@
+import calendar
+import logging
+import threading
+import time
+
+from config import CONFIG
+
+HISTORY_FILE = CONFIG.history_file
+HISTORY_BATCH = 500
+REVIEWING = 'reviewing'
+VERDICTS = ('approved', 'rejected')
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+logger = logging.getLogger(__name__)
+
+_store = None
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS events ('
+    'id INTEGER PRIMARY KEY, account TEXT NOT NULL, '
+    'homework_name TEXT NOT NULL, status TEXT NOT NULL, '
+    'updated_at INTEGER NOT NULL, lesson_name TEXT, '
+    'recorded_at INTEGER NOT NULL, '
+    'UNIQUE (account, homework_name, status, updated_at))',
+    'CREATE INDEX IF NOT EXISTS events_homework ON events (homework_name)',
+    'CREATE INDEX IF NOT EXISTS events_time ON events (updated_at)',
+    'CREATE TABLE IF NOT EXISTS reviews ('
+    'account TEXT NOT NULL, homework_name TEXT NOT NULL, '
+    'started_at INTEGER NOT NULL, finished_at INTEGER NOT NULL, '
+    'duration INTEGER NOT NULL, verdict TEXT NOT NULL, '
+    'PRIMARY KEY (account, homework_name, finished_at)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS reviews_duration ON reviews (duration)',
+    'CREATE INDEX IF NOT EXISTS reviews_account '
+    'ON reviews (account, duration)',
+    'CREATE INDEX IF NOT EXISTS reviews_time ON reviews (finished_at)',
+)
+
+
+def parse_date(value, default):
+    """Переводит date_updated API в секунды Unix, при ошибке — default."""
+    try:
+        return calendar.timegm(time.strptime(value, DATE_FORMAT))
+    except (TypeError, ValueError):
+        return default
+
+
+class HistoryStore:
+    """Журнал статусов работ в SQLite: записи только добавляются.
+
+    Один и тот же статус работы с той же датой записывается один раз,
+    сколько бы чатов ни следили за аккаунтом и сколько бы раз API его
+    ни вернул. Каждый вердикт после «взята на проверку» дополнительно
+    попадает в таблицу reviews с длительностью проверки, поэтому
+    перцентили считаются по индексу без обхода всего журнала.
+    """
+
+    def __init__(self, path):
+        """Открывает базу в режиме WAL и создаёт таблицы и индексы."""
+        import sqlite3
+
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        self._lock = threading.Lock()
+
+    def record(self, account, homeworks, now=None):
+        """Добавляет статусы работ аккаунта. Возвращает число новых."""
+        now = int(time.time() if now is None else now)
+        added = 0
+        with self._lock, self.connection:
+            for homework in homeworks:
+                updated_at = parse_date(homework.date_updated, now)
+                cursor = self.connection.execute(
+                    'INSERT OR IGNORE INTO events (account, homework_name, '
+                    'status, updated_at, lesson_name, recorded_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (account, homework.homework_name, homework.status,
+                     updated_at, homework.lesson_name, now)
+                )
+                if not cursor.rowcount:
+                    continue
+                added += 1
+                if homework.status in VERDICTS:
+                    self._add_review(
+                        account, homework.homework_name, homework.status,
+                        updated_at
+                    )
+        return added
+
+    def _add_review(self, account, name, verdict, finished_at):
+        started_at, = self.connection.execute(
+            'SELECT MAX(updated_at) FROM events WHERE account = ? '
+            'AND homework_name = ? AND status = ? AND updated_at <= ?',
+            (account, name, REVIEWING, finished_at)
+        ).fetchone()
+        if started_at is None:
+            return
+        self.connection.execute(
+            'INSERT OR IGNORE INTO reviews (account, homework_name, '
+            'started_at, finished_at, duration, verdict) '
+            'SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS ('
+            'SELECT 1 FROM reviews WHERE account = ? AND homework_name = ? '
+            'AND finished_at >= ? AND finished_at < ?)',
+            (account, name, started_at, finished_at,
+             finished_at - started_at, verdict,
+             account, name, started_at, finished_at)
+        )
+
+    def tap(self, account, homeworks):
+        """Пропускает работы дальше и пачками записывает их в журнал."""
+        batch = []
+        for homework in homeworks:
+            batch.append(homework)
+            if len(batch) >= HISTORY_BATCH:
+                self.record(account, batch)
+                batch = []
+            yield homework
+        if batch:
+            self.record(account, batch)
+
+    def events(self, account, homework_name=None):
+        """Статусы работ аккаунта по времени: (работа, статус, время)."""
+        query = (
+            'SELECT homework_name, status, updated_at FROM events '
+            'WHERE account = ?'
+        )
+        params = [account]
+        if homework_name is not None:
+            query += ' AND homework_name = ?'
+            params.append(homework_name)
+        query += ' ORDER BY updated_at, id'
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def latest(self, account):
+        """Последний статус аккаунта: (работа, статус, время) или None."""
+        with self._lock:
+            return self.connection.execute(
+                'SELECT homework_name, status, updated_at FROM events '
+                'WHERE account = ? ORDER BY updated_at DESC, id DESC LIMIT 1',
+                (account,)
+            ).fetchone()
+
+    def first_review_times(self, account):
+        """Секунды от первого статуса работы до первого вердикта."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT homework_name, MIN(updated_at), '
+                'MIN(CASE WHEN status IN (?, ?) THEN updated_at END) '
+                'FROM events WHERE account = ? GROUP BY homework_name',
+                (*VERDICTS, account)
+            ).fetchall()
+        return {
+            name: verdict_at - first_at
+            for name, first_at, verdict_at in rows if verdict_at is not None
+        }
+
+    def review_rounds(self, account):
+        """Число вердиктов ревьюера по каждой работе аккаунта."""
+        with self._lock:
+            return dict(self.connection.execute(
+                'SELECT homework_name, COUNT(*) FROM events '
+                'WHERE account = ? AND status IN (?, ?) '
+                'GROUP BY homework_name',
+                (account, *VERDICTS)
+            ))
+
+    def turnaround_percentiles(self, fractions=(0.5, 0.9), account=None,
+                               since=None):
+        """Перцентили времени проверки ревьюером в секундах.
+
+        Без account считаются по всем аккаунтам, since ограничивает
+        проверки, закончившиеся не раньше этого момента. Возвращает
+        словарь {доля: секунды}, пустой, если проверок нет.
+        """
+        conditions, params = [], []
+        if account is not None:
+            conditions.append('account = ?')
+            params.append(account)
+        if since is not None:
+            conditions.append('finished_at >= ?')
+            params.append(int(since))
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self._lock:
+            count, = self.connection.execute(
+                f'SELECT COUNT(*) FROM reviews{where}', params
+            ).fetchone()
+            if not count:
+                return {}
+            return {
+                fraction: self.connection.execute(
+                    f'SELECT duration FROM reviews{where} '
+                    'ORDER BY duration LIMIT 1 OFFSET ?',
+                    (*params, min(int(fraction * count), count - 1))
+                ).fetchone()[0]
+                for fraction in fractions
+            }
+
+    def close(self):
+        """Закрывает базу."""
+        with self._lock:
+            self.connection.close()
+
+
+def configure(path=HISTORY_FILE):
+    """Открывает журнал статусов. Без пути журнал не ведётся."""
+    global _store
+    if path is None:
+        return None
+    _store = HistoryStore(path)
+    logger.info(f'Журнал статусов: {path}')
+    return _store
+
+
+def close():
+    """Закрывает журнал статусов."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def tap(account, homeworks):
+    """Записывает работы из ответа в журнал, если он открыт."""
+    if _store is None:
+        return homeworks
+    return _store.tap(account, homeworks)
+
+
+def latest(account):
+    """Последний статус аккаунта из журнала, если он открыт."""
+    if _store is None:
+        return None
+    return _store.latest(account)
+
+
+def format_duration(seconds):
+    """Длительность для сообщения: дни, часы и минуты."""
+    minutes = int(seconds) // 60
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f'{days} дн {hours} ч'
+    if hours:
+        return f'{hours} ч {minutes} мин'
+    return f'{minutes} мин'
+
+
+def stats_message(account, history=None):
+    """Текст ответа на команду /history для аккаунта."""
+    history = history or _store
+    if history is None:
+        return 'Журнал статусов не ведётся.'
+    first_reviews = history.first_review_times(account)
+    rounds = history.review_rounds(account)
+    if not rounds:
+        return 'История статусов пока пуста.'
+    lines = [f'Работ с вердиктом ревьюера: {len(rounds)}']
+    if first_reviews:
+        average = sum(first_reviews.values()) / len(first_reviews)
+        lines.append(
+            f'Первый вердикт в среднем через {format_duration(average)}'
+        )
+    most = max(rounds, key=rounds.get)
+    lines.append(
+        f'Раундов ревью в среднем {sum(rounds.values()) / len(rounds):.1f},'
+        f' больше всего {rounds[most]} ({most})'
+    )
+    turnaround = history.turnaround_percentiles((0.5, 0.9), account)
+    if turnaround:
+        lines.append(
+            f'Проверка ревьюером: медиана '
+            f'{format_duration(turnaround[0.5])}, 90% — не дольше '
+            f'{format_duration(turnaround[0.9])}'
+        )
+    return '\n'.join(lines)
@@ -1,22 +1,49 @@
 import logging
-import os
+import signal
+import threading
 import time
-
-import requests
-import telegram
-from telegram import TelegramError
-from dotenv import load_dotenv
-from simplejson.errors import JSONDecodeError
-from exceptions import CustomStatusesError, ResponseIsNone
 from http import HTTPStatus
 
-load_dotenv()
+from config import CONFIG
+from alerts import ErrorAggregator
+import checkpoint
+import history
+import http_session
+import logs
+import metrics
+import outbox
+import rate_limit
+import retry
+import schema
+import singleflight
+import streaming
+import templates
+from exceptions import (
+    ApiUnavailableError, CircuitOpenError, CustomStatusesError,
+    TooManyRequestsError
+)
+from response_cache import NOT_MODIFIED, ResponseCache
+from scheduler import AdaptiveScheduler
+from schema import Homework
+from streaming import HomeworkStream
+from subscriptions import Subscription, load_subscriptions
 
-PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
-TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+PRACTICUM_TOKEN = CONFIG.practicum_token
+TELEGRAM_TOKEN = CONFIG.telegram_token
+TELEGRAM_CHAT_ID = CONFIG.telegram_chat_id
+SUBSCRIPTIONS_FILE = CONFIG.subscriptions_file
+POLL_MODE = CONFIG.poll_mode
+CHECKPOINT_FILE = CONFIG.checkpoint_file
+MESSAGE_TEMPLATES_FILE = CONFIG.message_templates_file
+DEFAULT_LOCALE = CONFIG.default_locale
+SHUTDOWN_TIMEOUT = CONFIG.shutdown_timeout
+STREAM_AFTER = CONFIG.stream_after
+NOTIFICATION_LIMIT = CONFIG.notification_limit
+SHARD = CONFIG.shard
+SHARD_NODES = CONFIG.shard_nodes
 
 RETRY_TIME = 600
+COMMANDS_STOP_TIMEOUT = 1
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -26,12 +53,10 @@ HOMEWORK_STATUSES = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
-PAST_MESSAGE = ''
-
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO,
-    filename='myapp.log'
+MESSAGE_TEMPLATES = templates.TemplateRegistry(
+    templates.load_templates(MESSAGE_TEMPLATES_FILE),
+    HOMEWORK_STATUSES,
+    DEFAULT_LOCALE
 )
 
 logger = logging.getLogger(__name__)
@@ -39,91 +64,240 @@ logger = logging.getLogger(__name__)
 
 def send_message(bot, message):
     """Отправляет сообщение в Telegram чат."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def is_telegram_transient(error):
+    """Сбой Telegram, который имеет смысл повторить: ошибка сети.
+    BadRequest в python-telegram-bot наследует NetworkError, но это
+    постоянная ошибка запроса: повтор не поможет, а размыкатель цепи
+    не должен считать её сбоем Telegram.
+    """
+    from telegram.error import BadRequest, NetworkError
+
+    return isinstance(error, NetworkError) and not isinstance(
+        error, BadRequest
+    )
+
+
+def deliver_message(bot, chat_id, message):
+    """Отправляет сообщение с учётом общего лимита Telegram."""
+    rate_limit.TELEGRAM_BUCKET.acquire()
+    with metrics.TELEGRAM_LATENCY.time():
+        bot.send_message(chat_id, message)
+
+
+def send_chat_message(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram чат."""
+    from telegram.error import RetryAfter, TelegramError
+
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-    except TelegramError:
+        retry.call_with_retry(
+            deliver_message, bot, chat_id, message,
+            breaker=retry.TELEGRAM_BREAKER,
+            is_retryable=is_telegram_transient
+        )
+    except RetryAfter as error:
+        rate_limit.TELEGRAM_BUCKET.defer(error.retry_after)
+        logger.error(
+            f'Telegram ограничил частоту, сообщение в чат id {chat_id} '
+            'не отправлено'
+        )
+    except (TelegramError, CircuitOpenError):
         logger.error(
-            f'Невозможно отправить сообщение в чат id {TELEGRAM_CHAT_ID}'
+            f'Невозможно отправить сообщение в чат id {chat_id}'
         )
         return
 
 
 def get_api_answer(current_timestamp):
     """Делает запрос к единственному эндпоинту API-сервиса."""
-    timestamp = current_timestamp or int(time.time())
-    params = {'from_date': timestamp}
+    return request_homework_statuses(HEADERS, current_timestamp)
+
+
+def timed_request(request, headers, params):
+    """Выполняет запрос и учитывает его время в метриках."""
+    started = time.perf_counter()
+    status = 'error'
     try:
-        homework_statuses = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params=params
+        response = request(ENDPOINT, headers=headers, params=params)
+        status = int(response.status_code)
+        return response
+    finally:
+        metrics.API_LATENCY.observe(
+            time.perf_counter() - started, status=status
         )
-    except requests.exceptions.Timeout:
+
+
+def send_api_request(headers, params, stream=False):
+    """Выполняет запрос к эндпоинту API.
+    Сетевые сбои и ошибки 5xx выбрасываются исключениями для повтора.
+    С stream=True тело ответа не читается заранее.
+    """
+    import requests
+
+    rate_limit.PRACTICUM_BUCKET.acquire()
+    request = http_session.stream if stream else http_session.get
+    timeouts, redirects, failures = http_session.client_errors()
+    try:
+        homework_statuses = timed_request(request, headers, params)
+    except (requests.exceptions.Timeout, *timeouts) as error:
         logger.error('Превышено время ожидания. Сайт не отвечает.')
-        return
-    except requests.exceptions.TooManyRedirects:
+        raise ApiUnavailableError(f'Превышено время ожидания: {error}')
+    except (requests.exceptions.TooManyRedirects, *redirects) as error:
         logger.error('Некорректный url адрес. Попробуйте другой.')
-        return
-    except requests.exceptions.RequestException as e:
-        logger.error('Критическая ошибка. Работа прекращена.')
-        raise SystemExit(e)
-    if homework_statuses.status_code != HTTPStatus.OK:
-        logger.error(f'Ошибка {homework_statuses.status_code}')
-        raise CustomStatusesError
+        raise ApiUnavailableError(f'Некорректный url адрес: {error}')
+    except (requests.exceptions.RequestException, *failures) as error:
+        logger.error('Ошибка соединения с API.')
+        raise ApiUnavailableError(f'Ошибка соединения с API: {error}')
+    if homework_statuses.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        try:
+            check_status(homework_statuses)
+        finally:
+            homework_statuses.close()
+    return homework_statuses
+
+
+def check_status(homework_statuses):
+    """Проверяет HTTP статус ответа API и учитывает Retry-After."""
+    status_code = homework_statuses.status_code
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        retry_after = rate_limit.parse_retry_after(
+            homework_statuses.headers.get('Retry-After')
+        )
+        rate_limit.PRACTICUM_BUCKET.defer(retry_after)
+        logger.error(f'Ошибка {status_code}, повтор через {retry_after} с')
+        raise TooManyRequestsError(homework_statuses, retry_after)
+    if status_code != HTTPStatus.OK:
+        logger.error(f'Ошибка {status_code}')
+        raise CustomStatusesError(homework_statuses)
+
+
+def is_history_request(timestamp):
+    """Проверяет, что запрос охватывает длинную историю работ."""
+    return time.time() - timestamp > STREAM_AFTER
+
+
+def open_stream(homework_statuses, cache=None):
+    """Начинает потоковый разбор ответа API с длинной историей."""
+    status_code = homework_statuses.status_code
+    if cache is not None and status_code == HTTPStatus.NOT_MODIFIED:
+        homework_statuses.close()
+        logger.info('Ответ API не изменился')
+        return NOT_MODIFIED
     try:
-        response = homework_statuses.json()
-        return response
-    except JSONDecodeError:
+        check_status(homework_statuses)
+    except CustomStatusesError:
+        homework_statuses.close()
+        raise
+    if cache is not None:
+        cache.pending_digest = None
+    logger.info('Ответ API разбирается потоково')
+    return HomeworkStream(
+        streaming.iter_chunks(homework_statuses),
+        close=homework_statuses.close,
+        headers=homework_statuses.headers
+    )
+
+
+def request_homework_statuses(headers, current_timestamp, cache=None,
+                              stream=None):
+    """Запрашивает статусы работ с заголовками конкретного аккаунта.
+    С кешем делает условный запрос и возвращает NOT_MODIFIED,
+    если ответ не изменился. Ответ с историей старше STREAM_AFTER
+    возвращается как HomeworkStream и разбирается по мере чтения.
+    """
+    timestamp = current_timestamp or int(time.time())
+    params = {'from_date': timestamp}
+    if stream is None:
+        stream = is_history_request(timestamp)
+    if cache is not None:
+        headers = {**headers, **cache.conditional_headers()}
+    homework_statuses = retry.call_with_retry(
+        send_api_request, headers, params, stream,
+        breaker=retry.PRACTICUM_BREAKER
+    )
+    if stream:
+        return open_stream(homework_statuses, cache)
+    if cache is not None and cache.is_unchanged(
+        homework_statuses.status_code, homework_statuses.content
+    ):
+        logger.info('Ответ API не изменился')
+        return NOT_MODIFIED
+    check_status(homework_statuses)
+    try:
+        response = schema.decode(homework_statuses)
+    except ValueError:
         logger.error('Ответ не преобразуется в json')
         return
+    if cache is not None:
+        cache.remember(homework_statuses.headers)
+    return response
+
+
+def flight_key(subscription, cache):
+    """Ключ объединения запросов: токен, интервал from_date и валидаторы.
+    Подписки с одинаковым ключом получают от API одинаковый ответ.
+    """
+    return (
+        subscription.token, singleflight.bucket(subscription.current_date),
+        cache.etag, cache.last_modified, cache.digest
+    )
+
+
+def request_as_leader(headers, from_date, cache):
+    """Запрос, результат которого достаётся всем ожидающим подпискам."""
+    response = request_homework_statuses(headers, from_date, cache, False)
+    return response, cache
+
+
+def request_shared(subscription, cache, stream=None):
+    """Запрашивает статусы подписки, объединяя одинаковые запросы.
+    Одновременные запросы подписок одного токена с from_date из одного
+    интервала SINGLEFLIGHT_BUCKET уходят в API одним запросом, а
+    разобранный ответ получает каждая: отправленные статусы по-прежнему
+    учитываются в кеше своей подписки. Потоковый ответ с длинной
+    историей прочитать дважды нельзя, он запрашивается отдельно.
+    """
+    if stream is None:
+        stream = is_history_request(
+            subscription.current_date or int(time.time())
+        )
+    if stream:
+        return request_homework_statuses(
+            subscription.headers, subscription.current_date, cache
+        )
+    key = flight_key(subscription, cache)
+    (response, source), shared = singleflight.PRACTICUM_FLIGHTS.do(
+        key, request_as_leader, subscription.headers, key[1], cache
+    )
+    if shared:
+        logger.info('Ответ API получен вместе с другой подпиской аккаунта')
+        cache.adopt(source)
+    return response
 
 
 def check_response(response):
     """Проверяет ответ API на корректность."""
-    if response is None:
-        logger.error('response пришел пустым.')
-        raise ResponseIsNone
-    if not isinstance(response, dict):
-        logger.error('Некорректный тип данных response на входе')
-        raise TypeError('Некорректный тип данных response на входе')
-    if 'homeworks' not in response:
-        logger.error('По ключу homeworks ничего нет')
-        raise KeyError('Ошибка с ключем homeworks')
-    if not response['homeworks']:
-        return {}
-    homework = response['homeworks']
-    if not isinstance(homework, list):
-        logger.error('По ключу homework данные не ввиде списка')
-        raise TypeError('По ключу homework данные не ввиде списка')
-    return homework
+    return schema.validate_response(response)
 
 
 def parse_status(homework):
     """Извлечение статуса работы."""
-    if 'homework_name' not in homework:
-        logger.error('По ключу homework_name ничего нет')
-        raise KeyError('Ошибка с ключем homework_name')
-    homework_name = homework['homework_name']
-    if 'status' not in homework:
-        logger.error('По ключу status ничего нет')
-        raise KeyError('Ошибка с ключем status')
-    homework_status = homework['status']
-    if homework_status not in HOMEWORK_STATUSES:
-        logger.error(f'Неизвестный статус {homework_status}')
-        raise KeyError('Ошибка с ключем homework_status')
-    verdict = HOMEWORK_STATUSES[homework_status]
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    if not isinstance(homework, Homework):
+        homework = schema.to_record(homework, HOMEWORK_STATUSES)
+    return MESSAGE_TEMPLATES.render(homework)
 
 
 def check_tokens():
     """Проверяет доступность переменных окружения."""
-    if PRACTICUM_TOKEN is None:
+    if PRACTICUM_TOKEN is None and SUBSCRIPTIONS_FILE is None:
         logger.error('Переменная PRACTICUM_TOKEN не задана.')
         return False
     if TELEGRAM_TOKEN is None:
         logger.error('Переменная TELEGRAM_TOKEN не задана.')
         return False
-    if TELEGRAM_CHAT_ID is None:
+    if TELEGRAM_CHAT_ID is None and SUBSCRIPTIONS_FILE is None:
         logger.error('Переменная TELEGRAM_CHAT_ID не задана.')
         return False
     else:
@@ -131,33 +305,303 @@ def check_tokens():
         return True
 
 
-def main():
-    """Основная логика работы бота."""
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+def get_subscriptions():
+    """Возвращает подписки из реестра или из переменных окружения.
+    В процессе шарда из реестра берутся только подписки этого шарда.
+    """
+    if SUBSCRIPTIONS_FILE is not None:
+        subscriptions = load_subscriptions(SUBSCRIPTIONS_FILE)
+        if SHARD is not None:
+            import shards
+
+            subscriptions = shards.select(subscriptions, SHARD, SHARD_NODES)
+    else:
+        subscriptions = [
+            Subscription(token=PRACTICUM_TOKEN, chat_id=TELEGRAM_CHAT_ID)
+        ]
     current_timestamp = int(time.time())
-    while check_tokens():
-        try:
-            response = get_api_answer(current_timestamp)
-            logger.info('Ответ response получен')
-            homework = check_response(response)
-            logger.info('response проверен')
-            if homework:
-                message = parse_status(homework[0])
-                logger.info('Статусы получены')
-                if message != PAST_MESSAGE:
-                    send_message(bot, message)
-                    logger.info('Письмо отправлено')
-            else:
-                logger.info('Статус работы не изменился')
-                time.sleep(RETRY_TIME)
-            current_timestamp = response['current_date']
-            time.sleep(RETRY_TIME)
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(f'Проблема с работой. Ошибка {error}')
-            send_message(bot, message)
-            time.sleep(RETRY_TIME)
+    for subscription in subscriptions:
+        subscription.current_date = (
+            subscription.current_date or current_timestamp
+        )
+    return subscriptions
+
+
+def find_changes(homeworks, cache, locale=None, limit=NOTIFICATION_LIMIT):
+    """Сообщения о новых статусах и работы, которые нужно отметить.
+    Работы читаются по одной, работа с одним id обрабатывается один раз
+    за ответ. Сообщений не больше limit: остальные новые статусы
+    сводятся в одно итоговое, чтобы история после потери чекпоинта
+    не превращалась в сотни уведомлений.
+    """
+    messages = []
+    fresh = {}
+    for index, homework in enumerate(homeworks):
+        if index == 0:
+            cache.last_status = homework.status
+            cache.last_homework = homework
+        if homework.key in fresh or not cache.is_new(homework):
+            continue
+        fresh[homework.key] = homework
+        with logs.log_context(homework=homework.key):
+            logger.info(
+                f'Новый статус работы «{homework.homework_name}»: '
+                f'{homework.status}'
+            )
+            if len(messages) < limit:
+                messages.append(MESSAGE_TEMPLATES.render(homework, locale))
+    skipped = len(fresh) - len(messages)
+    if skipped:
+        messages.append(f'Ещё изменений статусов: {skipped}')
+    return messages, list(fresh.values())
+
+
+def mark_seen(homeworks, cache):
+    """Отмечает статусы работ отправленными."""
+    for homework in homeworks:
+        cache.mark_seen(homework)
+
+
+def open_checkpoints(subscriptions, caches):
+    """Открывает хранилище состояния и восстанавливает из него подписки."""
+    if CHECKPOINT_FILE is None:
+        return None
+    store = checkpoint.open_checkpoint_store(CHECKPOINT_FILE)
+    checkpoint.restore(store, subscriptions, caches)
+    return store
+
+
+def handle_response(subscription, response, cache):
+    """Проверяет ответ API и возвращает новые сообщения для подписки.
+    Статусы отмечаются отправленными, только если в ответе есть
+    current_date: иначе ответ отвергается целиком и при повторе
+    уведомления придут снова.
+    """
+    if response is NOT_MODIFIED:
+        logger.info('Статус работы не изменился')
+        return []
+    logger.info('Ответ response получен')
+    if isinstance(response, HomeworkStream):
+        messages, fresh = find_changes(
+            history.tap(
+                subscription.account, response.records(HOMEWORK_STATUSES)
+            ),
+            cache, subscription.locale
+        )
+        current_date = response['current_date']
+        cache.remember(response.headers)
+    else:
+        current_date = response['current_date']
+        homeworks = schema.parse_response(response, HOMEWORK_STATUSES)
+        messages, fresh = find_changes(
+            history.tap(subscription.account, homeworks),
+            cache, subscription.locale
+        )
+    mark_seen(fresh, cache)
+    logger.info('response проверен')
+    if messages:
+        logger.info(f'Статусы получены: {len(messages)}')
+    else:
+        logger.info('Статус работы не изменился')
+    subscription.current_date = current_date
+    return messages
+
+
+def report_error(subscription, error, alerts):
+    """Логирует ошибку опроса и возвращает сообщение о ней, если нужно."""
+    metrics.POLL_FAILURES.inc(exception=type(error).__name__)
+    logger.error(
+        f'Проблема с работой {subscription.key}. Ошибка {error}'
+    )
+    message = alerts.on_error(subscription.key, error)
+    return [message] if message is not None else []
+
+
+def report_success(subscription, messages, alerts):
+    """Добавляет к сообщениям итог восстановления после ошибок."""
+    resolved = alerts.on_success(subscription.key)
+    return [resolved, *messages] if resolved is not None else messages
+
+
+def poll_subscription(subscription, cache, alerts):
+    """Опрашивает API для одной подписки и возвращает сообщения для чата."""
+    try:
+        response = request_shared(subscription, cache)
+        messages = handle_response(subscription, response, cache)
+    except Exception as error:
+        return report_error(subscription, error, alerts)
+    return report_success(subscription, messages, alerts)
+
+
+def send_batch(outbox, outgoing):
+    """Ставит накопленные за цикл сообщения в очередь отправки."""
+    for chat_id, messages in outgoing.items():
+        for message in messages:
+            outbox.put(chat_id, message)
+
+
+def poll_due(subscriptions, caches, scheduler, alerts, stop=None):
+    """Опрашивает подписки, которым пора, и собирает сообщения по чатам.
+    После остановки новые запросы не начинаются, текущий доводится до конца.
+    """
+    outgoing = {}
+    by_key = {subscription.key: subscription for subscription in subscriptions}
+    for key in scheduler.due(by_key):
+        if stop is not None and stop.is_set():
+            logger.info('Остановка: опрос оставшихся подписок отложен')
+            break
+        subscription = by_key[key]
+        with logs.log_context(account=key):
+            messages = poll_subscription(subscription, caches[key], alerts)
+        scheduler.observe(key, caches[key])
+        if messages:
+            outgoing.setdefault(subscription.chat_id, []).extend(messages)
+    return outgoing
+
+
+def run_cycle(subscriptions, caches, scheduler, alerts, sender, store=None,
+              stop=None, poller=None):
+    """Один цикл main(): опрос, постановка сообщений в очередь и чекпоинт.
+    С poller опрос идёт через его poll_due, например в пуле потоков.
+    """
+    poll = poll_due if poller is None else poller.poll_due
+    with logs.log_context(cycle=logs.next_cycle()), \
+            metrics.POLL_CYCLE.time():
+        outgoing = poll(subscriptions, caches, scheduler, alerts, stop)
+    send_batch(sender, outgoing)
+    logger.info(
+        f'{rate_limit.report()}; в очереди Telegram {sender.depth()}'
+    )
+    if store is not None:
+        checkpoint.save(store, idle(subscriptions, poller), caches)
+
+
+def idle(subscriptions, poller=None):
+    """Подписки, которые сейчас не опрашиваются в фоне пула потоков."""
+    if poller is None:
+        return subscriptions
+    busy = poller.busy()
+    return [item for item in subscriptions if item.key not in busy]
+
+
+def install_signal_handlers(stop):
+    """По SIGTERM и SIGINT выставляет stop вместо аварийного выхода."""
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def handle(signum, frame):
+        logger.info(f'Получен сигнал {signal.Signals(signum).name}')
+        stop.set()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, handle)
+
+
+def shutdown(sender, store, subscriptions, caches,
+             timeout=SHUTDOWN_TIMEOUT, poller=None, listener=None):
+    """Досылает очередь сообщений и сохраняет состояние подписок."""
+    logger.info('Остановка: досылаем сообщения и сохраняем состояние')
+    deadline = time.monotonic() + timeout
+    if listener is not None:
+        listener.stop(COMMANDS_STOP_TIMEOUT)
+    if poller is not None:
+        poller.close(timeout)
+    sender.stop(max(deadline - time.monotonic(), 0))
+    if store is not None:
+        checkpoint.save(store, idle(subscriptions, poller), caches)
+        store.close()
+    history.close()
+    logger.info('Бот остановлен')
+
+
+def restore_pauses(subscriptions, scheduler):
+    """Не опрашивает подписки, приостановленные командой /pause."""
+    for subscription in subscriptions:
+        if subscription.paused:
+            scheduler.pause(subscription.key)
+
+
+def start_commands(bot, subscriptions, caches, scheduler):
+    """Запускает ответы на команды из чатов, если они включены."""
+    import commands
+
+    if not commands.TELEGRAM_COMMANDS:
+        return None
+    listener = commands.CommandListener(
+        bot, subscriptions, caches, scheduler
+    )
+    listener.start()
+    return listener
+
+
+def main(stop=None, once=False):
+    """Основная логика работы бота.
+    Первый цикл выполняется сразу после запуска: подписки догоняют
+    изменения с момента из чекпоинта, не дожидаясь интервала опроса.
+    С once=True бот делает один цикл и выходит — режим для cron.
+    При POLL_MODE=threads подписки опрашиваются параллельно в пуле потоков.
+    С TELEGRAM_COMMANDS=1 бот параллельно опросу отвечает на команды.
+    """
+    import telegram
+
+    if stop is None:
+        stop = threading.Event()
+    install_signal_handlers(stop)
+    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    poller = None
+    sender = outbox.Outbox(bot)
+    if POLL_MODE == 'threads':
+        import thread_poller
+
+        poller = thread_poller.ThreadPoller(sender)
+        http_session.configure(
+            pool_size=max(http_session.HTTP_POOL_SIZE, poller.workers)
+        )
+    else:
+        http_session.configure()
+    history.configure()
+    subscriptions = get_subscriptions()
+    caches = {
+        subscription.key: ResponseCache() for subscription in subscriptions
+    }
+    store = open_checkpoints(subscriptions, caches)
+    scheduler = AdaptiveScheduler(base_interval=RETRY_TIME)
+    restore_pauses(subscriptions, scheduler)
+    alerts = ErrorAggregator()
+    listener = None if once else start_commands(
+        bot, subscriptions, caches, scheduler
+    )
+    sender.start()
+    metrics_server = metrics.start_server()
+    try:
+        while check_tokens() and not stop.is_set():
+            run_cycle(
+                subscriptions, caches, scheduler, alerts, sender, store, stop,
+                poller
+            )
+            if once:
+                break
+            stop.wait(scheduler.sleep_time())
+    finally:
+        metrics.stop_server(metrics_server)
+        shutdown(
+            sender, store, subscriptions, caches, poller=poller,
+            listener=listener
+        )
 
 
 if __name__ == '__main__':
-    main()
+    logs.configure()
+    if POLL_MODE == 'async':
+        import async_poller
+        async_poller.main()
+    elif POLL_MODE == 'webhook':
+        import webhook
+        webhook.main()
+    elif POLL_MODE == 'shards':
+        import shards
+        shards.main()
+    elif POLL_MODE == 'once':
+        main(once=True)
+    else:
+        main()
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from http_session import (
+    HTTP_CONNECT_TIMEOUT, HTTP_POOL_SIZE, HTTP_READ_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+@dataclass
+class RequestTiming:
+    """Длительность фаз одного запроса в секундах."""
+
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    body: float = 0.0
+
+    @property
+    def total(self):
+        """Полная длительность запроса."""
+        return self.connect + self.tls + self.ttfb + self.body
+
+
+class LatencyStats:
+    """Накопленная статистика задержек запросов по фазам."""
+
+    PHASES = ('connect', 'tls', 'ttfb', 'body')
+
+    def __init__(self):
+        """Создаёт пустую статистику."""
+        self._lock = threading.Lock()
+        self.count = 0
+        self.new_connections = 0
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+
+    def record(self, timing):
+        """Добавляет замер одного запроса."""
+        with self._lock:
+            self.count += 1
+            if timing.connect:
+                self.new_connections += 1
+            for phase in self.PHASES:
+                self.totals[phase] += getattr(timing, phase)
+
+    def snapshot(self):
+        """Возвращает число запросов и средние длительности фаз."""
+        with self._lock:
+            count = self.count or 1
+            result = {
+                phase: total / count for phase, total in self.totals.items()
+            }
+            result['count'] = self.count
+            result['new_connections'] = self.new_connections
+        return result
+
+
+def _add_timing(phase, seconds):
+    """Добавляет длительность фазы к замеру текущего запроса потока."""
+    timing = getattr(_local, 'timing', None)
+    if timing is not None:
+        setattr(timing, phase, getattr(timing, phase) + seconds)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTP соединение, замеряющее время TCP подключения."""
+
+    def _new_conn(self):
+        """Открывает сокет и замеряет время подключения."""
+        started = time.perf_counter()
+        conn = super()._new_conn()
+        _add_timing('connect', time.perf_counter() - started)
+        return conn
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS соединение, замеряющее время TCP подключения и TLS."""
+
+    def _new_conn(self):
+        """Открывает сокет и замеряет время подключения."""
+        started = time.perf_counter()
+        conn = super()._new_conn()
+        self._tcp_time = time.perf_counter() - started
+        _add_timing('connect', self._tcp_time)
+        return conn
+
+    def connect(self):
+        """Подключается и относит остаток времени к TLS рукопожатию."""
+        self._tcp_time = 0.0
+        started = time.perf_counter()
+        super().connect()
+        _add_timing('tls', time.perf_counter() - started - self._tcp_time)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """Пул HTTP соединений с замером подключения."""
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Пул HTTPS соединений с замером подключения и TLS."""
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Адаптер requests, использующий пулы с замером фаз запроса."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Подменяет классы пулов соединений на замеряющие."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    """Сессия requests с keep-alive пулом, таймаутами и замерами фаз."""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE,
+                 connect_timeout=HTTP_CONNECT_TIMEOUT,
+                 read_timeout=HTTP_READ_TIMEOUT):
+        """Настраивает пул соединений и таймауты по умолчанию."""
+        super().__init__()
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = LatencyStats()
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        """Выполняет запрос с таймаутом по умолчанию."""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+    def send(self, request, **kwargs):
+        """Отправляет запрос и сохраняет замер фаз в response.timing."""
+        stream = kwargs.pop('stream', False)
+        timing = _local.timing = RequestTiming()
+        started = time.perf_counter()
+        try:
+            response = super().send(request, stream=True, **kwargs)
+            headers_received = time.perf_counter()
+            if not stream:
+                response.content
+        finally:
+            _local.timing = None
+        timing.ttfb = max(
+            headers_received - started - timing.connect - timing.tls, 0.0
+        )
+        timing.body = time.perf_counter() - headers_received
+        response.timing = timing
+        self.stats.record(timing)
+        logger.debug(
+            f'Запрос {request.url}: подключение {timing.connect:.3f}с, '
+            f'TLS {timing.tls:.3f}с, TTFB {timing.ttfb:.3f}с, '
+            f'тело {timing.body:.3f}с'
+        )
+        return response
@@ -0,0 +1,98 @@
+import logging
+
+from config import CONFIG
+
+HTTP_POOL_SIZE = CONFIG.http_pool_size
+HTTP_CONNECT_TIMEOUT = CONFIG.http_connect_timeout
+HTTP_READ_TIMEOUT = CONFIG.http_read_timeout
+HTTP2 = CONFIG.http2
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def create_http2_client(pool_size, connect_timeout, read_timeout):
+    """Создаёт HTTP/2 клиент httpx или None, если httpx не установлен."""
+    try:
+        import httpx
+    except ImportError:
+        logger.warning('httpx не установлен, HTTP/2 недоступен')
+        return None
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size
+        ),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
+
+def configure(pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT,
+              read_timeout=HTTP_READ_TIMEOUT, http2=HTTP2):
+    """Создаёт общий клиент с пулом соединений для всех запросов к API."""
+    global _client
+    client = None
+    if http2:
+        client = create_http2_client(pool_size, connect_timeout, read_timeout)
+    if client is None:
+        from http_pool import PooledSession
+
+        client = PooledSession(pool_size, connect_timeout, read_timeout)
+    _client = client
+    logger.info(f'Пул HTTP соединений настроен, размер {pool_size}')
+    return client
+
+
+def close():
+    """Закрывает общий клиент."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get(url, **kwargs):
+    """GET через общий пул соединений, а без него — через requests.get."""
+    if _client is not None:
+        return _client.get(url, **kwargs)
+    import requests
+
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return requests.get(url, **kwargs)
+
+
+def stream(url, **kwargs):
+    """GET без чтения тела: его читают кусками через iter_content."""
+    if _client is not None and hasattr(_client, 'build_request'):
+        request = _client.build_request('GET', url, **kwargs)
+        return _client.send(request, stream=True)
+    if _client is not None:
+        return _client.get(url, stream=True, **kwargs)
+    import requests
+
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return requests.get(url, stream=True, **kwargs)
+
+
+def client_errors():
+    """Исключения HTTP/2 клиента: (таймауты, редиректы, сбои сети).
+
+    Без клиента httpx все три кортежа пустые: requests выбрасывает
+    свои исключения, которые разбирает вызывающий код.
+    """
+    if _client is None or not hasattr(_client, 'build_request'):
+        return (), (), ()
+    import httpx
+
+    return (
+        (httpx.TimeoutException,), (httpx.TooManyRedirects,),
+        (httpx.RequestError,),
+    )
+
+
+def stats():
+    """Возвращает статистику задержек общего клиента."""
+    client_stats = getattr(_client, 'stats', None)
+    return client_stats.snapshot() if client_stats is not None else {}
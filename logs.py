@@ -0,0 +1,204 @@
+import atexit
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config import CONFIG
+
+LOG_FILE = CONFIG.log_file
+LOG_FORMAT = CONFIG.log_format
+LOG_LEVEL = CONFIG.log_level
+LOG_QUEUE = CONFIG.log_queue
+LOG_MAX_BYTES = CONFIG.log_max_bytes
+LOG_ROTATE_WHEN = CONFIG.log_rotate_when
+LOG_BACKUPS = CONFIG.log_backups
+LOG_SAMPLE_LIMIT = CONFIG.log_sample_limit
+LOG_SAMPLE_WINDOW = CONFIG.log_sample_window
+LOG_SAMPLE_KEYS = 1000
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONTEXT_FIELDS = ('account', 'homework', 'cycle')
+
+_context = {name: ContextVar(name, default=None) for name in CONTEXT_FIELDS}
+_cycles = itertools.count(1)
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Добавляет поля account, homework, cycle ко всем записям блока."""
+    tokens = [(_context[name], _context[name].set(value))
+              for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+def next_cycle():
+    """Номер следующего цикла опроса для поля cycle."""
+    return next(_cycles)
+
+
+class ContextFilter(logging.Filter):
+    """Переносит поля контекста в запись, если их нет в extra."""
+
+    def filter(self, record):
+        """Дополняет запись и всегда её пропускает."""
+        for name, variable in _context.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, variable.get())
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает не больше limit одинаковых INFO за окно window секунд.
+
+    Одинаковыми считаются записи с одним логгером и текстом. Число
+    отброшенных записей добавляется в поле suppressed первой записи
+    следующего окна. Тексты с меняющимися числами дают новые ключи,
+    поэтому раз в окно истёкшие окна без отброшенных записей удаляются,
+    а ключей хранится не больше max_keys: вытесняются давно не
+    встречавшиеся.
+    """
+
+    def __init__(self, limit=LOG_SAMPLE_LIMIT, window=LOG_SAMPLE_WINDOW,
+                 clock=time.monotonic, max_keys=LOG_SAMPLE_KEYS):
+        """Настраивает лимит; limit=0 отключает выборку."""
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.max_keys = max_keys
+        self.windows = OrderedDict()
+        self.swept_at = clock()
+        self._lock = threading.Lock()
+
+    def sweep(self, now):
+        """Удаляет истёкшие окна, в которых ничего не отброшено."""
+        expired = [
+            key for key, (started, _, suppressed) in self.windows.items()
+            if now - started >= self.window and not suppressed
+        ]
+        for key in expired:
+            del self.windows[key]
+        self.swept_at = now
+
+    def filter(self, record):
+        """Решает, пропустить ли запись."""
+        if not self.limit or record.levelno != logging.INFO:
+            return True
+        key = (record.name, record.msg)
+        now = self.clock()
+        with self._lock:
+            if now - self.swept_at >= self.window:
+                self.sweep(now)
+            started, count, suppressed = self.windows.pop(key, (now, 0, 0))
+            if now - started >= self.window:
+                started, count = now, 0
+            if count >= self.limit:
+                self.windows[key] = (started, count, suppressed + 1)
+                return False
+            self.windows[key] = (started, count + 1, 0)
+            while len(self.windows) > self.max_keys:
+                self.windows.popitem(last=False)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """Прежний текстовый формат с полями контекста и числом пропущенных."""
+
+    def format(self, record):
+        """Строка лога."""
+        line = super().format(record)
+        context = ' '.join(
+            f'{name}={getattr(record, name)}' for name in CONTEXT_FIELDS
+            if getattr(record, name, None) is not None
+        )
+        if context:
+            line += f' [{context}]'
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            line += f' (пропущено похожих: {suppressed})'
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        """Строка JSON с полями контекста."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name in (*CONTEXT_FIELDS, 'suppressed'):
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def file_handler(path=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                 when=LOG_ROTATE_WHEN, backups=LOG_BACKUPS):
+    """Файловый обработчик с ротацией по времени или по размеру."""
+    import logging.handlers
+
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=when, backupCount=backups, encoding='utf-8'
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8'
+    )
+
+
+def configure(path=LOG_FILE, fmt=LOG_FORMAT, level=LOG_LEVEL,
+              use_queue=LOG_QUEUE, sampling=None):
+    """Настраивает корневой логгер один раз за процесс.
+
+    В режиме очереди записи кладутся в QueueHandler, а на диск их пишет
+    фоновый поток QueueListener, поэтому цикл опроса не ждёт диска.
+    """
+    global _listener
+    root = logging.getLogger()
+    if getattr(root, '_homework_configured', False):
+        return
+    handler = file_handler(path)
+    handler.setFormatter(
+        JsonFormatter() if fmt == 'json' else TextFormatter(TEXT_FORMAT)
+    )
+    front = handler
+    if use_queue:
+        import queue
+
+        front = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(
+            front.queue, handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown)
+    front.addFilter(ContextFilter())
+    front.addFilter(sampling or SamplingFilter())
+    root.addHandler(front)
+    root.setLevel(level)
+    root._homework_configured = True
+
+
+def shutdown():
+    """Дописывает записи из очереди и останавливает фоновый поток."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
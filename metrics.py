@@ -0,0 +1,305 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config import CONFIG
+
+METRICS_HOST = CONFIG.metrics_host
+METRICS_PORT = CONFIG.metrics_port
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+logger = logging.getLogger(__name__)
+
+
+def format_value(value):
+    """Число в текстовом формате Prometheus."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def format_labels(labels):
+    """Метки в виде {name="value",...}."""
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n')
+        )
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+class Registry:
+    """Набор метрик, который отдаётся одним текстом по /metrics."""
+
+    def __init__(self):
+        """Создаёт пустой набор."""
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Добавляет метрику в набор."""
+        with self._lock:
+            self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """Общая часть метрик: имя, описание и значения по меткам."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY):
+        """Регистрирует метрику."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'Метрика {self.name} ожидает метки {self.labelnames}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, **extra):
+        return [*zip(self.labelnames, key), *extra.items()]
+
+    def samples(self):
+        """Строки значений метрики."""
+        with self._lock:
+            values = dict(self.values)
+        return [
+            f'{self.name}{format_labels(self._labels(key))} '
+            f'{format_value(value)}'
+            for key, value in sorted(values.items())
+        ]
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Увеличивает счётчик."""
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Текущее значение счётчика."""
+        with self._lock:
+            return self.values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Текущее значение: глубина очереди, число ожидающих и т.п."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        """Регистрирует метрику без функции значения."""
+        super().__init__(*args, **kwargs)
+        self.function = None
+
+    def set(self, value, **labels):
+        """Устанавливает значение."""
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def set_function(self, function):
+        """Берёт значение из функции в момент чтения метрик."""
+        self.function = function
+
+    def samples(self):
+        """Строки значений, включая значение функции."""
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception as error:
+                logger.error(f'Не удалось получить {self.name}: {error}')
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Распределение длительностей по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY, buckets=DEFAULT_BUCKETS):
+        """Регистрирует гистограмму с заданными границами корзин."""
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = (*sorted(buckets), float('inf'))
+
+    def observe(self, value, **labels):
+        """Учитывает одно наблюдение."""
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Замеряет длительность блока, даже если он упал."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        """Число наблюдений."""
+        with self._lock:
+            state = self.values.get(self._key(labels))
+            return state[2] if state is not None else 0
+
+    def samples(self):
+        """Корзины нарастающим итогом, сумма и число наблюдений."""
+        with self._lock:
+            values = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self.values.items()
+            }
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = format_labels(
+                    self._labels(key, le=format_value(bound))
+                )
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self._labels(key))
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds',
+    'Время одного HTTP запроса к API Практикума', ('status',)
+)
+POLL_CYCLE = Histogram(
+    'homework_poll_cycle_seconds', 'Длительность цикла опроса подписок'
+)
+ACCOUNT_POLL = Histogram(
+    'homework_account_poll_seconds',
+    'Время опроса и разбора ответа одной подписки'
+)
+POLL_STRAGGLERS = Counter(
+    'homework_poll_stragglers_total',
+    'Подписки, не уложившиеся в срок цикла опроса'
+)
+POLL_FAILURES = Counter(
+    'homework_poll_failures_total',
+    'Ошибки опроса и разбора ответа по типу исключения', ('exception',)
+)
+SINGLEFLIGHT_SHARED = Counter(
+    'homework_singleflight_shared_total',
+    'Запросы, получившие ответ одновременного запроса с тем же ключом',
+    ('service',)
+)
+TELEGRAM_LATENCY = Histogram(
+    'homework_telegram_send_seconds',
+    'Время отправки одного сообщения в Telegram'
+)
+COMMAND_LATENCY = Histogram(
+    'homework_command_seconds',
+    'Время ответа на команду из чата Telegram', ('command',)
+)
+OUTBOX_DEPTH = Gauge(
+    'homework_outbox_depth', 'Сообщений в очереди отправки Telegram'
+)
+
+
+def handler_class(registry=REGISTRY):
+    """Класс обработчика, отдающего метрики registry по GET /metrics.
+
+    http.server импортируется только здесь: без METRICS_PORT он не нужен.
+    """
+    from http import HTTPStatus
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики по GET /metrics."""
+
+        def do_GET(self):
+            """Отвечает текстом метрик или 404."""
+            if self.path.split('?', 1)[0] != METRICS_PATH:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            body = registry.expose().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Запросы метрик не пишутся в лог."""
+
+    return MetricsHandler
+
+
+def start_server(port=METRICS_PORT, host=METRICS_HOST, registry=REGISTRY):
+    """Запускает /metrics в фоновом потоке. Без порта ничего не делает."""
+    if port is None:
+        return None
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, int(port)), handler_class(registry))
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    ).start()
+    logger.info(
+        f'Метрики доступны на http://{host}:{server.server_port}'
+        f'{METRICS_PATH}'
+    )
+    return server
+
+
+def stop_server(server):
+    """Останавливает сервер метрик, если он был запущен."""
+    if server is not None:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,352 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import metrics
+import rate_limit
+from config import CONFIG
+from retry import Backoff
+
+OUTBOX_CAPACITY = CONFIG.outbox_capacity
+OUTBOX_JOURNAL = CONFIG.outbox_journal
+PER_CHAT_INTERVAL = CONFIG.per_chat_interval
+SEND_ATTEMPTS = 5
+COMPACT_EVERY = 1000
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def coalesce_counts(messages):
+    """Склеивает сообщения в тексты не длиннее лимита Telegram.
+    Возвращает пары (текст, сколько сообщений подряд в него вошло).
+    """
+    groups = []
+    current = ''
+    count = 0
+    for message in messages:
+        message = message[:TELEGRAM_MESSAGE_LIMIT]
+        candidate = f'{current}\n\n{message}' if current else message
+        if len(candidate) > TELEGRAM_MESSAGE_LIMIT:
+            groups.append((current, count))
+            candidate = message
+            count = 0
+        current = candidate
+        count += 1
+    if count:
+        groups.append((current, count))
+    return groups
+
+
+def coalesce_messages(messages):
+    """Склеивает сообщения в тексты не длиннее лимита Telegram."""
+    return [text for text, _ in coalesce_counts(messages) if text]
+
+
+class OutgoingMessage:
+    """Сообщение в очереди на отправку."""
+
+    __slots__ = ('id', 'chat_id', 'text', 'attempts')
+
+    def __init__(self, message_id, chat_id, text, attempts=0):
+        """Сохраняет получателя и текст сообщения."""
+        self.id = message_id
+        self.chat_id = chat_id
+        self.text = text
+        self.attempts = attempts
+
+
+class Journal:
+    """Журнал очереди в файле JSON Lines: записи put и done."""
+
+    def __init__(self, path):
+        """Открывает журнал на дозапись."""
+        self.path = path
+        self.done_since_compact = 0
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def replay(self):
+        """Возвращает неотправленные сообщения из журнала."""
+        pending = {}
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.error('Повреждённая запись в журнале очереди')
+                    continue
+                if record['op'] == 'put':
+                    pending[record['id']] = record
+                else:
+                    pending.pop(record['id'], None)
+        return [
+            OutgoingMessage(record['id'], record['chat_id'], record['text'])
+            for record in pending.values()
+        ]
+
+    def append(self, record):
+        """Дописывает запись в журнал."""
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def put(self, message):
+        """Записывает новое сообщение."""
+        self.append({
+            'op': 'put', 'id': message.id,
+            'chat_id': message.chat_id, 'text': message.text,
+        })
+
+    def done(self, message_ids, pending):
+        """Отмечает сообщения отправленными и иногда сжимает журнал."""
+        for message_id in message_ids:
+            self.append({'op': 'done', 'id': message_id})
+        self.done_since_compact += len(message_ids)
+        if self.done_since_compact >= COMPACT_EVERY:
+            self.compact(pending)
+
+    def compact(self, pending):
+        """Переписывает журнал, оставляя только неотправленные сообщения."""
+        self.file.close()
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for message in pending:
+                file.write(json.dumps({
+                    'op': 'put', 'id': message.id,
+                    'chat_id': message.chat_id, 'text': message.text,
+                }, ensure_ascii=False) + '\n')
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.done_since_compact = 0
+
+    def close(self):
+        """Закрывает файл журнала."""
+        self.file.close()
+
+
+class Outbox:
+    """Очередь исходящих сообщений Telegram с отдельным потоком отправки.
+
+    Опрос API только кладёт сообщения в кольцевой буфер и не ждёт
+    Telegram. Поток отправки склеивает сообщения в один чат, соблюдает
+    общий лимит Telegram и паузу между сообщениями в один чат,
+    повторяет отправку при RetryAfter и сетевых ошибках, а сообщения,
+    отвергнутые Telegram (BadRequest и т.п.), сразу удаляет. Если задан
+    журнал, неотправленные сообщения переживают перезапуск.
+    """
+
+    def __init__(self, bot, journal_path=OUTBOX_JOURNAL,
+                 capacity=OUTBOX_CAPACITY,
+                 per_chat_interval=PER_CHAT_INTERVAL,
+                 bucket=rate_limit.TELEGRAM_BUCKET, backoff=None,
+                 clock=time.monotonic):
+        """Создаёт очередь и восстанавливает её из журнала."""
+        self.bot = bot
+        self.capacity = capacity
+        self.per_chat_interval = per_chat_interval
+        self.bucket = bucket
+        self.backoff = backoff or Backoff()
+        self.clock = clock
+        self.queue = deque()
+        self.inflight = []
+        self.ready_at = {}
+        self.sent = 0
+        self.dropped = 0
+        self._ids = itertools.count(int(time.time() * 1000))
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._deadline = None
+        self._thread = None
+        self.journal = None
+        if journal_path is not None:
+            self.journal = Journal(journal_path)
+            self.queue.extend(self.journal.replay())
+            if self.queue:
+                logger.info(
+                    f'Восстановлено неотправленных сообщений: '
+                    f'{len(self.queue)}'
+                )
+
+    def put(self, chat_id, text):
+        """Ставит сообщение в очередь, не дожидаясь отправки."""
+        with self._condition:
+            if len(self.queue) >= self.capacity:
+                lost = self.queue.popleft()
+                self.dropped += 1
+                logger.error(
+                    f'Очередь переполнена, сообщение в чат id '
+                    f'{lost.chat_id} удалено'
+                )
+                if self.journal is not None:
+                    self.journal.done([lost.id], self.pending())
+            message = OutgoingMessage(next(self._ids), chat_id, text)
+            self.queue.append(message)
+            if self.journal is not None:
+                self.journal.put(message)
+            self._condition.notify()
+
+    def depth(self):
+        """Число сообщений в очереди."""
+        with self._condition:
+            return len(self.queue)
+
+    def start(self):
+        """Запускает поток отправки."""
+        metrics.OUTBOX_DEPTH.set_function(self.depth)
+        self._thread = threading.Thread(
+            target=self.run, name='outbox', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        """Останавливает поток, дав ему timeout секунд дослать очередь.
+        Возвращает число неотправленных сообщений.
+        """
+        with self._condition:
+            self._stopping = True
+            self._deadline = self.clock() + timeout
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._condition:
+            unsent = len(self.pending())
+            if unsent:
+                logger.warning(
+                    f'При остановке не отправлено сообщений: {unsent}'
+                )
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+        return unsent
+
+    def take_batch(self):
+        """Забирает из очереди сообщения первого готового чата.
+        Возвращает пару (сообщения, 0) или (None, секунды ожидания).
+        """
+        now = self.clock()
+        wait = None
+        for message in self.queue:
+            delay = self.ready_at.get(message.chat_id, now) - now
+            if delay <= 0:
+                break
+            wait = delay if wait is None else min(wait, delay)
+        else:
+            return None, wait
+        chat_id = message.chat_id
+        batch = [item for item in self.queue if item.chat_id == chat_id]
+        self.queue = deque(
+            item for item in self.queue if item.chat_id != chat_id
+        )
+        self.inflight = batch
+        return batch, 0
+
+    def run(self):
+        """Цикл потока отправки."""
+        while True:
+            with self._condition:
+                if self._stopping and self.clock() >= self._deadline:
+                    return
+                batch, wait = self.take_batch()
+                while batch is None:
+                    if self._stopping:
+                        left = self._deadline - self.clock()
+                        if not self.queue or left <= 0:
+                            return
+                        wait = min(wait, left)
+                    self._condition.wait(wait)
+                    batch, wait = self.take_batch()
+            self.deliver(batch)
+
+    def deliver(self, batch):
+        """Отправляет склеенные сообщения одного чата.
+        Если отправка прервалась, уже доставленные тексты отмечаются
+        отправленными, а повторяются или удаляются только остальные.
+        """
+        from telegram.error import (
+            BadRequest, NetworkError, RetryAfter, TelegramError
+        )
+
+        chat_id = batch[0].chat_id
+        sent = 0
+        try:
+            for text, count in coalesce_counts(
+                [item.text for item in batch]
+            ):
+                self.bucket.acquire()
+                with metrics.TELEGRAM_LATENCY.time():
+                    self.bot.send_message(chat_id, text)
+                sent += count
+        except RetryAfter as error:
+            self.bucket.defer(error.retry_after)
+            self.requeue(self.settle(batch, sent), error.retry_after)
+            return
+        except BadRequest as error:
+            self.reject(self.settle(batch, sent), error)
+            return
+        except NetworkError as error:
+            self.retry_later(self.settle(batch, sent), error)
+            return
+        except TelegramError as error:
+            self.reject(self.settle(batch, sent), error)
+            return
+        self.finish(batch)
+
+    def settle(self, batch, sent):
+        """Отмечает отправленными первые sent сообщений, возвращает прочие."""
+        if sent:
+            self.finish(batch[:sent])
+        return batch[sent:]
+
+    def reject(self, batch, error):
+        """Удаляет сообщения, которые Telegram не примет и при повторе."""
+        logger.error(
+            f'Невозможно отправить сообщение в чат id {batch[0].chat_id}: '
+            f'{error}'
+        )
+        self.finish(batch, dropped=True)
+
+    def retry_later(self, batch, error):
+        """Возвращает сообщения в очередь с паузой или удаляет их."""
+        attempts = max(item.attempts for item in batch) + 1
+        if attempts >= SEND_ATTEMPTS:
+            logger.error(
+                f'Сообщение в чат id {batch[0].chat_id} не отправлено '
+                f'после {attempts} попыток: {error}'
+            )
+            self.finish(batch, dropped=True)
+            return
+        for item in batch:
+            item.attempts = attempts
+        self.requeue(batch, self.backoff.delay(attempts - 1))
+
+    def requeue(self, batch, delay):
+        """Возвращает сообщения в начало очереди."""
+        with self._condition:
+            self.ready_at[batch[0].chat_id] = self.clock() + delay
+            self.queue.extendleft(reversed(batch))
+            self.inflight = []
+
+    def finish(self, batch, dropped=False):
+        """Отмечает сообщения обработанными."""
+        with self._condition:
+            self.ready_at[batch[0].chat_id] = (
+                self.clock() + self.per_chat_interval
+            )
+            finished = {item.id for item in batch}
+            self.inflight = [
+                item for item in self.inflight if item.id not in finished
+            ]
+            if dropped:
+                self.dropped += len(batch)
+            else:
+                self.sent += len(batch)
+            if self.journal is not None:
+                self.journal.done([item.id for item in batch], self.pending())
+
+    def pending(self):
+        """Все неотправленные сообщения, включая отправляемые сейчас."""
+        return [*self.queue, *self.inflight]
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from config import CONFIG
+
+PRACTICUM_RATE = CONFIG.practicum_rate
+PRACTICUM_BURST = CONFIG.practicum_burst
+TELEGRAM_RATE = CONFIG.telegram_rate
+TELEGRAM_BURST = CONFIG.telegram_burst
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Общий ограничитель частоты запросов к одному сервису.
+
+    Каждый запрос резервирует токен; если токенов нет, ожидание
+    назначается так, чтобы запросы шли равномерно со скоростью rate.
+    Подсказка сервера Retry-After блокирует выдачу токенов до указанного
+    момента. Ведёт статистику очереди и времени ожидания.
+    """
+
+    def __init__(self, name, rate, capacity, clock=time.monotonic,
+                 sleep=time.sleep):
+        """Создаёт полный бак на capacity токенов."""
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Резервирует токен и возвращает время ожидания в секундах."""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            self.tokens -= 1
+            wait = max(
+                -self.tokens / self.rate if self.tokens < 0 else 0.0,
+                self.blocked_until - now
+            )
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self):
+        """Ждёт разрешения на запрос в синхронном коде."""
+        wait = self.reserve()
+        if wait > 0:
+            with self._queued():
+                self.sleep(wait)
+
+    async def acquire_async(self):
+        """Ждёт разрешения на запрос в асинхронном коде."""
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            with self._queued():
+                await asyncio.sleep(wait)
+
+    @contextmanager
+    def _queued(self):
+        with self._lock:
+            self.waiting += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def defer(self, seconds):
+        """Приостанавливает выдачу токенов по подсказке сервера."""
+        with self._lock:
+            self.blocked_until = max(
+                self.blocked_until, self.clock() + seconds
+            )
+        logger.warning(
+            f'{self.name}: сервер просит подождать {seconds:.0f} с'
+        )
+
+    def stats(self):
+        """Глубина очереди и время ожидания запросов."""
+        with self._lock:
+            return {
+                'queue_depth': self.waiting,
+                'acquired': self.acquired,
+                'avg_wait': self.total_wait / (self.acquired or 1),
+                'max_wait': self.max_wait,
+            }
+
+
+def parse_retry_after(value, default=60.0):
+    """Переводит заголовок Retry-After (секунды или дата) в секунды."""
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+PRACTICUM_BUCKET = TokenBucket('practicum', PRACTICUM_RATE, PRACTICUM_BURST)
+TELEGRAM_BUCKET = TokenBucket('telegram', TELEGRAM_RATE, TELEGRAM_BURST)
+
+
+def report():
+    """Строка со статистикой ограничителей для лога."""
+    parts = []
+    for bucket in (PRACTICUM_BUCKET, TELEGRAM_BUCKET):
+        stats = bucket.stats()
+        parts.append(
+            f'{bucket.name}: в очереди {stats["queue_depth"]}, '
+            f'запросов {stats["acquired"]}, '
+            f'среднее ожидание {stats["avg_wait"]:.2f} с, '
+            f'максимальное {stats["max_wait"]:.2f} с'
+        )
+    return '; '.join(parts)
@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import re
+from http import HTTPStatus
+
+logger = logging.getLogger(__name__)
+
+NOT_MODIFIED = object()
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*-?[0-9.eE+-]+')
+
+
+def body_digest(body):
+    """Возвращает короткий хеш тела ответа без поля current_date.
+    current_date — время сервера, оно меняется в каждом ответе, и с ним
+    ответы с теми же работами никогда не совпали бы.
+    """
+    return hashlib.blake2b(
+        CURRENT_DATE.sub(b'', body), digest_size=16
+    ).digest()
+
+
+class ResponseCache:
+    """Кеш ответов API и уже отправленных статусов одного аккаунта.
+
+    Хранит валидаторы ETag/Last-Modified для условных запросов и хеш
+    последнего тела ответа, чтобы неизменившиеся ответы отбрасывались
+    до разбора JSON. По ключу id работы запоминает пару
+    (status, date_updated), чтобы не уведомлять об одном изменении дважды.
+    last_homework — последняя работа из ответа, её отдаёт команда /status.
+    """
+
+    def __init__(self):
+        """Создаёт пустой кеш."""
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.pending_digest = None
+        self.seen = {}
+        self.last_status = None
+        self.last_homework = None
+        self.change_count = 0
+
+    def conditional_headers(self):
+        """Заголовки условного запроса по сохранённым валидаторам."""
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def is_unchanged(self, status_code, body):
+        """Проверяет, что ответ совпадает с предыдущим, не разбирая JSON."""
+        self.pending_digest = None
+        if status_code == HTTPStatus.NOT_MODIFIED:
+            return True
+        if status_code != HTTPStatus.OK:
+            return False
+        self.pending_digest = body_digest(body)
+        return self.pending_digest == self.digest
+
+    def remember(self, headers):
+        """Запоминает валидаторы и хеш успешно разобранного ответа."""
+        self.etag = headers.get('ETag', self.etag)
+        self.last_modified = headers.get('Last-Modified', self.last_modified)
+        self.digest = self.pending_digest
+
+    def adopt(self, other):
+        """Берёт валидаторы и хеш ответа из кеша другой подписки.
+        Нужно, когда один ответ API получили несколько подписок аккаунта.
+        """
+        self.etag = other.etag
+        self.last_modified = other.last_modified
+        self.digest = other.digest
+
+    def is_new(self, homework):
+        """Проверяет, что статус работы ещё не был обработан."""
+        state = (homework.status, homework.date_updated)
+        return self.seen.get(homework.key) != state
+
+    def mark_seen(self, homework):
+        """Запоминает статус работы как обработанный."""
+        self.seen[homework.key] = (homework.status, homework.date_updated)
+        self.change_count += 1
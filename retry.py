@@ -0,0 +1,180 @@
+import logging
+import random
+import threading
+import time
+
+from config import CONFIG
+from exceptions import (
+    ApiUnavailableError, CircuitOpenError, CustomStatusesError
+)
+
+RETRY_ATTEMPTS = CONFIG.retry_attempts
+BACKOFF_BASE = CONFIG.backoff_base
+BACKOFF_MAX = CONFIG.backoff_max
+BREAKER_THRESHOLD = CONFIG.breaker_threshold
+BREAKER_RESET = CONFIG.breaker_reset
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    """Экспоненциальная пауза между повторами с полным джиттером."""
+
+    def __init__(self, base=BACKOFF_BASE, maximum=BACKOFF_MAX, factor=2,
+                 rand=random.random):
+        """Задаёт начальную и максимальную паузу."""
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.rand = rand
+
+    def delay(self, attempt):
+        """Пауза перед повтором номер attempt, начиная с нуля."""
+        ceiling = min(self.maximum, self.base * self.factor ** attempt)
+        return self.rand() * ceiling
+
+
+class CircuitBreaker:
+    """Отключает запросы к сервису после серии сбоев подряд.
+
+    После failure_threshold сбоев запросы сразу отклоняются
+    reset_timeout секунд, затем пропускается один пробный запрос:
+    его успех закрывает цепь, сбой снова её размыкает.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=BREAKER_THRESHOLD,
+                 reset_timeout=BREAKER_RESET, clock=time.monotonic):
+        """Создаёт замкнутую цепь."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Пропускает запрос или выбрасывает CircuitOpenError."""
+        with self._lock:
+            if self.state == self.OPEN:
+                retry_in = self.opened_at + self.reset_timeout - self.clock()
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = self.HALF_OPEN
+                self.probing = False
+                logger.info(f'{self.name}: пробный запрос после сбоев')
+            if self.state == self.HALF_OPEN:
+                if self.probing:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self.probing = True
+
+    def record_success(self):
+        """Отмечает успешный запрос."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f'{self.name}: сервис снова доступен')
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        """Отмечает сбой и размыкает цепь при превышении порога."""
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    logger.error(
+                        f'{self.name}: запросы приостановлены после '
+                        f'{self.failures} сбоев подряд'
+                    )
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+def is_transient(error):
+    """Сбой, который имеет смысл повторить: сеть или ошибка 5xx."""
+    if isinstance(error, ApiUnavailableError):
+        return True
+    if isinstance(error, CustomStatusesError):
+        return error.status_code >= 500
+    return False
+
+
+def _on_failure(error, attempt, attempts, breaker, backoff, is_retryable):
+    """Учитывает сбой и возвращает паузу перед повтором или None."""
+    if not is_retryable(error):
+        if breaker is not None:
+            breaker.record_success()
+        return None
+    if breaker is not None:
+        breaker.record_failure()
+    if attempt + 1 >= attempts:
+        return None
+    delay = backoff.delay(attempt)
+    logger.warning(
+        f'Сбой {error!r}, попытка {attempt + 1} из {attempts}, '
+        f'повтор через {delay:.1f} с'
+    )
+    return delay
+
+
+def call_with_retry(func, *args, breaker=None, backoff=None,
+                    attempts=RETRY_ATTEMPTS, is_retryable=is_transient,
+                    sleep=time.sleep):
+    """Вызывает func с повторами и учётом размыкателя цепи."""
+    backoff = backoff or Backoff()
+    for attempt in range(attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = func(*args)
+        except Exception as error:
+            delay = _on_failure(
+                error, attempt, attempts, breaker, backoff, is_retryable
+            )
+            if delay is None:
+                raise
+            sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+async def call_with_retry_async(func, *args, breaker=None, backoff=None,
+                                attempts=RETRY_ATTEMPTS,
+                                is_retryable=is_transient):
+    """Асинхронный вариант call_with_retry для корутин."""
+    import asyncio
+
+    backoff = backoff or Backoff()
+    for attempt in range(attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await func(*args)
+        except Exception as error:
+            delay = _on_failure(
+                error, attempt, attempts, breaker, backoff, is_retryable
+            )
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+
+PRACTICUM_BREAKER = CircuitBreaker('practicum')
+TELEGRAM_BREAKER = CircuitBreaker('telegram')
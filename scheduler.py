@@ -0,0 +1,103 @@
+import random
+import time
+
+from config import CONFIG
+
+BASE_INTERVAL = 600
+MIN_POLL_INTERVAL = CONFIG.min_poll_interval
+MAX_POLL_INTERVAL = CONFIG.max_poll_interval
+POLL_JITTER = CONFIG.poll_jitter
+
+STATUS_INTERVALS = {
+    'reviewing': 120,
+    'rejected': 600,
+    'approved': 1800,
+}
+NIGHT_HOURS = range(0, 7)
+NIGHT_FACTOR = 3
+CHANGE_DECAY = 0.5
+
+
+class AdaptiveScheduler:
+    """Планирует опрос каждой подписки с собственным интервалом.
+
+    Интервал зависит от последнего статуса работы, времени суток и
+    частоты недавних изменений, ограничен min/max и размыт джиттером,
+    чтобы запросы разных аккаунтов не совпадали по времени.
+    """
+
+    def __init__(self, base_interval=BASE_INTERVAL,
+                 min_interval=MIN_POLL_INTERVAL,
+                 max_interval=MAX_POLL_INTERVAL, jitter=POLL_JITTER,
+                 clock=time.time, rand=random.random):
+        """Задаёт границы интервала, джиттер и источники времени."""
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.clock = clock
+        self.rand = rand
+        self.due_at = {}
+        self.last_status = {}
+        self.change_rate = {}
+        self.change_count = {}
+        self.paused = set()
+
+    def observe(self, key, cache):
+        """Учитывает результат опроса подписки и планирует следующий."""
+        changes = cache.change_count - self.change_count.get(key, 0)
+        self.change_count[key] = cache.change_count
+        self.change_rate[key] = (
+            self.change_rate.get(key, 0.0) * CHANGE_DECAY + changes
+        )
+        self.last_status[key] = cache.last_status
+        now = self.clock()
+        self.due_at[key] = now + self.interval(key, now)
+
+    def interval(self, key, now):
+        """Рассчитывает интервал до следующего опроса подписки."""
+        interval = STATUS_INTERVALS.get(
+            self.last_status.get(key), self.base_interval
+        )
+        if time.localtime(now).tm_hour in NIGHT_HOURS:
+            interval *= NIGHT_FACTOR
+        interval /= 1 + self.change_rate.get(key, 0.0)
+        interval *= 1 + self.jitter * (2 * self.rand() - 1)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def postpone(self, key, delay):
+        """Откладывает опрос подписки на delay секунд от текущего момента."""
+        self.due_at[key] = self.clock() + delay
+
+    def pause(self, key):
+        """Приостанавливает опрос подписки до resume()."""
+        self.paused.add(key)
+
+    def resume(self, key):
+        """Возобновляет опрос подписки."""
+        self.paused.discard(key)
+
+    def due(self, keys):
+        """Возвращает ключи подписок, которые пора опросить."""
+        now = self.clock()
+        return [
+            key for key in keys
+            if key not in self.paused and self.due_at.get(key, now) <= now
+        ]
+
+    def sleep_time(self):
+        """Секунды до ближайшего запланированного опроса.
+        Пока есть приостановленные подписки, сон не дольше min_interval,
+        чтобы возобновлённая подписка не ждала чужого интервала.
+        """
+        waiting = [
+            at for key, at in list(self.due_at.items())
+            if key not in self.paused
+        ]
+        if waiting:
+            delay = max(min(waiting) - self.clock(), 0.0)
+        else:
+            delay = self.max_interval if self.paused else 0.0
+        if self.paused:
+            delay = min(delay, self.min_interval)
+        return delay
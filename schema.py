@@ -0,0 +1,104 @@
+import json
+import logging
+from collections import namedtuple
+
+from exceptions import ResponseIsNone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+HOMEWORK_FIELDS = (
+    'id', 'homework_name', 'status', 'date_updated',
+    'reviewer_comment', 'lesson_name',
+)
+
+
+class Homework(namedtuple('Homework', HOMEWORK_FIELDS)):
+    """Проверенная запись о работе из ответа API."""
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """Ключ работы: id, а при его отсутствии — название."""
+        return self.homework_name if self.id is None else self.id
+
+
+def _fallback_loads():
+    """Декодер без orjson: simplejson, если он установлен, иначе json."""
+    try:
+        import simplejson
+    except ImportError:
+        return json.loads
+    return simplejson.loads
+
+
+loads = orjson.loads if orjson is not None else _fallback_loads()
+
+
+def decode(http_response):
+    """Разбирает тело HTTP ответа самым быстрым доступным декодером.
+    У объектов без буфера content вызывается их собственный json().
+    """
+    content = getattr(http_response, 'content', None)
+    if content is None:
+        return http_response.json()
+    return loads(content)
+
+
+def validate_response(response):
+    """Проверяет структуру ответа API и возвращает список работ."""
+    if type(response) is not dict:
+        if response is None:
+            logger.error('response пришел пустым.')
+            raise ResponseIsNone
+        if not isinstance(response, dict):
+            logger.error('Некорректный тип данных response на входе')
+            raise TypeError('Некорректный тип данных response на входе')
+    try:
+        homeworks = response['homeworks']
+    except KeyError:
+        logger.error('По ключу homeworks ничего нет')
+        raise KeyError('Ошибка с ключем homeworks')
+    if type(homeworks) is list:
+        return homeworks
+    if not homeworks:
+        return []
+    logger.error('По ключу homework данные не ввиде списка')
+    raise TypeError('По ключу homework данные не ввиде списка')
+
+
+def to_record(homework, statuses):
+    """Проверяет работу и превращает её в запись Homework."""
+    get = homework.get
+    try:
+        name = homework['homework_name']
+        status = homework['status']
+    except KeyError as error:
+        logger.error(
+            f'По ключу {error} ничего нет', extra={'homework': get('id')}
+        )
+        raise KeyError(f'Ошибка с ключем {error.args[0]}')
+    if status not in statuses:
+        logger.error(
+            f'Неизвестный статус {status}', extra={'homework': get('id')}
+        )
+        raise KeyError('Ошибка с ключем homework_status')
+    return Homework(
+        get('id'), name, status, get('date_updated'),
+        get('reviewer_comment'), get('lesson_name'),
+    )
+
+
+def parse_response(response, statuses):
+    """Проверяет ответ API за один проход и возвращает записи Homework."""
+    homeworks = validate_response(response)
+    try:
+        return [to_record(homework, statuses) for homework in homeworks]
+    except AttributeError:
+        logger.error('Работа в ответе не является словарём')
+        raise TypeError('Работа в ответе не является словарём')
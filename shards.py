@@ -0,0 +1,331 @@
+"""Шардирование подписок по нескольким процессам бота.
+
+Супервизор распределяет подписки реестра по N процессам с помощью
+консистентного хеширования токенов, перераспределяет их при добавлении
+и удалении процессов и перезапускает упавшие. Каждый процесс — обычный
+homework.py, которому в окружении передан номер шарда и состав кольца.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
+import logs
+import metrics
+import outbox
+import rate_limit
+from config import CONFIG
+from retry import Backoff
+from subscriptions import SQLITE_SUFFIXES, load_subscriptions
+
+SHARDS = CONFIG.shards
+RING_REPLICAS = CONFIG.ring_replicas
+SHARD_POLL_MODE = CONFIG.shard_poll_mode
+SHARD_STOP_TIMEOUT = CONFIG.shard_stop_timeout
+RESTART_RESET = 60.0
+CHECK_INTERVAL = 1.0
+WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'homework.py'
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HashRing:
+    """Консистентное хеширование ключей по узлам.
+
+    Каждый узел занимает replicas точек на кольце. При добавлении узла
+    ему переходит примерно 1/N ключей, при удалении его ключи
+    расходятся по остальным, а прочие ключи остаются на своих узлах.
+    """
+
+    def __init__(self, nodes=(), replicas=RING_REPLICAS):
+        """Строит кольцо из узлов nodes."""
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def hash(value):
+        """Точка на кольце, одинаковая во всех процессах."""
+        digest = hashlib.md5(str(value).encode()).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    @property
+    def nodes(self):
+        """Узлы кольца по возрастанию."""
+        return sorted(set(self._owners.values()))
+
+    def add(self, node):
+        """Добавляет узел на кольцо."""
+        for replica in range(self.replicas):
+            point = self.hash(f'{node}#{replica}')
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+            self._owners[point] = node
+
+    def remove(self, node):
+        """Убирает узел с кольца."""
+        for replica in range(self.replicas):
+            point = self.hash(f'{node}#{replica}')
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                self._points.remove(point)
+
+    def node_for(self, key):
+        """Узел, которому принадлежит ключ."""
+        if not self._points:
+            raise LookupError('На кольце нет узлов')
+        index = bisect.bisect(self._points, self.hash(key))
+        return self._owners[self._points[index % len(self._points)]]
+
+    def assign(self, subscriptions):
+        """Ключи подписок каждого узла. Подписки одного токена вместе."""
+        assignment = {node: set() for node in self.nodes}
+        for subscription in subscriptions:
+            assignment[self.node_for(subscription.token)].add(
+                subscription.key
+            )
+        return {node: frozenset(keys) for node, keys in assignment.items()}
+
+
+def select(subscriptions, shard, nodes, replicas=RING_REPLICAS):
+    """Подписки, которые кольцо из nodes отдаёт шарду shard."""
+    ring = HashRing(nodes, replicas)
+    return [
+        subscription for subscription in subscriptions
+        if ring.node_for(subscription.token) == shard
+    ]
+
+
+def shard_path(path, shard):
+    """Путь к отдельному файлу шарда: state.json -> state.shard1.json."""
+    root, ext = os.path.splitext(path)
+    return f'{root}.shard{shard}{ext}'
+
+
+@dataclass
+class Worker:
+    """Процесс одного шарда и его история перезапусков."""
+
+    keys: frozenset
+    environ: dict
+    process: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    crashes: int = 0
+    restart_at: float = 0.0
+
+
+class Supervisor:
+    """Запускает шарды, перераспределяет подписки и поднимает упавшие.
+
+    SIGHUP перечитывает реестр, SIGTTIN добавляет шард, SIGTTOU убирает
+    последний. Перераспределение останавливает только шарды, у которых
+    изменился набор подписок или окружение: они досылают сообщения и
+    сохраняют чекпоинт, после чего запускаются с новым набором.
+    """
+
+    def __init__(self, registry, count=SHARDS, replicas=RING_REPLICAS,
+                 command=None, environ=None, backoff=None,
+                 stop_timeout=SHARD_STOP_TIMEOUT):
+        """Готовит кольцо из count шардов для реестра registry."""
+        self.registry = registry
+        self.ring = HashRing(range(count), replicas)
+        self.command = command or [sys.executable, WORKER_SCRIPT]
+        self.environ = dict(os.environ if environ is None else environ)
+        self.backoff = backoff or Backoff(maximum=RESTART_RESET)
+        self.stop_timeout = stop_timeout
+        self.workers = {}
+        self.actions = deque()
+
+    def environment(self, shard):
+        """Окружение процесса шарда.
+
+        Общие лимиты запросов делятся между шардами, а лог, журнал
+        очереди, порт метрик и JSON-чекпоинт у каждого шарда свои.
+        SQLite-чекпоинт общий: после перераспределения подписка
+        продолжает с даты, сохранённой прежним шардом. Команды из чатов
+        в шардах выключены: getUpdates одного бота может читать только
+        один процесс, а шард не знает чужих подписок.
+        """
+        count = len(self.ring.nodes)
+        environ = dict(self.environ)
+        environ.pop('TELEGRAM_COMMANDS', None)
+        environ.update({
+            'POLL_MODE': SHARD_POLL_MODE,
+            'SHARD': str(shard),
+            'SHARD_NODES': ','.join(map(str, self.ring.nodes)),
+            'RING_REPLICAS': str(self.ring.replicas),
+            'PRACTICUM_RATE': str(rate_limit.PRACTICUM_RATE / count),
+            'PRACTICUM_BURST': str(
+                max(rate_limit.PRACTICUM_BURST // count, 1)
+            ),
+            'TELEGRAM_RATE': str(rate_limit.TELEGRAM_RATE / count),
+            'TELEGRAM_BURST': str(
+                max(rate_limit.TELEGRAM_BURST // count, 1)
+            ),
+            'LOG_FILE': shard_path(logs.LOG_FILE, shard),
+        })
+        if outbox.OUTBOX_JOURNAL:
+            environ['OUTBOX_JOURNAL'] = shard_path(
+                outbox.OUTBOX_JOURNAL, shard
+            )
+        if metrics.METRICS_PORT:
+            environ['METRICS_PORT'] = str(int(metrics.METRICS_PORT) + shard)
+        checkpoint_file = environ.get('CHECKPOINT_FILE')
+        if checkpoint_file and not checkpoint_file.endswith(SQLITE_SUFFIXES):
+            environ['CHECKPOINT_FILE'] = shard_path(checkpoint_file, shard)
+        return environ
+
+    def start(self, shard, worker):
+        """Запускает процесс шарда."""
+        worker.process = subprocess.Popen(self.command, env=worker.environ)
+        worker.started_at = time.monotonic()
+        self.workers[shard] = worker
+        logger.info(
+            f'Шард {shard} запущен, pid {worker.process.pid}, '
+            f'подписок {len(worker.keys)}'
+        )
+
+    def stop_workers(self, shards, timeout=None):
+        """Останавливает шарды по SIGTERM, не дождавшиеся — по SIGKILL."""
+        timeout = self.stop_timeout if timeout is None else timeout
+        processes = []
+        for shard in shards:
+            process = self.workers.pop(shard).process
+            if process is not None and process.poll() is None:
+                process.terminate()
+                processes.append((shard, process))
+        deadline = time.monotonic() + timeout
+        for shard, process in processes:
+            try:
+                process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                logger.warning(f'Шард {shard} не остановился за {timeout:g} с')
+                process.kill()
+                process.wait()
+
+    def rebalance(self):
+        """Распределяет подписки реестра по шардам кольца."""
+        assignment = self.ring.assign(load_subscriptions(self.registry))
+        planned = {
+            shard: Worker(keys, self.environment(shard))
+            for shard, keys in assignment.items() if keys
+        }
+        changed = [
+            shard for shard, worker in self.workers.items()
+            if shard not in planned
+            or (worker.keys, worker.environ) != (
+                planned[shard].keys, planned[shard].environ
+            )
+        ]
+        self.stop_workers(changed)
+        for shard, worker in planned.items():
+            if shard not in self.workers:
+                self.start(shard, worker)
+        logger.info(
+            f'Подписки распределены по {len(planned)} шардам, '
+            f'перезапущено {len(changed)}'
+        )
+
+    def add_shard(self):
+        """Добавляет шард и перераспределяет подписки."""
+        nodes = self.ring.nodes
+        self.ring.add(max(nodes, default=-1) + 1)
+        self.rebalance()
+
+    def remove_shard(self):
+        """Убирает последний шард и перераспределяет подписки."""
+        nodes = self.ring.nodes
+        if len(nodes) <= 1:
+            logger.warning('Последний шард не удаляется')
+            return
+        self.ring.remove(nodes[-1])
+        self.rebalance()
+
+    def check(self):
+        """Перезапускает упавшие шарды с нарастающей паузой."""
+        now = time.monotonic()
+        for shard, worker in list(self.workers.items()):
+            if worker.process is None:
+                if now >= worker.restart_at:
+                    self.start(shard, worker)
+                continue
+            code = worker.process.poll()
+            if code is None:
+                continue
+            if now - worker.started_at >= RESTART_RESET:
+                worker.crashes = 0
+            delay = self.backoff.delay(worker.crashes)
+            logger.error(
+                f'Шард {shard} завершился с кодом {code}, '
+                f'перезапуск через {delay:.1f} с'
+            )
+            worker.process = None
+            worker.crashes += 1
+            worker.restart_at = now + delay
+
+    def install_signal_handlers(self):
+        """SIGHUP, SIGTTIN и SIGTTOU ставят действие в очередь цикла."""
+        handlers = {
+            signal.SIGHUP: self.rebalance,
+            signal.SIGTTIN: self.add_shard,
+            signal.SIGTTOU: self.remove_shard,
+        }
+        for signum, action in handlers.items():
+            signal.signal(signum, partial(self.request, action))
+
+    def request(self, action, signum=None, frame=None):
+        """Ставит действие в очередь: его выполнит цикл run()."""
+        self.actions.append(action)
+
+    def perform(self, action):
+        """Выполняет действие из очереди, не останавливая шарды при ошибке.
+
+        Реестр читается до остановки шардов, поэтому, если он испорчен
+        или недоступен, шарды продолжают работать с прежними подписками.
+        """
+        try:
+            action()
+        except Exception as error:
+            logger.error(
+                f'Не удалось перераспределить подписки: {error}, '
+                'шарды работают с прежним распределением'
+            )
+
+    def run(self, stop, check_interval=CHECK_INTERVAL):
+        """Держит шарды запущенными до stop, затем останавливает их."""
+        self.rebalance()
+        try:
+            while not stop.wait(check_interval):
+                while self.actions:
+                    self.perform(self.actions.popleft())
+                self.check()
+        finally:
+            logger.info('Остановка шардов')
+            self.stop_workers(list(self.workers))
+
+
+def main():
+    """Точка входа режима шардов."""
+    import homework
+
+    if homework.SUBSCRIPTIONS_FILE is None:
+        logger.error('Режиму шардов нужен реестр SUBSCRIPTIONS_FILE')
+        return
+    stop = threading.Event()
+    homework.install_signal_handlers(stop)
+    supervisor = Supervisor(homework.SUBSCRIPTIONS_FILE)
+    supervisor.install_signal_handlers()
+    supervisor.run(stop)
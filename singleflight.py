@@ -0,0 +1,109 @@
+"""Объединение одновременных одинаковых запросов к API.
+
+Если за одним аккаунтом Практикума следят несколько чатов, их опросы
+с одним ключом, пришедшие пока первый запрос ещё выполняется, не
+уходят в API, а ждут его результата. Результат или исключение первого
+запроса получают все ожидающие.
+
+Объединяются только одновременные запросы, поэтому это работает
+в режимах threads и async. В режимах sync и once подписки опрашиваются
+по очереди, и каждый запрос уходит в API отдельно.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import metrics
+from config import CONFIG
+
+SINGLEFLIGHT_BUCKET = CONFIG.singleflight_bucket
+
+
+def bucket(timestamp, size=SINGLEFLIGHT_BUCKET):
+    """Начало интервала from_date, запросы из которого объединяются.
+    Запрос делается с началом интервала, поэтому охватывает from_date
+    каждого ожидающего: более ранние статусы отсеет кеш подписки.
+    С size=0 объединяются только запросы с точно совпадающим from_date.
+    """
+    timestamp = int(timestamp or time.time())
+    if size <= 0:
+        return timestamp
+    return timestamp - timestamp % size
+
+
+@dataclass
+class Call:
+    """Выполняющийся запрос и его итог для ожидающих."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одним ключом в один для потоков.
+
+    do() возвращает пару (результат, shared), где shared=True означает,
+    что результат получен чужим вызовом.
+    """
+
+    def __init__(self, name):
+        """Создаёт пустую группу вызовов с именем для метрик."""
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Вызывает func или дожидается одновременного вызова с key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            metrics.SINGLEFLIGHT_SHARED.inc(service=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """То же для корутин одного цикла событий asyncio.
+
+    Запрос выполняется отдельной задачей: отмена одного ожидающего
+    не прерывает ответ для остальных.
+    """
+
+    def __init__(self, name):
+        """Создаёт пустую группу вызовов с именем для метрик."""
+        self.name = name
+        self._calls = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        """Ждёт корутину func или одновременный вызов с тем же key."""
+        import asyncio
+
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            metrics.SINGLEFLIGHT_SHARED.inc(service=self.name)
+        else:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._calls.pop(key, None))
+        return await asyncio.shield(task), shared
+
+
+PRACTICUM_FLIGHTS = SingleFlight('practicum')
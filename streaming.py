@@ -0,0 +1,150 @@
+import codecs
+import json
+import logging
+
+import schema
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = ' \t\n\r'
+
+
+class HomeworkStream:
+    """Потоковый разбор ответа API без загрузки тела в память целиком.
+
+    Итерация отдаёт работы из массива homeworks по мере чтения кусков
+    тела. Остальные ключи верхнего уровня (current_date) доступны
+    через stream['current_date'] после окончания итерации.
+    """
+
+    def __init__(self, chunks, close=None, headers=None):
+        """Принимает итератор кусков тела ответа в байтах."""
+        self.chunks = iter(chunks)
+        self.close = close
+        self.headers = headers or {}
+        self.meta = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+
+    def __getitem__(self, key):
+        """Значение ключа верхнего уровня, кроме homeworks."""
+        return self.meta[key]
+
+    def __iter__(self):
+        """Отдаёт работы из массива homeworks по одной."""
+        if self._consumed:
+            raise RuntimeError('Поток ответа уже прочитан')
+        self._consumed = True
+        try:
+            yield from self._parse()
+        finally:
+            if self.close is not None:
+                self.close()
+
+    def records(self, statuses):
+        """Отдаёт проверенные записи Homework по одной."""
+        for homework in self:
+            if not isinstance(homework, dict):
+                logger.error('Работа в ответе не является словарём')
+                raise TypeError('Работа в ответе не является словарём')
+            yield schema.to_record(homework, statuses)
+
+    def _fill(self):
+        """Дочитывает следующий кусок тела. False, если тело кончилось."""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self._eof = True
+            self._buffer += self._utf8.decode(b'', final=True)
+            return False
+        self._buffer += self._utf8.decode(chunk)
+        return True
+
+    def _peek(self):
+        """Первый непробельный символ или '' в конце тела."""
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(
+                f'Ожидался символ {char!r} в позиции {self._pos}'
+            )
+        self._pos += 1
+
+    def _value(self):
+        """Читает одно JSON значение, дочитывая тело при необходимости."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(
+                    self._buffer, self._pos
+                )
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end < len(self._buffer) or self._eof or not self._fill():
+                self._pos = end
+                return value
+
+    def _parse(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                self._expect(':')
+                if key == 'homeworks' and self._peek() == '[':
+                    yield from self._array()
+                    self.meta['homeworks'] = []
+                else:
+                    self.meta[key] = self._value()
+                if self._peek() == ',':
+                    self._pos += 1
+                    continue
+                self._expect('}')
+                break
+        if 'homeworks' not in self.meta:
+            logger.error('По ключу homeworks ничего нет')
+            raise KeyError('Ошибка с ключем homeworks')
+        schema.validate_response(self.meta)
+
+    def _array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect(']')
+            return
+
+
+def iter_chunks(http_response, chunk_size=STREAM_CHUNK_SIZE):
+    """Куски тела ответа requests/httpx."""
+    if hasattr(http_response, 'iter_content'):
+        return http_response.iter_content(chunk_size)
+    return http_response.iter_bytes(chunk_size)
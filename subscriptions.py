@@ -0,0 +1,97 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+@dataclass
+class Subscription:
+    """Подписка: токен Практикума, чат Telegram и последняя отметка времени.
+    locale — язык сообщений чата, None означает язык по умолчанию.
+    paused — опрос приостановлен командой /pause.
+    """
+
+    token: str
+    chat_id: str
+    current_date: int = 0
+    locale: Optional[str] = None
+    paused: bool = False
+
+    @property
+    def account(self):
+        """Идентификатор аккаунта Практикума без раскрытия токена."""
+        return hashlib.sha1(str(self.token).encode()).hexdigest()[:8]
+
+    @property
+    def key(self):
+        """Идентификатор подписки для логов и хранилищ без раскрытия токена."""
+        return f'{self.chat_id}:{self.account}'
+
+    @property
+    def headers(self):
+        """Заголовки авторизации для запроса к API Практикума."""
+        return {'Authorization': f'OAuth {self.token}'}
+
+
+def _from_record(record):
+    """Создаёт подписку из словаря, прочитанного из файла."""
+    if 'token' not in record or 'chat_id' not in record:
+        logger.error('В подписке нет ключей token и chat_id')
+        raise KeyError('Ошибка с ключами token/chat_id подписки')
+    return Subscription(
+        token=record['token'],
+        chat_id=record['chat_id'],
+        current_date=int(record.get('current_date') or 0),
+        locale=record.get('locale'),
+    )
+
+
+def load_json(path):
+    """Загружает подписки из JSON-файла со списком объектов."""
+    with open(path, encoding='utf-8') as file:
+        records = json.load(file)
+    if not isinstance(records, list):
+        logger.error('Файл подписок должен содержать список')
+        raise TypeError('Файл подписок должен содержать список')
+    return [_from_record(record) for record in records]
+
+
+def load_sqlite(path):
+    """Загружает подписки из таблицы subscriptions базы SQLite.
+    Колонка locale необязательна.
+    """
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    try:
+        columns = {
+            row[1] for row in
+            connection.execute('PRAGMA table_info(subscriptions)')
+        }
+        locale = 'locale' if 'locale' in columns else 'NULL'
+        rows = connection.execute(
+            f'SELECT token, chat_id, "current_date", {locale} '
+            'FROM subscriptions'
+        ).fetchall()
+    finally:
+        connection.close()
+    return [
+        Subscription(token=token, chat_id=chat_id,
+                     current_date=int(current_date or 0), locale=locale)
+        for token, chat_id, current_date, locale in rows
+    ]
+
+
+def load_subscriptions(path):
+    """Загружает реестр подписок из JSON-файла или базы SQLite."""
+    if str(path).endswith(SQLITE_SUFFIXES):
+        subscriptions = load_sqlite(path)
+    else:
+        subscriptions = load_json(path)
+    logger.info(f'Загружено подписок: {len(subscriptions)}')
+    return subscriptions
@@ -0,0 +1,122 @@
+import json
+import logging
+from string import Formatter
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = {
+    'ru': {
+        'message': (
+            'Изменился статус проверки работы "{homework_name}"{lesson}.\n'
+            '{comment}{verdict}'
+        ),
+        'lesson': ' ({lesson_name})',
+        'comment': 'Комментарий ревьюера: {reviewer_comment}\n',
+    },
+    'en': {
+        'message': (
+            'Review status of "{homework_name}"{lesson} has changed.\n'
+            '{comment}{verdict}'
+        ),
+        'lesson': ' ({lesson_name})',
+        'comment': 'Reviewer comment: {reviewer_comment}\n',
+        'statuses': {
+            'approved': 'The reviewer liked everything. Hooray!',
+            'reviewing': 'The reviewer has started checking your work.',
+            'rejected': 'The reviewer has some remarks.',
+        },
+    },
+}
+TEMPLATE_FIELDS = {
+    'message': {'homework_name', 'lesson', 'comment', 'verdict'},
+    'lesson': {'lesson_name'},
+    'comment': {'reviewer_comment'},
+}
+
+
+def check_fields(template, allowed, name):
+    """Проверяет, что шаблон использует только известные поля."""
+    for _, field, _, _ in Formatter().parse(template):
+        if field is not None and field not in allowed:
+            logger.error(f'Неизвестное поле {field} в шаблоне {name}')
+            raise ValueError(f'Неизвестное поле {field} в шаблоне {name}')
+
+
+class CompiledTemplate:
+    """Шаблон сообщения для одного языка и статуса.
+
+    Вердикт подставлен заранее, а текст превращён в связанные методы
+    str.format, так что отрисовка — это один-три вызова format.
+    """
+
+    __slots__ = ('message', 'lesson', 'comment')
+
+    def __init__(self, templates, verdict):
+        """Подставляет вердикт и запоминает методы форматирования."""
+        escaped = verdict.replace('{', '{{').replace('}', '}}')
+        self.message = templates['message'].format(
+            homework_name='{homework_name}', lesson='{lesson}',
+            comment='{comment}', verdict=escaped
+        ).format
+        self.lesson = templates['lesson'].format
+        self.comment = templates['comment'].format
+
+    def render(self, homework):
+        """Текст сообщения о новом статусе работы."""
+        lesson_name = homework.lesson_name
+        reviewer_comment = homework.reviewer_comment
+        return self.message(
+            homework_name=homework.homework_name,
+            lesson=self.lesson(lesson_name=lesson_name) if lesson_name else '',
+            comment=(
+                self.comment(reviewer_comment=reviewer_comment)
+                if reviewer_comment else ''
+            ),
+        )
+
+
+class TemplateRegistry:
+    """Скомпилированные шаблоны сообщений по языкам и статусам.
+
+    Шаблоны проверяются и компилируются один раз при создании. Вердикты,
+    которых нет в языке, берутся из statuses языка по умолчанию.
+    """
+
+    def __init__(self, templates, statuses, default_locale='ru'):
+        """Компилирует шаблоны всех языков."""
+        if default_locale not in templates:
+            raise ValueError(f'Нет шаблонов для языка {default_locale}')
+        self.default_locale = default_locale
+        self.compiled = {}
+        for locale, locale_templates in templates.items():
+            for name, allowed in TEMPLATE_FIELDS.items():
+                check_fields(locale_templates[name], allowed, name)
+            verdicts = {**statuses, **locale_templates.get('statuses', {})}
+            self.compiled[locale] = {
+                status: CompiledTemplate(locale_templates, verdicts[status])
+                for status in statuses
+            }
+        self.default = self.compiled[default_locale]
+
+    @property
+    def locales(self):
+        """Языки, для которых есть шаблоны."""
+        return set(self.compiled)
+
+    def render(self, homework, locale=None):
+        """Текст сообщения о работе на языке чата."""
+        templates = self.compiled.get(locale, self.default)
+        return templates[homework.status].render(homework)
+
+
+def load_templates(path=None):
+    """Встроенные шаблоны, дополненные шаблонами из JSON-файла."""
+    templates = {locale: dict(items) for locale, items in TEMPLATES.items()}
+    if path is None:
+        return templates
+    with open(path, encoding='utf-8') as file:
+        extra = json.load(file)
+    for locale, items in extra.items():
+        templates[locale] = {**templates.get(locale, TEMPLATES['ru']), **items}
+    logger.info(f'Загружены шаблоны сообщений для языков: {sorted(extra)}')
+    return templates
@@ -1,3 +1,4 @@
+import json
 import random
 from datetime import datetime
 
@@ -19,3 +20,27 @@ def current_timestamp():
 @pytest.fixture
 def api_url():
     return 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+
+def generate_history(count, chunk_size=64 * 1024, current_date=1):
+    """Лениво отдаёт тело ответа API с count работами кусками байт."""
+    buffer = b'{"homeworks": ['
+    for index in range(count):
+        item = json.dumps({
+            'id': index,
+            'homework_name': f'username__hw{index}.zip',
+            'status': ('approved', 'rejected', 'reviewing')[index % 3],
+            'date_updated': '2022-01-10T12:00:00Z',
+            'reviewer_comment': 'Комментарий ревьюера ' * 5,
+            'lesson_name': f'Спринт {index}',
+        }, ensure_ascii=False).encode()
+        buffer += (b', ' if index else b'') + item
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[chunk_size:]
+    yield buffer + f'], "current_date": {current_date}}}'.encode()
+
+
+@pytest.fixture
+def large_history():
+    return generate_history
@@ -0,0 +1,48 @@
+import homework
+from alerts import ErrorAggregator, fingerprint
+from exceptions import CustomStatusesError
+from response_cache import ResponseCache
+from subscriptions import Subscription
+
+
+class TestErrorAggregator:
+
+    def test_fingerprint_normalizes(self):
+        assert fingerprint(CustomStatusesError(503)) == (
+            'CustomStatusesError:503'
+        )
+        assert fingerprint(ValueError('timeout after 12 s')) == (
+            fingerprint(ValueError('timeout after 15 s'))
+        )
+
+    def test_repeats_suppressed_and_resolved(self):
+        now = [0]
+        alerts = ErrorAggregator(clock=lambda: now[0])
+        assert alerts.on_error('a', CustomStatusesError(500))
+        now[0] = 600
+        assert alerts.on_error('a', CustomStatusesError(500)) is None, (
+            'Повторная одинаковая ошибка не должна отправляться'
+        )
+        now[0] = 1200
+        resolved = alerts.on_success('a')
+        assert '2 сбоев' in resolved and '20 мин' in resolved, (
+            'После восстановления отправляется итог серии ошибок'
+        )
+        assert alerts.on_success('a') is None
+
+    def test_new_error_type_reported(self):
+        alerts = ErrorAggregator()
+        alerts.on_error('a', CustomStatusesError(500))
+        assert alerts.on_error('a', CustomStatusesError(404))
+
+    def test_poll_subscription_uses_aggregator(self, monkeypatch):
+        def failing(*args):
+            raise CustomStatusesError(502)
+
+        monkeypatch.setattr(homework, 'request_homework_statuses', failing)
+        subscription = Subscription('token', 1)
+        alerts = ErrorAggregator()
+        cache = ResponseCache()
+        first = homework.poll_subscription(subscription, cache, alerts)
+        second = homework.poll_subscription(subscription, cache, alerts)
+        assert len(first) == 1 and second == []
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import async_poller
+import homework
+import schema
+from subscriptions import Subscription
+
+
+class StubBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class TestAsyncPoller:
+
+    def test_poll_sends_messages(self, monkeypatch, random_timestamp):
+        def request_statuses(headers, current_timestamp, cache=None,
+                             stream=None):
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            }
+
+        monkeypatch.setattr(
+            homework, 'request_homework_statuses', request_statuses
+        )
+        bot = StubBot()
+        subscriptions = [Subscription('token', chat_id) for chat_id in (1, 2)]
+        poller = async_poller.AsyncPoller(subscriptions, bot)
+
+        async def run():
+            task = asyncio.ensure_future(poller.run())
+            await asyncio.sleep(0.2)
+            poller.stop()
+            await task
+
+        asyncio.run(run())
+        assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2], (
+            'Проверьте, что асинхронный режим отправляет сообщения в чаты'
+        )
+        assert all(s.current_date == random_timestamp for s in subscriptions)
+
+    def test_bounded_concurrency_and_fast_stop(self, monkeypatch):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def request_statuses(headers, current_timestamp, cache=None,
+                             stream=None):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return {'homeworks': [], 'current_date': 1}
+
+        monkeypatch.setattr(
+            homework, 'request_homework_statuses', request_statuses
+        )
+        subscriptions = [Subscription('token', i) for i in range(20)]
+        poller = async_poller.AsyncPoller(
+            subscriptions, StubBot(), concurrency=3
+        )
+
+        async def run():
+            task = asyncio.ensure_future(poller.run())
+            await asyncio.sleep(0.5)
+            started = time.monotonic()
+            poller.stop()
+            await task
+            return time.monotonic() - started
+
+        stopped_in = asyncio.run(run())
+        assert max(peak) <= 3, (
+            'Проверьте, что число одновременных запросов ограничено'
+        )
+        assert stopped_in < 1, 'Остановка должна занимать меньше секунды'
+
+    def test_shared_response_parsed_once(self, monkeypatch):
+        parsed = []
+        fetched = []
+        loads = schema.loads
+
+        def counting_loads(body):
+            parsed.append(body)
+            return loads(body)
+
+        async def fetch(subscription, cache, from_date=None):
+            fetched.append(subscription.key)
+            await asyncio.sleep(0.05)
+            return 200, {'ETag': '"1"'}, (
+                b'{"homeworks": [], "current_date": 5}'
+            )
+
+        monkeypatch.setattr(schema, 'loads', counting_loads)
+        subscriptions = [Subscription('token', chat) for chat in (1, 2, 3)]
+        poller = async_poller.AsyncPoller(
+            subscriptions, StubBot(), session=object()
+        )
+        monkeypatch.setattr(poller, 'fetch', fetch)
+
+        async def run():
+            return await asyncio.gather(*(
+                poller.get_api_answer(item) for item in subscriptions
+            ))
+
+        results = asyncio.run(run())
+        assert len(fetched) == 1 and len(parsed) == 1, (
+            'Ответ, полученный лидером, разбирается один раз'
+        )
+        assert all(result is results[0] for result in results)
+        assert {cache.etag for cache in poller.caches.values()} == {'"1"'}
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+import homework
+from benchmarks.fakes import FakePracticum
+from benchmarks.load import fake_endpoint, run_load, unlimited_rates
+
+STATUSES = tuple(homework.HOMEWORK_STATUSES)
+
+
+@pytest.fixture
+def practicum(monkeypatch):
+    server = FakePracticum()
+    server.add_account('bench', homeworks=20)
+    url = server.start()
+    monkeypatch.setattr(
+        homework, 'HEADERS', {'Authorization': 'OAuth bench'}
+    )
+    with unlimited_rates(), fake_endpoint(url):
+        yield server
+    server.stop()
+
+
+@pytest.fixture
+def response():
+    return {
+        'homeworks': [
+            {
+                'id': number, 'homework_name': f'hw{number}.zip',
+                'status': STATUSES[number % len(STATUSES)],
+                'reviewer_comment': 'Всё нравится',
+                'lesson_name': 'Итоговый проект',
+            }
+            for number in range(200)
+        ],
+        'current_date': 1,
+    }
+
+
+def test_get_api_answer(benchmark, practicum):
+    result = benchmark(homework.get_api_answer, int(time.time()) - 60)
+    assert len(result['homeworks']) == 20
+
+
+def test_check_response(benchmark, response):
+    assert len(benchmark(homework.check_response, response)) == 200
+
+
+def test_parse_status(benchmark, response):
+    item = response['homeworks'][0]
+    assert benchmark(homework.parse_status, item).startswith('Изменился')
+
+
+def test_main_loop(benchmark):
+    report = benchmark.pedantic(
+        run_load, kwargs={'accounts': 20, 'homeworks': 5, 'cycles': 2},
+        rounds=3
+    )
+    assert report['delivered'] == report['changes']
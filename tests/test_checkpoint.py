@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import checkpoint
+from response_cache import ResponseCache
+from schema import Homework
+from subscriptions import Subscription
+
+HOMEWORK = Homework(5, 'hw', 'approved', 'x', None, None)
+
+
+@pytest.fixture(params=['state.json', 'state.db'])
+def checkpoint_path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+class TestCheckpoint:
+
+    def test_base_store_is_abstract(self, tmp_path):
+        with pytest.raises(TypeError):
+            checkpoint.CheckpointStore(str(tmp_path / 'state'))
+
+    def test_save_and_restore(self, checkpoint_path):
+        subscription = Subscription('token', 1, current_date=100)
+        caches = {subscription.key: ResponseCache()}
+        caches[subscription.key].mark_seen(HOMEWORK)
+        store = checkpoint.open_checkpoint_store(checkpoint_path)
+        checkpoint.save(store, [subscription], caches)
+        store.close()
+
+        restored = Subscription('token', 1, current_date=999)
+        restored_caches = {restored.key: ResponseCache()}
+        store = checkpoint.open_checkpoint_store(checkpoint_path)
+        checkpoint.restore(store, [restored], restored_caches)
+        store.close()
+        assert restored.current_date == 100, (
+            'Проверьте, что current_date восстанавливается после рестарта'
+        )
+        assert not restored_caches[restored.key].is_new(HOMEWORK), (
+            'Отправленные статусы не должны уходить повторно после рестарта'
+        )
+
+    def test_writes_are_batched(self, checkpoint_path):
+        store = checkpoint.open_checkpoint_store(
+            checkpoint_path, flush_interval=3600
+        )
+        store.update('a', {'current_date': 1, 'seen': []})
+        assert not store.flush(), 'Запись должна откладываться до интервала'
+        assert store.flush(force=True)
+        store.update('a', {'current_date': 1, 'seen': []})
+        assert not store.dirty, 'Неизменённое состояние не нужно писать'
+        store.close()
+
+    def test_json_replaced_atomically(self, tmp_path):
+        path = tmp_path / 'state.json'
+        store = checkpoint.open_checkpoint_store(str(path))
+        store.update('a', {'current_date': 1, 'seen': []})
+        store.close()
+        assert json.loads(path.read_text())['a']['current_date'] == 1
+        assert not (tmp_path / 'state.json.tmp').exists()
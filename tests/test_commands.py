@@ -0,0 +1,198 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+import telegram
+
+import checkpoint
+import commands
+import history
+import homework
+import shards
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+from schema import Homework
+from subscriptions import Subscription
+from utils import wait_for
+
+
+class StubBot:
+
+    def __init__(self, *args, **kwargs):
+        self.updates = []
+        self.sent = []
+        self.offsets = []
+        self.failures = 0
+
+    def get_updates(self, offset=None, timeout=0, **kwargs):
+        self.offsets.append(offset)
+        if self.failures:
+            self.failures -= 1
+            raise telegram.error.NetworkError('Нет сети')
+        updates, self.updates = self.updates, []
+        if not updates:
+            time.sleep(0.01)
+        return updates
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def update(update_id, chat_id, text):
+    return SimpleNamespace(
+        update_id=update_id,
+        effective_message=SimpleNamespace(chat_id=chat_id, text=text)
+    )
+
+
+@pytest.fixture
+def listener():
+    subscription = Subscription('token', 1)
+    caches = {subscription.key: ResponseCache()}
+    return commands.CommandListener(
+        StubBot(), [subscription], caches, AdaptiveScheduler()
+    )
+
+
+class TestCommands:
+
+    def test_parse_command(self):
+        assert commands.parse_command('/status@homework_bot now') == (
+            '/status'
+        )
+        assert commands.parse_command('/History') == '/history'
+        assert commands.parse_command('привет') is None
+        assert commands.parse_command(None) is None
+
+    def test_status_from_cache(self, listener):
+        subscription, = listener.chats['1']
+        cache = listener.caches[subscription.key]
+        _, fresh = homework.find_changes(
+            [Homework(1, 'hw.zip', 'approved', '', '', '')], cache
+        )
+        homework.mark_seen(fresh, cache)
+        answer = listener.reply(1, '/status')
+        assert answer.startswith('Последний статус:\n')
+        assert 'hw.zip' in answer
+        assert 'ревьюеру всё понравилось' in answer
+
+    def test_status_from_history(self, listener, tmp_path):
+        assert listener.reply(1, '/status') == (
+            'Статус работы ещё не получен.'
+        )
+        history.configure(str(tmp_path / 'history.db'))
+        try:
+            history._store.record(Subscription('token', 1).account, [
+                Homework(1, 'hw.zip', 'reviewing', '2022-01-10T12:00:00Z',
+                         '', '')
+            ])
+            answer = listener.reply(1, '/status')
+        finally:
+            history.close()
+        assert answer == (
+            'Последний статус «hw.zip» на 10.01.2022 12:00 UTC:\n'
+            'Работа взята на проверку ревьюером.'
+        )
+
+    def test_pause_and_resume(self, listener):
+        subscription, = listener.chats['1']
+        scheduler = listener.scheduler
+        assert listener.reply('1', '/pause').startswith(
+            'Уведомления приостановлены'
+        )
+        assert subscription.paused
+        assert scheduler.due([subscription.key]) == []
+        assert scheduler.sleep_time() <= scheduler.min_interval, (
+            'Пока подписка на паузе, цикл не должен засыпать на час'
+        )
+        assert 'приостановлены' in listener.reply(1, '/status')
+        listener.reply(1, '/resume')
+        assert not subscription.paused
+        assert scheduler.due([subscription.key]) == [subscription.key]
+
+    def test_unknown_chat_and_text_ignored(self, listener):
+        assert listener.reply(2, '/status') is None
+        assert listener.reply(1, 'как дела?') is None
+        assert listener.reply(1, '/start') == commands.HELP
+
+    def test_history(self, listener):
+        assert listener.reply(1, '/history') == 'Журнал статусов не ведётся.'
+
+
+class TestCommandListener:
+
+    def test_replies_concurrently_with_polling(self, listener):
+        bot = listener.bot
+        bot.updates = [update(10, 1, '/pause'), update(11, 2, '/status')]
+        listener.start()
+        try:
+            assert wait_for(lambda: bot.sent)
+            assert wait_for(lambda: 12 in bot.offsets), (
+                'Обработанные обновления подтверждаются смещением'
+            )
+        finally:
+            listener.stop(1)
+        assert not listener._thread.is_alive()
+        assert bot.sent == [
+            (1, 'Уведомления приостановлены. /resume — возобновить.')
+        ]
+
+    def test_network_error_retried(self, listener):
+        listener.backoff = commands.Backoff(base=0)
+        listener.bot.failures = 2
+        listener.bot.updates = [update(1, 1, '/help')]
+        listener.start()
+        try:
+            assert wait_for(lambda: listener.bot.sent)
+        finally:
+            listener.stop(1)
+        assert listener.bot.sent == [(1, commands.HELP)]
+
+
+class TestPausePersisted:
+
+    def test_paused_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.json')
+        subscription = Subscription('token', 1, current_date=5, paused=True)
+        caches = {subscription.key: ResponseCache()}
+        store = checkpoint.open_checkpoint_store(path)
+        checkpoint.save(store, [subscription], caches)
+        store.close()
+        restored = Subscription('token', 1)
+        checkpoint.restore(
+            checkpoint.open_checkpoint_store(path), [restored], caches
+        )
+        assert restored.paused
+        scheduler = AdaptiveScheduler()
+        homework.restore_pauses([restored], scheduler)
+        assert scheduler.due([restored.key]) == []
+
+    def test_paused_not_polled_once(self, monkeypatch, tmp_path):
+        path = str(tmp_path / 'state.json')
+        paused = Subscription('token', 1, current_date=5, paused=True)
+        store = checkpoint.open_checkpoint_store(path)
+        checkpoint.save(store, [paused], {paused.key: ResponseCache()})
+        store.close()
+        requested = []
+        monkeypatch.setattr(
+            homework, 'request_shared',
+            lambda *args, **kwargs: requested.append(args)
+        )
+        monkeypatch.setattr(telegram, 'Bot', StubBot)
+        monkeypatch.setattr(
+            homework, 'install_signal_handlers', lambda stop: None
+        )
+        for name, value in {
+            'PRACTICUM_TOKEN': 'token', 'TELEGRAM_TOKEN': '1:token',
+            'TELEGRAM_CHAT_ID': 1, 'SUBSCRIPTIONS_FILE': None,
+            'CHECKPOINT_FILE': path,
+        }.items():
+            monkeypatch.setattr(homework, name, value)
+        homework.main(once=True)
+        assert requested == [], 'Подписка на паузе не опрашивается и в once'
+
+    def test_shards_do_not_listen_for_commands(self):
+        supervisor = shards.Supervisor(
+            'registry.json', count=2, environ={'TELEGRAM_COMMANDS': '1'}
+        )
+        assert 'TELEGRAM_COMMANDS' not in supervisor.environment(0)
@@ -0,0 +1,128 @@
+import random
+import time
+
+import pytest
+
+import history
+import homework
+from response_cache import ResponseCache
+from schema import Homework
+from subscriptions import Subscription
+
+START = 1641816000
+
+
+def status(name, value, seconds, lesson='Спринт 1'):
+    date = time.strftime(history.DATE_FORMAT, time.gmtime(START + seconds))
+    return Homework(1, name, value, date, '', lesson)
+
+
+@pytest.fixture
+def store(tmp_path):
+    history_store = history.HistoryStore(str(tmp_path / 'history.db'))
+    yield history_store
+    history_store.close()
+
+
+class TestHistoryStore:
+
+    def test_same_status_recorded_once(self, store):
+        item = status('hw.zip', 'reviewing', 0)
+        assert store.record('acc', [item]) == 1
+        assert store.record('acc', [item, item]) == 0
+        assert store.events('acc') == [('hw.zip', 'reviewing', START)]
+
+    def test_review_statistics(self, store):
+        store.record('acc', [status('hw.zip', 'reviewing', 0)])
+        store.record('acc', [status('hw.zip', 'rejected', 3600)])
+        store.record('acc', [status('hw.zip', 'reviewing', 7200)])
+        store.record('acc', [status('hw.zip', 'approved', 9000)])
+        store.record('acc', [status('other.zip', 'reviewing', 100)])
+        assert store.review_rounds('acc') == {'hw.zip': 2}
+        assert store.first_review_times('acc') == {'hw.zip': 3600}
+        assert store.turnaround_percentiles((0.0, 0.5), 'acc') == {
+            0.0: 1800, 0.5: 3600
+        }
+        assert store.turnaround_percentiles(account='other') == {}
+
+    def test_verdict_without_new_review_skipped(self, store):
+        store.record('acc', [status('hw.zip', 'reviewing', 0)])
+        store.record('acc', [status('hw.zip', 'rejected', 600)])
+        store.record('acc', [status('hw.zip', 'approved', 900)])
+        assert store.turnaround_percentiles((0.5, 0.9), 'acc') == {
+            0.5: 600, 0.9: 600
+        }, 'Вердикт без нового взятия на проверку не считается проверкой'
+
+    def test_percentiles_use_index(self, store):
+        rand = random.Random(1)
+        rows = []
+        for number in range(50000):
+            started = START + number * 600
+            duration = rand.randrange(600, 7 * 24 * 3600)
+            rows.append((
+                f'acc{number % 500}', f'hw{number}.zip', started,
+                started + duration, duration, 'approved'
+            ))
+        with store.connection:
+            store.connection.executemany(
+                'INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+        overall = store.turnaround_percentiles((0.5, 0.9, 0.99))
+        own = store.turnaround_percentiles((0.5, 0.9), 'acc7')
+        assert overall[0.5] < overall[0.9] < overall[0.99]
+        assert own[0.5] <= own[0.9]
+        plan = ' '.join(
+            row[-1] for row in store.connection.execute(
+                'EXPLAIN QUERY PLAN SELECT duration FROM reviews '
+                'WHERE account = ? ORDER BY duration LIMIT 1', ('acc7',)
+            )
+        )
+        assert 'reviews_account' in plan
+
+
+class TestBotHistory:
+
+    def test_responses_recorded(self, tmp_path):
+        history.configure(str(tmp_path / 'history.db'))
+        try:
+            student = Subscription('token', 1)
+            mentor = Subscription('token', 2)
+            for subscription in (student, mentor):
+                homework.handle_response(subscription, {
+                    'homeworks': [{
+                        'homework_name': 'hw.zip', 'status': 'approved',
+                        'date_updated': '2022-01-10T12:00:00Z',
+                    }],
+                    'current_date': 1,
+                }, ResponseCache())
+            events = history._store.events(student.account)
+        finally:
+            history.close()
+        assert events == [('hw.zip', 'approved', START)], (
+            'Один аккаунт из разных чатов пишется в журнал один раз'
+        )
+
+    def test_tap_without_store(self):
+        items = [status('hw.zip', 'approved', 0)]
+        assert history.tap('acc', items) is items
+
+    def test_stats_message(self, store):
+        assert history.stats_message('acc', store) == (
+            'История статусов пока пуста.'
+        )
+        store.record('acc', [status('hw.zip', 'reviewing', 0)])
+        store.record('acc', [status('hw.zip', 'rejected', 2 * 3600)])
+        store.record('acc', [status('hw.zip', 'reviewing', 3 * 3600)])
+        store.record('acc', [status('hw.zip', 'approved', 3 * 3600 + 1800)])
+        message = history.stats_message('acc', store)
+        assert 'Работ с вердиктом ревьюера: 1' in message
+        assert 'Первый вердикт в среднем через 2 ч 0 мин' in message
+        assert 'Раундов ревью в среднем 2.0, больше всего 2 (hw.zip)' in (
+            message
+        )
+        assert 'медиана 2 ч 0 мин' in message
+
+    def test_format_duration(self):
+        assert history.format_duration(59) == '0 мин'
+        assert history.format_duration(3 * 3600 + 120) == '3 ч 2 мин'
+        assert history.format_duration(2 * 86400 + 3600) == '2 дн 1 ч'
@@ -0,0 +1,138 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import homework
+import http_pool
+import http_session
+from exceptions import ApiUnavailableError
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+class RequestError(Exception):
+    pass
+
+
+class TimeoutException(RequestError):
+    pass
+
+
+class TooManyRedirects(RequestError):
+    pass
+
+
+class FailingHttp2Client:
+    """Клиент с интерфейсом httpx, запросы которого падают с error."""
+
+    def __init__(self, error):
+        self.error = error
+
+    def build_request(self, method, url, **kwargs):
+        return method, url
+
+    def get(self, url, **kwargs):
+        raise self.error
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_httpx(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'httpx', SimpleNamespace(
+        RequestError=RequestError, TimeoutException=TimeoutException,
+        TooManyRedirects=TooManyRedirects,
+    ))
+
+
+class TestPooledSession:
+
+    def test_connection_reused(self, local_server):
+        session = http_pool.PooledSession(pool_size=2)
+        first = session.get(local_server)
+        second = session.get(local_server)
+        assert first.json()['current_date'] == 1
+        assert first.timing.connect > 0, (
+            'Первый запрос должен открыть новое соединение'
+        )
+        assert second.timing.connect == 0, (
+            'Повторный запрос должен переиспользовать соединение'
+        )
+        stats = session.stats.snapshot()
+        assert stats['count'] == 2
+        assert stats['new_connections'] == 1
+        session.close()
+
+    def test_default_timeout(self, monkeypatch, local_server):
+        session = http_pool.PooledSession(
+            connect_timeout=1, read_timeout=2
+        )
+        captured = {}
+        original_send = http_pool.requests.Session.send
+
+        def send(self, request, **kwargs):
+            captured.update(kwargs)
+            return original_send(self, request, **kwargs)
+
+        monkeypatch.setattr(http_pool.requests.Session, 'send', send)
+        session.get(local_server)
+        assert captured['timeout'] == (1, 2), (
+            'Проверьте, что сессия передаёт таймауты по умолчанию'
+        )
+        session.close()
+
+    def test_module_get_uses_configured_client(self, local_server):
+        http_session.configure(pool_size=1)
+        try:
+            http_session.get(local_server)
+            assert http_session.stats()['count'] == 1
+        finally:
+            http_session.close()
+        assert http_session.stats() == {}
+
+
+class TestHttp2Errors:
+
+    @pytest.mark.parametrize('error', [
+        TimeoutException('read timeout'), TooManyRedirects('loop'),
+        RequestError('connection reset'),
+    ])
+    def test_transport_errors_mapped(self, monkeypatch, fake_httpx, error):
+        monkeypatch.setattr(
+            http_session, '_client', FailingHttp2Client(error)
+        )
+        with pytest.raises(ApiUnavailableError):
+            homework.send_api_request({}, {'from_date': 0})
+
+    def test_no_client_errors_without_httpx(self):
+        assert http_session.client_errors() == ((), (), ())
@@ -0,0 +1,62 @@
+import json
+import time
+import urllib.request
+
+from benchmarks.fakes import FakePracticum, FakeTelegram
+from benchmarks.load import run_load
+
+
+class TestFakes:
+
+    def test_practicum_returns_changes_since_from_date(self):
+        practicum = FakePracticum()
+        practicum.add_account('token', homeworks=2)
+        url = practicum.start()
+        try:
+            request = urllib.request.Request(
+                f'{url}/?from_date={int(time.time()) + 10}',
+                headers={'Authorization': 'OAuth token'}
+            )
+            with urllib.request.urlopen(request) as response:
+                empty = json.loads(response.read())
+            practicum.change('token', 1)
+            request.full_url = f'{url}/?from_date=1'
+            with urllib.request.urlopen(request) as response:
+                full = json.loads(response.read())
+        finally:
+            practicum.stop()
+        assert empty['homeworks'] == []
+        assert [item['status'] for item in full['homeworks']] == [
+            'rejected', 'reviewing'
+        ]
+
+    def test_telegram_records_messages(self):
+        telegram_api = FakeTelegram()
+        url = telegram_api.start()
+        try:
+            request = urllib.request.Request(
+                f'{url}/bot123:fake/sendMessage',
+                data=json.dumps(
+                    {'chat_id': 5, 'text': 'работа "hw"'}
+                ).encode(),
+                headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(request) as response:
+                answer = json.loads(response.read())
+        finally:
+            telegram_api.stop()
+        assert answer['ok'] and answer['result']['chat']['id'] == 5
+        assert telegram_api.delivered_at('hw') is not None
+
+
+class TestLoadDriver:
+
+    def test_all_changes_delivered(self):
+        report = run_load(accounts=5, homeworks=3, cycles=2, changes=1.0)
+        assert report['changes'] == 10
+        assert report['delivered'] == report['changes'], (
+            'Каждое изменение статуса должно дойти до Telegram'
+        )
+        assert report['polls_per_second'] > 0
+        assert report['memory_per_account'] > 0
+        assert report['api_requests'] == 15
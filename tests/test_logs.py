@@ -0,0 +1,119 @@
+import json
+import logging
+
+import homework
+import logs
+from response_cache import ResponseCache
+from schema import Homework
+from utils import FakeClock
+
+
+def make_record(message, level=logging.INFO, **extra):
+    record = logging.LogRecord(
+        'homework', level, __file__, 1, message, None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLogs:
+
+    def test_repetitive_info_sampled(self):
+        clock = FakeClock()
+        sampling = logs.SamplingFilter(limit=2, window=60, clock=clock)
+        passed = [
+            sampling.filter(make_record('Ответ response получен'))
+            for _ in range(5)
+        ]
+        assert passed == [True, True, False, False, False]
+        assert sampling.filter(make_record('Другое сообщение'))
+        assert sampling.filter(
+            make_record('Ответ response получен', logging.ERROR)
+        ), 'Ошибки не должны отбрасываться'
+        clock.now = 61
+        record = make_record('Ответ response получен')
+        assert sampling.filter(record)
+        assert record.suppressed == 3
+
+    def test_sampling_keys_do_not_grow(self):
+        clock = FakeClock()
+        sampling = logs.SamplingFilter(
+            limit=2, window=60, clock=clock, max_keys=50
+        )
+        for cycle in range(200):
+            clock.now = cycle * 30
+            sampling.filter(make_record(f'Запросов к API: {cycle}'))
+        assert len(sampling.windows) <= 3, (
+            'Истёкшие окна должны удаляться'
+        )
+        for number in range(200):
+            sampling.filter(make_record(f'Ответ {number}'))
+        assert len(sampling.windows) == 50
+
+    def test_context_in_json(self):
+        formatter = logs.JsonFormatter()
+        context = logs.ContextFilter()
+        with logs.log_context(account='1:abc', cycle=7):
+            record = make_record('Статусы получены', homework=42)
+            context.filter(record)
+        data = json.loads(formatter.format(record))
+        assert data['message'] == 'Статусы получены'
+        assert data['account'] == '1:abc'
+        assert data['cycle'] == 7
+        assert data['homework'] == 42
+        outside = make_record('Без контекста')
+        context.filter(outside)
+        assert 'account' not in json.loads(formatter.format(outside))
+
+    def test_homework_in_status_logs(self, caplog):
+        caplog.handler.addFilter(logs.ContextFilter())
+        with caplog.at_level(logging.INFO, logger='homework'):
+            homework.find_changes(
+                [Homework(7, 'hw.zip', 'approved', '', '', '')],
+                ResponseCache()
+            )
+        record, = [
+            record for record in caplog.records
+            if record.getMessage().startswith('Новый статус работы')
+        ]
+        assert record.homework == 7, (
+            'Записи о статусе работы должны содержать её id'
+        )
+
+    def test_size_rotation(self, tmp_path):
+        path = tmp_path / 'bot.log'
+        handler = logs.file_handler(str(path), max_bytes=200, backups=2)
+        handler.setFormatter(logs.TextFormatter(logs.TEXT_FORMAT))
+        try:
+            for index in range(50):
+                handler.emit(make_record(f'Сообщение {index}'))
+        finally:
+            handler.close()
+        assert (tmp_path / 'bot.log.1').exists()
+        assert not (tmp_path / 'bot.log.3').exists()
+
+    def test_queue_pipeline_writes_json(self, tmp_path, monkeypatch):
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        level = root.level
+        monkeypatch.setattr(
+            root, '_homework_configured', False, raising=False
+        )
+        path = tmp_path / 'bot.log'
+        logs.configure(str(path), fmt='json', use_queue=True)
+        try:
+            with logs.log_context(account='2:def'):
+                logging.getLogger('homework').info('Статусы получены: 1')
+        finally:
+            listener = logs._listener
+            logs.shutdown()
+            for handler in listener.handlers:
+                handler.close()
+            for handler in list(root.handlers):
+                if handler not in handlers:
+                    root.removeHandler(handler)
+            root.setLevel(level)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert {
+            'message': 'Статусы получены: 1', 'account': '2:def'
+        }.items() <= lines[-1].items()
@@ -0,0 +1,99 @@
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+import homework
+import metrics
+from alerts import ErrorAggregator
+from exceptions import CustomStatusesError, ResponseIsNone
+from subscriptions import Subscription
+
+
+class TestMetrics:
+
+    def test_exposition_format(self):
+        registry = metrics.Registry()
+        failures = metrics.Counter(
+            'failures_total', 'Ошибки', ('exception',), registry
+        )
+        latency = metrics.Histogram(
+            'latency_seconds', 'Задержка', registry=registry,
+            buckets=(0.1, 1)
+        )
+        depth = metrics.Gauge('depth', 'Очередь', registry=registry)
+        failures.inc(exception='KeyError')
+        failures.inc(2, exception='KeyError')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+        depth.set_function(lambda: 3)
+        text = registry.expose()
+        assert '# TYPE failures_total counter' in text
+        assert 'failures_total{exception="KeyError"} 3.0' in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'latency_seconds_count 3' in text
+        assert 'latency_seconds_sum 5.55' in text
+        assert 'depth 3.0' in text
+
+    def test_labels_checked(self):
+        counter = metrics.Counter('c', 'c', ('exception',), registry=None)
+        with pytest.raises(ValueError):
+            counter.inc(status=500)
+
+    def test_http_endpoint(self):
+        registry = metrics.Registry()
+        metrics.Counter('up', 'Работает', registry=registry).inc()
+        server = metrics.start_server(0, '127.0.0.1', registry)
+        url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            with urllib.request.urlopen(f'{url}/metrics') as response:
+                body = response.read().decode()
+                content_type = response.headers['Content-Type']
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f'{url}/other')
+        finally:
+            metrics.stop_server(server)
+        assert 'up 1.0' in body
+        assert content_type.startswith('text/plain')
+        assert error.value.code == HTTPStatus.NOT_FOUND
+
+    def test_server_disabled_without_port(self):
+        assert metrics.start_server(None) is None
+
+
+class TestBotMetrics:
+
+    @pytest.mark.parametrize('error', [
+        CustomStatusesError(HTTPStatus.BAD_REQUEST),
+        ResponseIsNone(),
+        KeyError('homeworks'),
+    ])
+    def test_failures_counted_by_type(self, error):
+        name = type(error).__name__
+        before = metrics.POLL_FAILURES.value(exception=name)
+        homework.report_error(
+            Subscription('token', 1), error, ErrorAggregator()
+        )
+        assert metrics.POLL_FAILURES.value(exception=name) == before + 1
+
+    def test_api_latency_by_status(self):
+        class Response:
+            status_code = HTTPStatus.BAD_GATEWAY
+
+        def request(url, headers=None, params=None):
+            return Response()
+
+        def failing_request(url, headers=None, params=None):
+            raise OSError
+
+        before = metrics.API_LATENCY.count(status=502)
+        errors_before = metrics.API_LATENCY.count(status='error')
+        homework.timed_request(request, {}, {})
+        with pytest.raises(OSError):
+            homework.timed_request(failing_request, {}, {})
+        assert metrics.API_LATENCY.count(status=502) == before + 1
+        assert metrics.API_LATENCY.count(status='error') == errors_before + 1
@@ -0,0 +1,137 @@
+import time
+
+from telegram.error import BadRequest, NetworkError, RetryAfter
+
+import outbox
+import rate_limit
+from retry import Backoff
+from utils import wait_for
+
+
+class StubBot:
+
+    def __init__(self, errors=()):
+        self.sent = []
+        self.errors = list(errors)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text))
+
+
+def make_outbox(bot, **kwargs):
+    kwargs.setdefault('per_chat_interval', 0)
+    return outbox.Outbox(
+        bot, journal_path=kwargs.pop('journal_path', None),
+        bucket=rate_limit.TokenBucket('test', 1000, 1000),
+        backoff=Backoff(base=0.01, rand=lambda: 1.0), **kwargs
+    )
+
+
+class TestOutbox:
+
+    def test_messages_to_one_chat_merged(self):
+        bot = StubBot()
+        sender = make_outbox(bot)
+        sender.put(1, 'a')
+        sender.put(2, 'b')
+        sender.put(1, 'c')
+        sender.start()
+        assert wait_for(lambda: len(bot.sent) == 2)
+        sender.stop()
+        assert sorted(bot.sent) == [(1, 'a\n\nc'), (2, 'b')], (
+            'Сообщения в один чат должны склеиваться в одно'
+        )
+
+    def test_coalesce_respects_limit(self, monkeypatch):
+        monkeypatch.setattr(outbox, 'TELEGRAM_MESSAGE_LIMIT', 10)
+        texts = outbox.coalesce_messages(['aaaa', 'bbbb', 'cccccccccccc'])
+        assert texts == ['aaaa\n\nbbbb', 'cccccccccc']
+
+    def test_transient_errors_retried(self):
+        bot = StubBot(errors=[NetworkError('down'), RetryAfter(0.01)])
+        sender = make_outbox(bot).start()
+        sender.put(1, 'a')
+        assert wait_for(lambda: bot.sent == [(1, 'a')]), (
+            'Сообщение должно отправиться после временных ошибок'
+        )
+        sender.stop()
+
+    def test_put_does_not_block_on_slow_telegram(self):
+        class SlowBot(StubBot):
+            def send_message(self, *args, **kwargs):
+                time.sleep(0.2)
+                super().send_message(*args, **kwargs)
+
+        sender = make_outbox(SlowBot()).start()
+        started = time.monotonic()
+        for chat_id in range(5):
+            sender.put(chat_id, 'a')
+        assert time.monotonic() - started < 0.1
+        sender.stop(timeout=0)
+
+    def test_journal_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.jsonl')
+        sender = make_outbox(StubBot(), journal_path=path)
+        sender.put(1, 'a')
+        sender.put(2, 'b')
+        sender.stop()
+
+        bot = StubBot()
+        restored = make_outbox(bot, journal_path=path)
+        assert restored.depth() == 2, (
+            'Неотправленные сообщения должны восстанавливаться из журнала'
+        )
+        restored.start()
+        assert wait_for(lambda: len(bot.sent) == 2)
+        restored.stop()
+        assert make_outbox(StubBot(), journal_path=path).depth() == 0
+
+    def test_capacity_drops_oldest(self):
+        sender = make_outbox(StubBot(), capacity=2)
+        for text in 'abc':
+            sender.put(1, text)
+        assert [item.text for item in sender.queue] == ['b', 'c']
+        assert sender.dropped == 1
+
+
+class TestDeliveryErrors:
+
+    def test_bad_request_dropped_at_once(self):
+        bot = StubBot(errors=[BadRequest('Chat not found')])
+        sender = make_outbox(bot)
+        sender.put(1, 'a')
+        sender.deliver(sender.take_batch()[0])
+        assert sender.dropped == 1
+        assert not sender.queue, 'BadRequest не нужно повторять'
+
+    def test_only_unsent_texts_retried(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(outbox, 'TELEGRAM_MESSAGE_LIMIT', 10)
+
+        class FailingSecondBot(StubBot):
+            calls = 0
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                self.calls += 1
+                if self.calls == 2:
+                    raise NetworkError('down')
+                super().send_message(chat_id, text)
+
+        bot = FailingSecondBot()
+        path = str(tmp_path / 'outbox.jsonl')
+        sender = make_outbox(bot, journal_path=path)
+        for text in ('aaaa', 'bbbb', 'cccccccc'):
+            sender.put(1, text)
+        sender.deliver(sender.take_batch()[0])
+        assert [item.text for item in sender.queue] == ['cccccccc']
+        assert sender.sent == 2
+        sender.ready_at.clear()
+        sender.deliver(sender.take_batch()[0])
+        assert bot.sent == [(1, 'aaaa\n\nbbbb'), (1, 'cccccccc')], (
+            'Уже доставленные тексты не должны отправляться повторно'
+        )
+        sender.stop()
+        assert [
+            item.text for item in outbox.Journal(path).replay()
+        ] == []
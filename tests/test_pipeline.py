@@ -0,0 +1,33 @@
+import homework
+from response_cache import ResponseCache
+from subscriptions import Subscription
+from utils import StubSender
+
+
+class TestBatchPipeline:
+
+    def test_all_homeworks_processed(self):
+        response = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+            ],
+            'current_date': 10,
+        }
+        messages = homework.handle_response(
+            Subscription('token', 1), response, ResponseCache()
+        )
+        assert len(messages) == 2, (
+            'Проверьте, что обрабатываются все работы из ответа, '
+            'по одному сообщению на работу'
+        )
+        assert messages[0].endswith(homework.HOMEWORK_STATUSES['approved'])
+        assert '"hw2"' in messages[1]
+
+    def test_batch_queued_without_sending(self):
+        sender = StubSender()
+        homework.send_batch(sender, {1: ['a', 'b'], 2: ['c']})
+        assert sender.queued == [(1, 'a'), (1, 'b'), (2, 'c')], (
+            'Проверьте, что сообщения цикла ставятся в очередь отправки'
+        )
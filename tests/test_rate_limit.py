@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+import homework
+import rate_limit
+from exceptions import CustomStatusesError, TooManyRequestsError
+from utils import FakeClock
+
+
+class MockResponse:
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class TestTokenBucket:
+
+    def test_requests_spread_evenly(self):
+        clock = FakeClock()
+        bucket = rate_limit.TokenBucket(
+            'test', rate=2, capacity=2, clock=clock, sleep=clock.sleep
+        )
+        for _ in range(4):
+            bucket.acquire()
+        assert clock.slept == [0.5, 0.5], (
+            'После исчерпания бака запросы должны идти равномерно'
+        )
+        stats = bucket.stats()
+        assert stats['acquired'] == 4
+        assert stats['max_wait'] == 0.5
+        assert stats['queue_depth'] == 0
+
+    def test_defer_blocks_until_retry_after(self):
+        clock = FakeClock()
+        bucket = rate_limit.TokenBucket(
+            'test', rate=10, capacity=10, clock=clock, sleep=clock.sleep
+        )
+        bucket.defer(30)
+        assert bucket.reserve() == 30, (
+            'Проверьте, что Retry-After приостанавливает запросы'
+        )
+
+    @pytest.mark.parametrize('value, expected', [
+        ('120', 120.0), (None, 60.0), ('garbage', 60.0),
+        ('Wed, 21 Oct 2015 07:28:00 GMT', 0),
+    ])
+    def test_parse_retry_after(self, value, expected):
+        assert rate_limit.parse_retry_after(value) == expected
+
+
+class TestStatusCheck:
+
+    def test_too_many_requests(self, monkeypatch):
+        deferred = []
+        monkeypatch.setattr(
+            rate_limit.PRACTICUM_BUCKET, 'defer', deferred.append
+        )
+        response = MockResponse(
+            HTTPStatus.TOO_MANY_REQUESTS, {'Retry-After': '15'}
+        )
+        with pytest.raises(TooManyRequestsError) as error:
+            homework.check_status(response)
+        assert error.value.retry_after == 15
+        assert deferred == [15]
+
+    def test_other_error(self):
+        with pytest.raises(CustomStatusesError) as error:
+            homework.check_status(MockResponse(HTTPStatus.BAD_GATEWAY))
+        assert error.value.status_code == HTTPStatus.BAD_GATEWAY
@@ -0,0 +1,93 @@
+import json
+from http import HTTPStatus
+
+import homework
+from response_cache import NOT_MODIFIED, ResponseCache
+from subscriptions import Subscription
+
+
+class MockResponse:
+
+    def __init__(self, body, status_code=HTTPStatus.OK, headers=None):
+        self.content = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class TestResponseCache:
+
+    def test_unchanged_body_skips_parsing(self, monkeypatch):
+        response = MockResponse(
+            b'{"homeworks": [], "current_date": 1}', headers={'ETag': '"v1"'}
+        )
+        requests_headers = []
+        parsed = []
+
+        def counting_loads(body):
+            parsed.append(body)
+            return json.loads(body)
+
+        monkeypatch.setattr(homework.schema, 'loads', counting_loads)
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            requests_headers.append(headers)
+            return response
+
+        monkeypatch.setattr(homework.http_session, 'get', mock_get)
+        cache = ResponseCache()
+        first = homework.request_homework_statuses(
+            {}, 1, cache, stream=False
+        )
+        second = homework.request_homework_statuses(
+            {}, 1, cache, stream=False
+        )
+        assert first == {'homeworks': [], 'current_date': 1}
+        assert second is NOT_MODIFIED, (
+            'Повторный одинаковый ответ не должен разбираться заново'
+        )
+        assert len(parsed) == 1
+        assert requests_headers[1]['If-None-Match'] == '"v1"', (
+            'Проверьте, что запрос повторяется с If-None-Match'
+        )
+
+    def test_new_current_date_counts_as_unchanged(self):
+        cache = ResponseCache()
+        homeworks = (
+            b'"homeworks": [{"id": 1, "status": "approved", '
+            b'"reviewer_comment": "\\"current_date\\": 1"}]'
+        )
+        assert not cache.is_unchanged(
+            HTTPStatus.OK, b'{' + homeworks + b', "current_date": 100}'
+        )
+        cache.remember({})
+        assert cache.is_unchanged(
+            HTTPStatus.OK, b'{' + homeworks + b', "current_date": 700}'
+        ), 'Ответы с теми же работами совпадают при любом current_date'
+        assert not cache.is_unchanged(
+            HTTPStatus.OK,
+            b'{' + homeworks.replace(b'approved', b'rejected')
+            + b', "current_date": 700}'
+        )
+
+    def test_not_modified_status(self):
+        cache = ResponseCache()
+        assert cache.is_unchanged(HTTPStatus.NOT_MODIFIED, b'')
+        assert not cache.is_unchanged(HTTPStatus.OK, b'{}')
+
+    def test_duplicate_status_suppressed(self):
+        cache = ResponseCache()
+        subscription = Subscription('token', 1)
+        response = {
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw', 'status': 'reviewing',
+                'date_updated': '2022-01-01T00:00:00Z',
+            }],
+            'current_date': 5,
+        }
+        assert homework.handle_response(subscription, response, cache)
+        assert homework.handle_response(
+            subscription, response, cache
+        ) == [], 'Повторный статус не должен отправляться'
+        assert subscription.current_date == 5
+        response['homeworks'][0]['status'] = 'approved'
+        assert homework.handle_response(subscription, response, cache)
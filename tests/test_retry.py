@@ -0,0 +1,141 @@
+import pytest
+
+import retry
+from exceptions import (
+    ApiUnavailableError, CircuitOpenError, CustomStatusesError
+)
+from utils import FakeClock
+
+
+class TestBackoff:
+
+    def test_exponential_with_cap(self):
+        backoff = retry.Backoff(base=1, maximum=5, rand=lambda: 1.0)
+        assert [backoff.delay(n) for n in range(4)] == [1, 2, 4, 5]
+
+    def test_full_jitter(self):
+        backoff = retry.Backoff(base=1, maximum=5, rand=lambda: 0.25)
+        assert backoff.delay(2) == 1
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_probes(self):
+        clock = FakeClock()
+        breaker = retry.CircuitBreaker(
+            'test', failure_threshold=2, reset_timeout=10, clock=clock
+        )
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        clock.now = 10
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == breaker.CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = retry.CircuitBreaker(
+            'test', failure_threshold=1, reset_timeout=10, clock=clock
+        )
+        breaker.record_failure()
+        clock.now = 10
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+
+class TestCallWithRetry:
+
+    def test_retries_transient_errors(self):
+        calls = []
+        slept = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ApiUnavailableError()
+            return 'ok'
+
+        result = retry.call_with_retry(
+            flaky, attempts=3, sleep=slept.append,
+            backoff=retry.Backoff(rand=lambda: 1.0)
+        )
+        assert result == 'ok'
+        assert slept == [1, 2], 'Паузы между повторами должны расти'
+
+    def test_client_errors_not_retried(self):
+        calls = []
+        breaker = retry.CircuitBreaker('test', failure_threshold=1)
+
+        def not_found():
+            calls.append(1)
+            raise CustomStatusesError(404)
+
+        with pytest.raises(CustomStatusesError):
+            retry.call_with_retry(
+                not_found, breaker=breaker, sleep=lambda _: None
+            )
+        assert len(calls) == 1, 'Ошибки 4xx не нужно повторять'
+        assert breaker.state == breaker.CLOSED
+
+    def test_breaker_stops_request_storm(self):
+        calls = []
+        breaker = retry.CircuitBreaker('test', failure_threshold=2)
+
+        def down():
+            calls.append(1)
+            raise CustomStatusesError(503)
+
+        for _ in range(3):
+            with pytest.raises((CustomStatusesError, CircuitOpenError)):
+                retry.call_with_retry(
+                    down, breaker=breaker, attempts=3, sleep=lambda _: None
+                )
+        assert len(calls) == 2, (
+            'После размыкания цепи запросы не должны уходить на сервер'
+        )
+
+
+class TestTelegramErrors:
+
+    def test_permanent_errors_not_retried(self, monkeypatch):
+        from telegram.error import (
+            BadRequest, ChatMigrated, NetworkError, TimedOut, Unauthorized
+        )
+
+        import homework
+
+        assert homework.is_telegram_transient(NetworkError('down'))
+        assert homework.is_telegram_transient(TimedOut())
+        for error in (
+            BadRequest('Chat not found'), Unauthorized('blocked'),
+            ChatMigrated(2)
+        ):
+            assert not homework.is_telegram_transient(error)
+
+        calls = []
+
+        class BadChatBot:
+
+            def send_message(self, chat_id, text):
+                calls.append(chat_id)
+                if chat_id == 'bad':
+                    raise BadRequest('Chat not found')
+
+        breaker = retry.CircuitBreaker('test', failure_threshold=2)
+        monkeypatch.setattr(retry, 'TELEGRAM_BREAKER', breaker)
+        for _ in range(3):
+            homework.send_chat_message(BadChatBot(), 'bad', 'текст')
+        homework.send_chat_message(BadChatBot(), 'good', 'текст')
+        assert calls == ['bad', 'bad', 'bad', 'good'], (
+            'Постоянные ошибки Telegram не повторяются и не размыкают цепь'
+        )
+        assert breaker.state == breaker.CLOSED
@@ -0,0 +1,62 @@
+import time
+
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+
+NOON = time.mktime((2022, 1, 10, 12, 0, 0, 0, 0, -1))
+NIGHT = time.mktime((2022, 1, 10, 3, 0, 0, 0, 0, -1))
+
+
+def make_scheduler(now):
+    return AdaptiveScheduler(
+        base_interval=600, min_interval=60, max_interval=3600,
+        jitter=0.1, clock=lambda: now, rand=lambda: 0.5
+    )
+
+
+class TestAdaptiveScheduler:
+
+    def test_reviewing_polled_more_often(self):
+        scheduler = make_scheduler(NOON)
+        reviewing = ResponseCache()
+        reviewing.last_status = 'reviewing'
+        approved = ResponseCache()
+        approved.last_status = 'approved'
+        scheduler.observe('a', reviewing)
+        scheduler.observe('b', approved)
+        assert scheduler.due_at['a'] - NOON == 120, (
+            'Во время ревью интервал опроса должен сокращаться'
+        )
+        assert scheduler.due_at['b'] - NOON == 1800
+
+    def test_night_and_bounds(self):
+        scheduler = make_scheduler(NIGHT)
+        cache = ResponseCache()
+        cache.last_status = 'approved'
+        scheduler.observe('a', cache)
+        assert scheduler.due_at['a'] - NIGHT == 3600, (
+            'Интервал не должен превышать максимум'
+        )
+
+    def test_changes_shorten_interval(self):
+        scheduler = make_scheduler(NOON)
+        cache = ResponseCache()
+        cache.change_count = 3
+        scheduler.observe('a', cache)
+        assert scheduler.due_at['a'] - NOON == 150
+
+    def test_due_and_sleep_time(self):
+        scheduler = make_scheduler(NOON)
+        assert scheduler.due(['a', 'b']) == ['a', 'b'], (
+            'Новые подписки опрашиваются сразу'
+        )
+        scheduler.observe('a', ResponseCache())
+        assert scheduler.due(['a', 'b']) == ['b']
+        assert scheduler.sleep_time() == 600
+
+    def test_jitter_spreads_polls(self):
+        scheduler = make_scheduler(NOON)
+        scheduler.rand = lambda: 1.0
+        assert scheduler.interval('a', NOON) == 660
+        scheduler.rand = lambda: 0.0
+        assert scheduler.interval('a', NOON) == 540
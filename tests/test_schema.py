@@ -0,0 +1,61 @@
+import pytest
+
+import homework
+import schema
+from exceptions import ResponseIsNone
+
+STATUSES = homework.HOMEWORK_STATUSES
+
+
+class TestSchema:
+
+    def test_records_built_in_one_pass(self):
+        records = schema.parse_response({
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw', 'status': 'approved',
+                'date_updated': 'x', 'lesson_name': 'Итоговый проект',
+            }],
+            'current_date': 1,
+        }, STATUSES)
+        assert records == [
+            schema.Homework(1, 'hw', 'approved', 'x', None, 'Итоговый проект')
+        ]
+        assert records[0].key == 1
+
+    def test_key_falls_back_to_name(self):
+        record = schema.to_record(
+            {'homework_name': 'hw', 'status': 'approved'}, STATUSES
+        )
+        assert record.key == 'hw'
+
+    @pytest.mark.parametrize('response, error', [
+        (None, ResponseIsNone),
+        ([], TypeError),
+        ({}, KeyError),
+        ({'homeworks': {'a': 1}}, TypeError),
+        ({'homeworks': ['hw']}, TypeError),
+        ({'homeworks': [{'status': 'approved'}]}, KeyError),
+        ({'homeworks': [{'homework_name': 'hw'}]}, KeyError),
+        ({'homeworks': [{'homework_name': 'hw', 'status': 'x'}]}, KeyError),
+    ])
+    def test_invalid_payload(self, response, error):
+        with pytest.raises(error):
+            schema.parse_response(response, STATUSES)
+
+    def test_empty_homeworks_is_list(self):
+        assert homework.check_response({'homeworks': []}) == []
+        assert homework.check_response({'homeworks': {}}) == [], (
+            'check_response должна всегда возвращать список'
+        )
+
+    def test_parse_status_accepts_records(self):
+        record = schema.Homework(1, 'hw', 'rejected', None, None, None)
+        assert homework.parse_status(record) == homework.parse_status(
+            {'homework_name': 'hw', 'status': 'rejected'}
+        )
+
+    def test_decode_uses_content(self):
+        class Response:
+            content = b'{"homeworks": []}'
+
+        assert schema.decode(Response()) == {'homeworks': []}
@@ -0,0 +1,190 @@
+import json
+import sys
+
+import pytest
+
+import homework
+import shards
+from retry import Backoff
+from subscriptions import Subscription
+from utils import wait_for
+
+SLEEPER = [sys.executable, '-c', 'import time; time.sleep(30)']
+CRASHER = [sys.executable, '-c', 'raise SystemExit(3)']
+
+
+def make_subscriptions(count):
+    return [Subscription(f'token{number}', number) for number in range(count)]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / 'subscriptions.json'
+    path.write_text(json.dumps([
+        {'token': item.token, 'chat_id': item.chat_id}
+        for item in make_subscriptions(40)
+    ]))
+    return str(path)
+
+
+class TestHashRing:
+
+    def test_same_node_in_every_process(self):
+        first = shards.HashRing(range(4))
+        second = shards.HashRing([3, 1, 0, 2])
+        keys = [f'token{number}' for number in range(200)]
+        assert [first.node_for(key) for key in keys] == [
+            second.node_for(key) for key in keys
+        ]
+
+    def test_keys_spread_evenly(self):
+        ring = shards.HashRing(range(4))
+        counts = {}
+        for subscription in make_subscriptions(4000):
+            node = ring.node_for(subscription.token)
+            counts[node] = counts.get(node, 0) + 1
+        assert sorted(counts) == [0, 1, 2, 3]
+        assert min(counts.values()) > 600, counts
+
+    def test_adding_node_moves_keys_only_to_it(self):
+        ring = shards.HashRing(range(4))
+        keys = [f'token{number}' for number in range(4000)]
+        before = {key: ring.node_for(key) for key in keys}
+        ring.add(4)
+        moved = [key for key in keys if ring.node_for(key) != before[key]]
+        assert all(ring.node_for(key) == 4 for key in moved)
+        assert 400 < len(moved) < 1400, (
+            'Новому узлу должна перейти примерно 1/N ключей'
+        )
+
+    def test_removing_node_keeps_other_keys(self):
+        ring = shards.HashRing(range(4))
+        keys = [f'token{number}' for number in range(2000)]
+        before = {key: ring.node_for(key) for key in keys}
+        ring.remove(2)
+        assert ring.nodes == [0, 1, 3]
+        for key in keys:
+            if before[key] != 2:
+                assert ring.node_for(key) == before[key]
+
+    def test_same_token_same_shard(self):
+        ring = shards.HashRing(range(3))
+        student, mentor = Subscription('token', 1), Subscription('token', 2)
+        assignment = ring.assign([student, mentor, Subscription('other', 3)])
+        owner = ring.node_for('token')
+        assert {student.key, mentor.key} <= assignment[owner], (
+            'Чаты одного токена должны быть в одном шарде'
+        )
+
+
+class TestShardSubscriptions:
+
+    def test_shards_split_registry(self, monkeypatch, registry):
+        monkeypatch.setattr(homework, 'SUBSCRIPTIONS_FILE', registry)
+        monkeypatch.setattr(homework, 'SHARD_NODES', (0, 1, 2))
+        selected = []
+        for shard in (0, 1, 2):
+            monkeypatch.setattr(homework, 'SHARD', shard)
+            selected.append(
+                {item.key for item in homework.get_subscriptions()}
+            )
+        assert all(selected)
+        assert sum(map(len, selected)) == 40
+        assert len(set.union(*selected)) == 40, (
+            'Каждая подписка должна попасть ровно в один шард'
+        )
+
+    def test_environment(self, tmp_path):
+        supervisor = shards.Supervisor(
+            'registry.json', count=2, environ={
+                'CHECKPOINT_FILE': 'state.json', 'POLL_MODE': 'shards',
+            }
+        )
+        environ = supervisor.environment(1)
+        assert environ['SHARD'] == '1'
+        assert environ['SHARD_NODES'] == '0,1'
+        assert environ['POLL_MODE'] == shards.SHARD_POLL_MODE
+        assert environ['CHECKPOINT_FILE'] == 'state.shard1.json'
+        assert environ['LOG_FILE'].endswith('.shard1.log')
+        assert float(environ['TELEGRAM_RATE']) == (
+            shards.rate_limit.TELEGRAM_RATE / 2
+        ), 'Общий лимит Telegram делится между шардами'
+
+    def test_sqlite_checkpoint_shared(self):
+        supervisor = shards.Supervisor(
+            'registry.json', count=2, environ={'CHECKPOINT_FILE': 'state.db'}
+        )
+        assert supervisor.environment(1)['CHECKPOINT_FILE'] == 'state.db'
+
+
+class TestSupervisor:
+
+    def test_rebalance_on_add_and_remove(self, registry):
+        supervisor = shards.Supervisor(
+            registry, count=2, command=SLEEPER, environ={}, stop_timeout=5
+        )
+        try:
+            supervisor.rebalance()
+            assert sorted(supervisor.workers) == [0, 1]
+            first = {
+                shard: worker.process.pid
+                for shard, worker in supervisor.workers.items()
+            }
+            supervisor.rebalance()
+            assert {
+                shard: worker.process.pid
+                for shard, worker in supervisor.workers.items()
+            } == first, 'Без изменений шарды не перезапускаются'
+            supervisor.add_shard()
+            assert sorted(supervisor.workers) == [0, 1, 2]
+            keys = [worker.keys for worker in supervisor.workers.values()]
+            assert sum(map(len, keys)) == 40
+            assert len(frozenset().union(*keys)) == 40
+            supervisor.remove_shard()
+            assert sorted(supervisor.workers) == [0, 1]
+        finally:
+            supervisor.stop_workers(list(supervisor.workers))
+        assert supervisor.workers == {}
+
+    def test_crashed_shard_restarted(self, registry):
+        supervisor = shards.Supervisor(
+            registry, count=1, command=CRASHER, environ={},
+            backoff=Backoff(base=0)
+        )
+        supervisor.rebalance()
+        worker = supervisor.workers[0]
+        first = worker.process
+
+        def restarted():
+            supervisor.check()
+            return worker.crashes >= 2
+
+        assert wait_for(restarted), 'Упавший шард должен перезапускаться'
+        assert worker.process is None or worker.process is not first
+        supervisor.stop_workers([0])
+
+    def test_stop_waits_for_shards(self, registry):
+        supervisor = shards.Supervisor(
+            registry, count=2, command=SLEEPER, environ={}
+        )
+        supervisor.rebalance()
+        processes = [worker.process for worker in supervisor.workers.values()]
+        supervisor.stop_workers(list(supervisor.workers), timeout=5)
+        assert all(process.poll() is not None for process in processes)
+
+    def test_broken_registry_keeps_shards(self, registry):
+        supervisor = shards.Supervisor(
+            registry, count=2, command=SLEEPER, environ={}
+        )
+        supervisor.rebalance()
+        try:
+            workers = dict(supervisor.workers)
+            with open(registry, 'w') as file:
+                file.write('{"token": ')
+            supervisor.perform(supervisor.rebalance)
+            assert supervisor.workers == workers
+            assert all(
+                worker.process.poll() is None for worker in workers.values()
+            ), 'Ошибка чтения реестра не должна останавливать шарды'
+        finally:
+            supervisor.stop_workers(list(supervisor.workers), timeout=5)
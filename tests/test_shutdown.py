@@ -0,0 +1,139 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+import telegram
+
+import homework
+import outbox
+from alerts import ErrorAggregator
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+from subscriptions import Subscription
+
+
+class StubBot:
+
+    def __init__(self, *args, **kwargs):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def restore_signals():
+    saved = {
+        signum: signal.getsignal(signum)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    yield
+    for signum, handler in saved.items():
+        signal.signal(signum, handler)
+
+
+class TestShutdown:
+
+    def test_sigterm_sets_stop(self, restore_signals):
+        stop = threading.Event()
+        homework.install_signal_handlers(stop)
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert stop.wait(1), 'SIGTERM должен останавливать цикл, а не процесс'
+
+    def test_outbox_drained_on_stop(self):
+        bot = StubBot()
+        sender = outbox.Outbox(
+            bot, journal_path=None, per_chat_interval=0.2
+        ).start()
+        sender.put(1, 'первое')
+        while not bot.sent:
+            time.sleep(0.01)
+        sender.put(1, 'второе')
+        assert sender.stop(timeout=2) == 0
+        assert [text for _, text in bot.sent] == ['первое', 'второе'], (
+            'Отложенные сообщения должны дослаться при остановке'
+        )
+
+    def test_outbox_stop_bounded_by_timeout(self):
+        bot = StubBot()
+        sender = outbox.Outbox(
+            bot, journal_path=None, per_chat_interval=10
+        ).start()
+        sender.put(1, 'первое')
+        while not bot.sent:
+            time.sleep(0.01)
+        sender.put(1, 'второе')
+        started = time.monotonic()
+        assert sender.stop(timeout=0.1) == 1
+        assert time.monotonic() - started < 1
+
+    def test_no_new_requests_after_stop(self, monkeypatch):
+        stop = threading.Event()
+        polled = []
+
+        def request_statuses(headers, current_timestamp, cache=None,
+                             stream=None):
+            polled.append(current_timestamp)
+            stop.set()
+            return {'homeworks': [], 'current_date': 1}
+
+        monkeypatch.setattr(
+            homework, 'request_homework_statuses', request_statuses
+        )
+        subscriptions = [Subscription('token', i) for i in range(5)]
+        homework.poll_due(
+            subscriptions,
+            {item.key: ResponseCache() for item in subscriptions},
+            AdaptiveScheduler(), ErrorAggregator(), stop
+        )
+        assert len(polled) == 1
+
+
+class TestRestart:
+
+    def run_main(self, monkeypatch, current_date):
+        """Один запуск main(), который останавливается после опроса."""
+        stop = threading.Event()
+        requested = []
+
+        def request_statuses(headers, current_timestamp, cache=None,
+                             stream=None):
+            requested.append(current_timestamp)
+            stop.set()
+            return {
+                'homeworks': [{
+                    'id': 1, 'homework_name': 'hw', 'status': 'approved',
+                    'date_updated': '2022-01-10T12:00:00Z',
+                }],
+                'current_date': current_date,
+            }
+
+        bot = StubBot()
+        monkeypatch.setattr(telegram, 'Bot', lambda **kwargs: bot)
+        monkeypatch.setattr(
+            homework, 'request_homework_statuses', request_statuses
+        )
+        started = time.monotonic()
+        homework.main(stop)
+        return requested, bot.sent, time.monotonic() - started
+
+    def test_catch_up_poll_from_checkpoint(self, monkeypatch, tmp_path,
+                                           restore_signals):
+        for name, value in {
+            'PRACTICUM_TOKEN': 'token', 'TELEGRAM_TOKEN': '1:token',
+            'TELEGRAM_CHAT_ID': 1, 'SUBSCRIPTIONS_FILE': None,
+            'CHECKPOINT_FILE': str(tmp_path / 'state.json'),
+        }.items():
+            monkeypatch.setattr(homework, name, value)
+        _, sent, _ = self.run_main(monkeypatch, 1000)
+        assert len(sent) == 1, 'Сообщение должно дослаться до остановки'
+        requested, sent, elapsed = self.run_main(monkeypatch, 2000)
+        assert requested == [1000], (
+            'После перезапуска опрос должен начаться с даты из чекпоинта'
+        )
+        assert sent == [], 'Статус из чекпоинта не должен отправляться снова'
+        assert elapsed < homework.RETRY_TIME / 100, (
+            'Первый опрос после запуска должен выполняться сразу'
+        )
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import homework
+import metrics
+import singleflight
+import thread_poller
+from alerts import ErrorAggregator
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+from subscriptions import Subscription
+from utils import StubSender
+
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def run(index):
+        results[index] = target()
+
+    threads = [
+        threading.Thread(target=run, args=(index,)) for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Заглушка API, которая считает запросы и отвечает с задержкой."""
+    calls = []
+
+    def request_statuses(headers, current_timestamp, cache=None,
+                         stream=None):
+        calls.append((headers['Authorization'], current_timestamp))
+        time.sleep(0.2)
+        if cache is not None:
+            cache.etag = f'"{len(calls)}"'
+        return {
+            'homeworks': [{
+                'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+                'date_updated': '2022-01-10T12:00:00Z',
+            }],
+            'current_date': 1000,
+        }
+
+    monkeypatch.setattr(
+        homework, 'request_homework_statuses', request_statuses
+    )
+    return calls
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_collapsed(self):
+        flights = singleflight.SingleFlight('test')
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        shared_before = metrics.SINGLEFLIGHT_SHARED.value(service='test')
+        results = run_threads(5, lambda: flights.do('key', slow))
+        assert len(calls) == 1
+        assert len({id(result) for result, _ in results}) == 1
+        assert sorted(shared for _, shared in results) == [
+            False, True, True, True, True
+        ]
+        assert metrics.SINGLEFLIGHT_SHARED.value(service='test') == (
+            shared_before + 4
+        )
+        assert flights.do('key', lambda: 'новый вызов') == (
+            'новый вызов', False
+        ), 'После завершения вызова ключ освобождается'
+
+    def test_error_delivered_to_all_waiters(self):
+        flights = singleflight.SingleFlight('test')
+
+        def failing():
+            time.sleep(0.2)
+            raise ValueError('сбой')
+
+        def call():
+            try:
+                flights.do('key', failing)
+            except ValueError as error:
+                return error
+
+        errors = run_threads(3, call)
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert flights._calls == {}
+
+    def test_async_calls_collapsed(self):
+        flights = singleflight.AsyncSingleFlight('test')
+        calls = []
+
+        async def slow(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        async def run():
+            return await asyncio.gather(*(
+                flights.do('key', slow, number) for number in range(3)
+            ))
+
+        assert asyncio.run(run()) == [(0, False), (0, True), (0, True)]
+        assert calls == [0]
+        assert flights._calls == {}
+
+    def test_bucket(self):
+        assert singleflight.bucket(125, 60) == 120
+        assert singleflight.bucket(125, 0) == 125
+
+
+class TestSharedRequests:
+
+    def test_same_token_polled_once(self, upstream):
+        subscriptions = [Subscription('token', chat) for chat in (1, 2, 3)]
+        caches = {item.key: ResponseCache() for item in subscriptions}
+        poller = thread_poller.ThreadPoller(StubSender(), workers=3)
+        outgoing = poller.poll_due(
+            subscriptions, caches, AdaptiveScheduler(), ErrorAggregator()
+        )
+        poller.close(1)
+        assert len(upstream) == 1, (
+            'Одинаковые запросы подписок одного токена объединяются'
+        )
+        assert sorted(outgoing) == [1, 2, 3], (
+            'Ответ должен достаться каждому чату'
+        )
+        assert {cache.etag for cache in caches.values()} == {'"1"'}
+        assert all(item.current_date == 1000 for item in subscriptions)
+
+    def test_from_date_rounded_to_bucket(self, upstream):
+        now = int(time.time())
+        subscriptions = [
+            Subscription('token', 1, current_date=now),
+            Subscription('token', 2, current_date=now - now % 60),
+        ]
+        caches = {item.key: ResponseCache() for item in subscriptions}
+        threads = [
+            threading.Thread(
+                target=homework.request_shared, args=(item, caches[item.key])
+            )
+            for item in subscriptions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert upstream == [('OAuth token', now - now % 60)]
+
+    def test_history_requests_not_shared(self, upstream):
+        subscriptions = [
+            Subscription('token', chat, current_date=1) for chat in (1, 2)
+        ]
+        caches = {item.key: ResponseCache() for item in subscriptions}
+        poller = thread_poller.ThreadPoller(StubSender(), workers=2)
+        poller.poll_due(
+            subscriptions, caches, AdaptiveScheduler(), ErrorAggregator()
+        )
+        poller.close(1)
+        assert len(upstream) == 2, (
+            'Потоковый ответ с историей нельзя отдать двум подпискам'
+        )
@@ -0,0 +1,130 @@
+import dataclasses
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+import telegram
+
+import homework
+from config import Config
+from subscriptions import Subscription
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ('telegram', 'requests', 'urllib3', 'simplejson', 'asyncio',
+                'http.server', 'logging.handlers', 'sqlite3')
+
+
+def import_profile(*modules):
+    """Модули, загруженные при импорте modules, и время их импорта.
+
+    Импорт идёт в отдельном процессе с -X importtime, чтобы на результат
+    не влияли модули, уже загруженные тестами. Время — накопленное,
+    в микросекундах, для модулей, импортированных на верхнем уровне.
+    """
+    code = (
+        f'import sys, {", ".join(modules)}\n'
+        'print("\\n".join(sorted(sys.modules)))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            times[name.strip()] = int(cumulative)
+    return set(result.stdout.split()), times
+
+
+class TestColdStart:
+
+    def test_heavy_dependencies_not_imported(self):
+        modules, _ = import_profile('homework')
+        loaded = [name for name in LAZY_MODULES if name in modules]
+        assert loaded == [], (
+            f'Импорт homework не должен загружать {", ".join(loaded)}: '
+            'эти модули нужны только при работе бота'
+        )
+
+    def test_lazy_import_cheaper_than_deferred(self):
+        _, times = import_profile('homework', *LAZY_MODULES)
+        deferred = {
+            name: times[name] for name in LAZY_MODULES if name in times
+        }
+        assert deferred, 'Тяжёлые модули должны загружаться после homework'
+        assert times['homework'] < sum(deferred.values()), (
+            f'Импорт homework ({times["homework"]} мкс) должен быть '
+            f'дешевле отложенных модулей ({sum(deferred.values())} мкс)'
+        )
+
+
+class TestConfig:
+
+    def test_from_env(self):
+        config = Config.from_env({
+            'PRACTICUM_TOKEN': 'p', 'POLL_MODE': 'once',
+            'SHUTDOWN_TIMEOUT': '5', 'STREAM_AFTER': '60',
+        })
+        assert config.practicum_token == 'p'
+        assert config.poll_mode == 'once'
+        assert config.shutdown_timeout == 5.0
+        assert config.stream_after == 60
+        assert config.default_locale == 'ru'
+        assert config.telegram_token is None
+
+    def test_module_settings_from_env(self):
+        config = Config.from_env({
+            'PRACTICUM_RATE': '2.5', 'RETRY_ATTEMPTS': '7', 'HTTP2': '1',
+            'LOG_QUEUE': '0', 'PORT': '9000', 'SHARD': '',
+            'SHARD_NODES': '0,2', 'HISTORY_FILE': 'history.db',
+        })
+        assert config.practicum_rate == 2.5
+        assert config.retry_attempts == 7
+        assert config.http2 is True
+        assert config.log_queue is False
+        assert config.webhook_port == 9000, 'PORT — запасной порт webhook'
+        assert config.shard is None
+        assert config.shard_nodes == (0, 2)
+        assert config.history_file == 'history.db'
+        assert config.telegram_commands is False
+
+    def test_modules_read_settings_from_config(self):
+        modules, _ = import_profile('history')
+        assert 'config' in modules, (
+            'Настройки модулей читаются из config.CONFIG после загрузки .env'
+        )
+
+    def test_immutable(self):
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            Config().poll_mode = 'async'
+
+
+class TestOnce:
+
+    def test_single_cycle(self, monkeypatch):
+        calls = []
+
+        class StubBot:
+            def __init__(self, **kwargs):
+                pass
+
+        monkeypatch.setattr(telegram, 'Bot', StubBot)
+        monkeypatch.setattr(
+            homework, 'install_signal_handlers', lambda stop: None
+        )
+        monkeypatch.setattr(homework, 'check_tokens', lambda: True)
+        monkeypatch.setattr(
+            homework, 'get_subscriptions', lambda: [Subscription('token', 1)]
+        )
+        monkeypatch.setattr(
+            homework, 'run_cycle', lambda *args: calls.append(args)
+        )
+        stop = threading.Event()
+        homework.main(stop, once=True)
+        assert len(calls) == 1, 'В режиме once бот делает один цикл'
+        assert not stop.is_set()
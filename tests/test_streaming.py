@@ -0,0 +1,174 @@
+import json
+import time
+import tracemalloc
+from http import HTTPStatus
+
+import pytest
+
+import homework
+from response_cache import ResponseCache
+from streaming import HomeworkStream
+from subscriptions import Subscription
+
+STATUSES = homework.HOMEWORK_STATUSES
+
+
+def split(body, size):
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class MockStreamResponse:
+
+    def __init__(self, chunks, status_code=HTTPStatus.OK, headers=None):
+        self.chunks = chunks
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class TestHomeworkStream:
+
+    def test_same_items_as_json(self):
+        payload = {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw', 'status': 'approved',
+                 'reviewer_comment': 'Отлично 👍'},
+                {'id': 2, 'homework_name': 'hw2', 'status': 'rejected'},
+            ],
+            'current_date': 1641816000,
+        }
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        for size in (1, 3, 7, len(body)):
+            stream = HomeworkStream(split(body, size))
+            assert list(stream) == payload['homeworks'], (
+                f'Проверьте разбор тела кусками по {size} байт'
+            )
+            assert stream['current_date'] == payload['current_date']
+
+    def test_current_date_before_homeworks(self):
+        stream = HomeworkStream(
+            split(b'{"current_date": 12345, "homeworks": []}', 2)
+        )
+        assert list(stream) == []
+        assert stream['current_date'] == 12345
+
+    def test_multi_megabyte_history_in_constant_memory(self, large_history):
+        count = 20000
+        stream = HomeworkStream(large_history(count, current_date=7))
+        tracemalloc.start()
+        try:
+            records = 0
+            for record in stream.records(STATUSES):
+                records += 1
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        body_size = sum(len(chunk) for chunk in large_history(count))
+        assert records == count
+        assert stream['current_date'] == 7
+        assert body_size > 5 * 1024 * 1024
+        assert peak < body_size / 10, (
+            'Потоковый разбор не должен держать тело ответа в памяти'
+        )
+
+    @pytest.mark.parametrize('body, error', [
+        (b'{"current_date": 1}', KeyError),
+        (b'{"homeworks": {"a": 1}}', TypeError),
+        (b'{"homeworks": [{"id": 1}', ValueError),
+        (b'[]', ValueError),
+    ])
+    def test_invalid_body(self, body, error):
+        with pytest.raises(error):
+            list(HomeworkStream(split(body, 4)))
+
+    def test_stream_closed_after_iteration(self):
+        closed = []
+        stream = HomeworkStream(
+            [b'{"homeworks": []}'], close=lambda: closed.append(True)
+        )
+        list(stream)
+        assert closed == [True]
+
+
+class TestStreamingRequest:
+
+    def test_old_history_streamed_into_pipeline(self, monkeypatch,
+                                                large_history):
+        response = MockStreamResponse(
+            large_history(300, chunk_size=1024, current_date=42),
+            headers={'ETag': '"v2"'}
+        )
+        requested = []
+
+        def mock_stream(url, headers=None, params=None, **kwargs):
+            requested.append(params)
+            return response
+
+        monkeypatch.setattr(homework.http_session, 'stream', mock_stream)
+        cache = ResponseCache()
+        subscription = Subscription('token', 1, current_date=1)
+        result = homework.request_homework_statuses(
+            subscription.headers, subscription.current_date, cache
+        )
+        assert isinstance(result, HomeworkStream), (
+            'Ответ с давней историей должен разбираться потоково'
+        )
+        messages = homework.handle_response(subscription, result, cache)
+        assert len(messages) == homework.NOTIFICATION_LIMIT + 1, (
+            'Сверх лимита новые статусы сводятся в одно сообщение'
+        )
+        assert messages[-1] == (
+            f'Ещё изменений статусов: {300 - homework.NOTIFICATION_LIMIT}'
+        )
+        assert len(cache.seen) == 300
+        assert subscription.current_date == 42
+        assert cache.last_status == 'approved'
+        assert cache.etag == '"v2"'
+        assert response.closed
+        assert requested == [{'from_date': 1}]
+
+    def test_server_error_closes_stream(self, monkeypatch):
+        response = MockStreamResponse(
+            [b'{}'], status_code=HTTPStatus.BAD_GATEWAY
+        )
+        monkeypatch.setattr(
+            homework.http_session, 'stream', lambda *args, **kwargs: response
+        )
+        with pytest.raises(homework.CustomStatusesError):
+            homework.send_api_request({}, {'from_date': 1}, stream=True)
+        assert response.closed, (
+            'Соединение ответа с ошибкой должно вернуться в пул'
+        )
+
+    def test_recent_history_not_streamed(self):
+        assert not homework.is_history_request(int(time.time()))
+        assert homework.is_history_request(1)
+
+    def test_broken_stream_does_not_mark_seen(self):
+        subscription = Subscription('token', 1, current_date=1)
+        cache = ResponseCache()
+        good = {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+        body = json.dumps({
+            'homeworks': [good, {'id': 2, 'homework_name': 'hw2',
+                                 'status': 'unknown'}],
+            'current_date': 42,
+        }).encode()
+        with pytest.raises(Exception):
+            homework.handle_response(
+                subscription, HomeworkStream(split(body, 8)), cache
+            )
+        retry_body = json.dumps(
+            {'homeworks': [good], 'current_date': 42}
+        ).encode()
+        messages = homework.handle_response(
+            subscription, HomeworkStream(split(retry_body, 8)), cache
+        )
+        assert len(messages) == 1, (
+            'Статус из оборвавшегося ответа должен прийти при повторе'
+        )
@@ -0,0 +1,68 @@
+import json
+import sqlite3
+
+import pytest
+
+import subscriptions
+
+
+class TestSubscriptions:
+
+    def test_load_json(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps([
+            {'token': 'token1', 'chat_id': 1},
+            {'token': 'token2', 'chat_id': 2, 'current_date': 100,
+             'locale': 'en'},
+        ]))
+        result = subscriptions.load_subscriptions(str(path))
+        assert [s.chat_id for s in result] == [1, 2], (
+            'Проверьте, что подписки загружаются из JSON-файла'
+        )
+        assert result[1].current_date == 100
+        assert [s.locale for s in result] == [None, 'en']
+        assert result[0].headers == {'Authorization': 'OAuth token1'}
+
+    def test_load_sqlite(self, tmp_path):
+        path = tmp_path / 'subscriptions.db'
+        connection = sqlite3.connect(str(path))
+        connection.execute(
+            'CREATE TABLE subscriptions (token, chat_id, "current_date")'
+        )
+        connection.execute(
+            'INSERT INTO subscriptions VALUES (?, ?, ?)', ('token', 7, None)
+        )
+        connection.commit()
+        connection.close()
+        result = subscriptions.load_subscriptions(str(path))
+        assert len(result) == 1
+        assert result[0].chat_id == 7
+        assert result[0].current_date == 0
+        assert result[0].locale is None
+
+    def test_load_sqlite_locale(self, tmp_path):
+        path = tmp_path / 'subscriptions.db'
+        connection = sqlite3.connect(str(path))
+        connection.execute(
+            'CREATE TABLE subscriptions (token, chat_id, "current_date", '
+            'locale)'
+        )
+        connection.execute(
+            'INSERT INTO subscriptions VALUES (?, ?, ?, ?)',
+            ('token', 7, 5, 'en')
+        )
+        connection.commit()
+        connection.close()
+        result = subscriptions.load_subscriptions(str(path))
+        assert result[0].locale == 'en'
+
+    def test_record_without_token(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps([{'chat_id': 1}]))
+        with pytest.raises(KeyError):
+            subscriptions.load_subscriptions(str(path))
+
+    def test_key_hides_token(self):
+        subscription = subscriptions.Subscription('secret', 42)
+        assert 'secret' not in subscription.key
+        assert subscription.key.startswith('42:')
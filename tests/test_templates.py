@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import homework
+import templates
+from response_cache import ResponseCache
+from schema import Homework
+from subscriptions import Subscription
+
+STATUSES = homework.HOMEWORK_STATUSES
+
+
+def make_registry(source=None):
+    return templates.TemplateRegistry(
+        source or templates.TEMPLATES, STATUSES, 'ru'
+    )
+
+
+class TestTemplates:
+
+    def test_lesson_and_comment_rendered(self):
+        record = Homework(
+            1, 'hw', 'rejected', None, 'Поправьте {тесты}', 'Спринт 7'
+        )
+        message = make_registry().render(record)
+        assert message.startswith(
+            'Изменился статус проверки работы "hw" (Спринт 7)'
+        )
+        assert 'Поправьте {тесты}' in message
+        assert message.endswith(STATUSES['rejected'])
+
+    def test_optional_parts_skipped(self):
+        record = Homework(1, 'hw', 'approved', None, '', None)
+        assert make_registry().render(record) == (
+            'Изменился статус проверки работы "hw".\n'
+            f'{STATUSES["approved"]}'
+        )
+
+    def test_locale_and_fallback(self):
+        registry = make_registry()
+        record = Homework(1, 'hw', 'approved', None, None, None)
+        assert registry.render(record, 'en').startswith(
+            'Review status of "hw"'
+        )
+        assert registry.render(record, 'xx') == registry.render(record), (
+            'Неизвестный язык должен отрисовываться языком по умолчанию'
+        )
+
+    def test_unknown_field_rejected_at_startup(self):
+        source = templates.load_templates()
+        source['en']['lesson'] = ' ({lesson})'
+        with pytest.raises(ValueError):
+            make_registry(source)
+
+    def test_templates_file(self, tmp_path):
+        path = tmp_path / 'templates.json'
+        path.write_text(json.dumps({
+            'uk': {
+                'message': 'Статус роботи "{homework_name}"{lesson}: '
+                           '{comment}{verdict}',
+                'statuses': {'approved': 'Прийнято'},
+            },
+        }, ensure_ascii=False), encoding='utf-8')
+        registry = make_registry(templates.load_templates(str(path)))
+        assert registry.locales == {'ru', 'en', 'uk'}
+        assert registry.render(
+            Homework(1, 'hw', 'approved', None, None, None), 'uk'
+        ) == 'Статус роботи "hw": Прийнято'
+        assert registry.render(
+            Homework(1, 'hw', 'rejected', None, None, None), 'uk'
+        ).endswith(STATUSES['rejected'])
+
+    def test_pipeline_uses_subscription_locale(self):
+        response = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 1,
+        }
+        messages = homework.handle_response(
+            Subscription('token', 1, locale='en'), response, ResponseCache()
+        )
+        assert messages[0].startswith('Review status of "hw"')
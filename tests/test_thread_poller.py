@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+import checkpoint
+import homework
+import thread_poller
+from alerts import ErrorAggregator
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+from subscriptions import Subscription
+from utils import StubSender, wait_for
+
+
+@pytest.fixture
+def accounts(monkeypatch):
+    """Подписки и заглушка API с задержкой ответа по токену."""
+    delays = {}
+    release = threading.Event()
+
+    def request_statuses(headers, current_timestamp, cache=None,
+                         stream=None):
+        token = headers['Authorization'][len('OAuth '):]
+        delay = delays.get(token, 0)
+        if delay is None:
+            release.wait(5)
+        else:
+            time.sleep(delay)
+        return {
+            'homeworks': [{
+                'id': token, 'homework_name': f'{token}.zip',
+                'status': 'approved', 'date_updated': '2022-01-10T12:00:00Z',
+            }],
+            'current_date': 1000,
+        }
+
+    monkeypatch.setattr(
+        homework, 'request_homework_statuses', request_statuses
+    )
+
+    def make(*tokens):
+        subscriptions = [
+            Subscription(token, number)
+            for number, token in enumerate(tokens, 1)
+        ]
+        caches = {item.key: ResponseCache() for item in subscriptions}
+        return subscriptions, caches
+
+    make.delays = delays
+    make.release = release
+    yield make
+    release.set()
+
+
+class TestThreadPoller:
+
+    def test_accounts_polled_in_parallel(self, accounts):
+        subscriptions, caches = accounts('a', 'b', 'c', 'd')
+        accounts.delays.update(dict.fromkeys('abcd', 0.2))
+        poller = thread_poller.ThreadPoller(StubSender(), workers=4)
+        started = time.monotonic()
+        outgoing = poller.poll_due(
+            subscriptions, caches, AdaptiveScheduler(), ErrorAggregator()
+        )
+        elapsed = time.monotonic() - started
+        poller.close(1)
+        assert sorted(outgoing) == [1, 2, 3, 4]
+        assert elapsed < 0.6, 'Подписки должны опрашиваться параллельно'
+        assert len(poller.last_report.latencies) == 4
+        assert min(poller.last_report.latencies.values()) >= 0.2
+
+    def test_straggler_does_not_delay_others(self, accounts):
+        subscriptions, caches = accounts('fast', 'slow')
+        accounts.delays['slow'] = None
+        sender = StubSender()
+        scheduler = AdaptiveScheduler()
+        poller = thread_poller.ThreadPoller(sender, workers=2, deadline=0.2)
+        outgoing = poller.poll_due(
+            subscriptions, caches, scheduler, ErrorAggregator()
+        )
+        slow = subscriptions[1]
+        assert list(outgoing) == [1], (
+            'Сообщения быстрых подписок не должны ждать медленную'
+        )
+        assert poller.last_report.stragglers == [slow.key]
+        assert slow.key not in scheduler.due([slow.key]), (
+            'Подписку с незавершённым опросом нельзя опрашивать повторно'
+        )
+        accounts.release.set()
+        assert poller.close(2) == 0
+        assert wait_for(lambda: sender.queued)
+        assert sender.queued[0][0] == 2, (
+            'Сообщение отстающей подписки должно уйти по готовности'
+        )
+        assert slow.current_date == 1000
+
+    def test_unstarted_accounts_deferred(self, accounts):
+        subscriptions, caches = accounts('first', 'second')
+        accounts.delays.update({'first': 0.3, 'second': 0.3})
+        scheduler = AdaptiveScheduler()
+        poller = thread_poller.ThreadPoller(
+            StubSender(), workers=1, deadline=0.1
+        )
+        poller.poll_due(subscriptions, caches, scheduler, ErrorAggregator())
+        report = poller.last_report
+        assert report.stragglers == [subscriptions[0].key]
+        assert report.deferred == [subscriptions[1].key]
+        assert scheduler.due([subscriptions[1].key]), (
+            'Неначатый опрос переносится на следующий цикл'
+        )
+        poller.close(1)
+
+    def test_stop_interrupts_wait(self, accounts):
+        subscriptions, caches = accounts('slow')
+        accounts.delays['slow'] = None
+        stop = threading.Event()
+        threading.Timer(0.1, stop.set).start()
+        poller = thread_poller.ThreadPoller(StubSender(), deadline=5)
+        started = time.monotonic()
+        poller.poll_due(
+            subscriptions, caches, AdaptiveScheduler(), ErrorAggregator(),
+            stop
+        )
+        assert time.monotonic() - started < 1
+        assert poller.last_report.stragglers == [subscriptions[0].key]
+        assert poller.poll_due(
+            subscriptions, caches, AdaptiveScheduler(), ErrorAggregator(),
+            stop
+        ) == {}, 'После остановки новые опросы не начинаются'
+        accounts.release.set()
+        assert poller.close(2) == 0
+
+    def test_checkpoint_skips_busy_subscriptions(self, accounts, tmp_path):
+        subscriptions, caches = accounts('fast', 'slow')
+        accounts.delays['slow'] = None
+        scheduler = AdaptiveScheduler()
+        store = checkpoint.open_checkpoint_store(str(tmp_path / 'state.json'))
+        poller = thread_poller.ThreadPoller(
+            StubSender(), workers=2, deadline=0.2
+        )
+        homework.run_cycle(
+            subscriptions, caches, scheduler, ErrorAggregator(),
+            StubSender(), store, poller=poller
+        )
+        fast, slow = subscriptions
+        assert poller.busy() == {slow.key}
+        assert store.get(fast.key) is not None
+        assert store.get(slow.key) is None, (
+            'Кеш отстающей подписки меняется в потоке, его не сохраняют'
+        )
+        accounts.release.set()
+        assert poller.close(2) == 0
+        assert poller.busy() == set()
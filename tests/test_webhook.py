@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+import webhook
+from subscriptions import Subscription
+from utils import StubSender
+
+
+EVENT = {
+    'homeworks': [{'id': 1, 'homework_name': 'hw', 'status': 'approved'}],
+    'current_date': 100,
+}
+
+
+def make_receiver(secret=None):
+    subscription = Subscription('token', 42)
+    sender = StubSender()
+    receiver = webhook.WebhookReceiver([subscription], sender, secret=secret)
+    return receiver, subscription, sender
+
+
+class TestWebhookReceiver:
+
+    def test_event_goes_through_pipeline(self):
+        receiver, subscription, sender = make_receiver()
+        status, answer = receiver.handle(
+            'POST', f'/events/{subscription.key}', {},
+            json.dumps(EVENT).encode()
+        )
+        assert status == 202 and answer == {'messages': 1}
+        assert sender.queued[0][0] == 42
+        assert sender.queued[0][1].endswith('Ура!'), (
+            'Событие должно проходить через parse_status'
+        )
+        assert subscription.current_date == 100
+
+    def test_paused_subscription_not_notified(self):
+        receiver, subscription, sender = make_receiver()
+        subscription.paused = True
+        path = f'/events/{subscription.key}'
+        status, answer = receiver.handle(
+            'POST', path, {}, json.dumps(EVENT).encode()
+        )
+        assert status == 202 and answer['messages'] == 0
+        assert sender.queued == [], 'На паузе уведомления не отправляются'
+        assert subscription.current_date == 0, (
+            'После /resume статусы должны догоняться с сохранённой даты'
+        )
+        subscription.paused = False
+        receiver.handle('POST', path, {}, json.dumps(EVENT).encode())
+        assert len(sender.queued) == 1
+
+    def test_invalid_events_rejected(self):
+        receiver, subscription, sender = make_receiver(secret='s')
+        path = f'/events/{subscription.key}'
+        body = json.dumps(EVENT).encode()
+        assert receiver.handle('POST', path, {}, body)[0] == 401
+        headers = {webhook.SECRET_HEADER: 's'}
+        assert receiver.handle('GET', path, headers, body)[0] == 405
+        assert receiver.handle(
+            'POST', '/events/unknown', headers, body
+        )[0] == 404
+        assert receiver.handle(
+            'POST', path, headers, b'{"current_date": 1}'
+        )[0] == 400
+        assert receiver.handle('POST', path, headers, b'not json')[0] == 400
+        assert sender.queued == []
+
+    def test_http_round_trip(self):
+        receiver, subscription, sender = make_receiver(secret='s')
+
+        async def run():
+            port = await receiver.start('127.0.0.1', 0)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    None, webhook.post_event,
+                    f'http://127.0.0.1:{port}/events/{subscription.key}',
+                    EVENT, 's'
+                )
+            finally:
+                await receiver.close()
+
+        status, answer = asyncio.run(run())
+        assert status == 202 and answer == {'messages': 1}
+        assert len(sender.queued) == 1
+
+    def test_event_without_current_date_not_marked_seen(self):
+        receiver, subscription, sender = make_receiver()
+        path = f'/events/{subscription.key}'
+        broken = {'homeworks': EVENT['homeworks']}
+        assert receiver.handle(
+            'POST', path, {}, json.dumps(broken).encode()
+        )[0] == 400
+        assert receiver.handle(
+            'POST', path, {}, json.dumps(EVENT).encode()
+        ) == (202, {'messages': 1}), (
+            'Исправленное событие должно дойти до чата'
+        )
+
+    def test_secret_compared_safely(self):
+        receiver, subscription, _ = make_receiver(secret='s')
+        path = f'/events/{subscription.key}'
+        body = json.dumps(EVENT).encode()
+        for secret in ('', 'ss', 'сс'):
+            assert receiver.handle(
+                'POST', path, {webhook.SECRET_HEADER: secret}, body
+            )[0] == 401
+
+    def test_public_receiver_requires_secret(self, monkeypatch):
+        assert webhook.is_local('127.0.0.1')
+        assert webhook.is_local('::1')
+        assert not webhook.is_local('0.0.0.0')
+        monkeypatch.setattr(webhook.homework, 'check_tokens', lambda: True)
+        monkeypatch.setattr(webhook, 'WEBHOOK_HOST', '0.0.0.0')
+        monkeypatch.setattr(webhook, 'WEBHOOK_SECRET', None)
+        monkeypatch.setattr(
+            webhook, 'serve', lambda: pytest.fail('Приём запущен без секрета')
+        )
+        webhook.main()
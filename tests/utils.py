@@ -1,3 +1,4 @@
+import time
 from inspect import signature
 from types import ModuleType
 
@@ -30,10 +31,46 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
     :return: None. It's an assert
     """
     assert hasattr(scope, var_name), (
-        f'Не найдена переменная `{var_name}`. Не удаляйте и не переименовывайте ее.'
+        f'Не найдена переменная `{var_name}`. '
+        'Не удаляйте и не переименовывайте ее.'
     )
     var = getattr(scope, var_name)
     assert not callable(var), (
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+def wait_for(condition, timeout=5):
+    """Ждёт, пока condition() станет истинным, не дольше timeout секунд."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeClock:
+    """Управляемые часы: now меняет тест, sleep() сдвигает время."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class StubSender:
+    """Очередь сообщений вместо Outbox: запоминает поставленные тексты."""
+
+    def __init__(self):
+        self.queued = []
+
+    def put(self, chat_id, text):
+        self.queued.append((chat_id, text))
+
+    def depth(self):
+        return 0
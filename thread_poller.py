@@ -0,0 +1,194 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+
+import homework
+import logs
+import metrics
+from config import CONFIG
+
+POLL_THREADS = CONFIG.poll_threads
+CYCLE_DEADLINE = CONFIG.cycle_deadline
+STOP_CHECK_INTERVAL = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CycleReport:
+    """Итог одного цикла опроса в пуле потоков."""
+
+    latencies: dict = field(default_factory=dict)
+    stragglers: list = field(default_factory=list)
+    deferred: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def slowest(self):
+        """Ключ самой медленной из завершившихся подписок или None."""
+        if not self.latencies:
+            return None
+        return max(self.latencies, key=self.latencies.get)
+
+    def median(self):
+        """Медианное время опроса подписки за цикл."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies.values())
+        return ordered[len(ordered) // 2]
+
+
+class ThreadPoller:
+    """Опрашивает подписки параллельно в ограниченном пуле потоков.
+
+    Цикл ждёт ответы не дольше deadline секунд. Подписки, которые ещё
+    не начали опрашиваться, переносятся на следующий цикл, а начатые
+    досчитываются в фоне: их сообщения уходят в очередь отправки сразу
+    по готовности, не задерживая остальных.
+    """
+
+    def __init__(self, sender, workers=POLL_THREADS,
+                 deadline=CYCLE_DEADLINE):
+        """Создаёт пул из workers потоков со сроком цикла deadline."""
+        self.sender = sender
+        self.workers = workers
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='poll'
+        )
+        self.pending = {}
+        self.last_report = CycleReport()
+
+    def poll_account(self, subscription, cache, alerts):
+        """Опрос одной подписки в потоке пула. Возвращает сообщения и время."""
+        started = time.perf_counter()
+        with logs.log_context(account=subscription.key):
+            messages = homework.poll_subscription(subscription, cache, alerts)
+        elapsed = time.perf_counter() - started
+        metrics.ACCOUNT_POLL.observe(elapsed)
+        return messages, elapsed
+
+    def submit(self, subscription, cache, alerts):
+        """Ставит опрос подписки в пул с контекстом логов текущего цикла."""
+        return self.executor.submit(
+            contextvars.copy_context().run,
+            self.poll_account, subscription, cache, alerts
+        )
+
+    def poll_due(self, subscriptions, caches, scheduler, alerts, stop=None):
+        """Опрашивает подписки, которым пора, и собирает сообщения по чатам.
+        Подписки, опрос которых ещё идёт с прошлых циклов, пропускаются.
+        После остановки новые опросы не начинаются.
+        """
+        started = time.monotonic()
+        self.collect_late(scheduler, caches)
+        if stop is not None and stop.is_set():
+            return {}
+        by_key = {item.key: item for item in subscriptions}
+        futures = {
+            self.submit(by_key[key], caches[key], alerts): key
+            for key in scheduler.due(by_key) if key not in self.pending
+        }
+        self.wait_results(futures, started + self.deadline, stop)
+        report = CycleReport()
+        outgoing = {}
+        for future, key in futures.items():
+            subscription = by_key[key]
+            if future.done():
+                messages, report.latencies[key] = future.result()
+                scheduler.observe(key, caches[key])
+                if messages:
+                    outgoing.setdefault(subscription.chat_id, []).extend(
+                        messages
+                    )
+            elif future.cancel():
+                report.deferred.append(key)
+            else:
+                report.stragglers.append(key)
+                self.pending[key] = future
+                scheduler.postpone(key, self.deadline)
+                future.add_done_callback(
+                    partial(self.deliver_late, subscription)
+                )
+        report.elapsed = time.monotonic() - started
+        self.report(report)
+        return outgoing
+
+    def wait_results(self, futures, deadline, stop=None):
+        """Ждёт завершения опросов до срока цикла или до остановки."""
+        waiting = set(futures)
+        while waiting:
+            left = deadline - time.monotonic()
+            if left <= 0 or (stop is not None and stop.is_set()):
+                return
+            if stop is not None:
+                left = min(left, STOP_CHECK_INTERVAL)
+            _, waiting = wait(waiting, left, FIRST_COMPLETED)
+
+    def deliver_late(self, subscription, future):
+        """Ставит в очередь сообщения подписки, ответившей после срока."""
+        if future.cancelled():
+            return
+        messages, elapsed = future.result()
+        logger.info(
+            f'Подписка {subscription.key} опрошена после срока цикла '
+            f'за {elapsed:.2f} с'
+        )
+        for message in messages:
+            self.sender.put(subscription.chat_id, message)
+
+    def collect_late(self, scheduler, caches):
+        """Планирует следующий опрос подписок, досчитанных в фоне."""
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                scheduler.observe(key, caches[key])
+
+    def busy(self):
+        """Ключи подписок, опрос которых ещё идёт в потоке пула.
+        Их кеш меняется из потока, поэтому чекпоинт их пропускает.
+        """
+        return {
+            key for key, future in list(self.pending.items())
+            if not future.done()
+        }
+
+    def report(self, report):
+        """Пишет в лог время опроса подписок и отстающие подписки."""
+        self.last_report = report
+        if report.latencies:
+            slowest = report.slowest()
+            logger.info(
+                f'Опрошено подписок: {len(report.latencies)} за '
+                f'{report.elapsed:.2f} с, медиана '
+                f'{report.median():.2f} с, максимум '
+                f'{report.latencies[slowest]:.2f} с ({slowest})'
+            )
+        if report.stragglers:
+            metrics.POLL_STRAGGLERS.inc(len(report.stragglers))
+            logger.warning(
+                f'Не уложились в {self.deadline:g} с: '
+                f'{", ".join(map(str, report.stragglers))}'
+            )
+        if report.deferred:
+            logger.warning(
+                f'Не начат опрос подписок: {len(report.deferred)}, '
+                'перенесены на следующий цикл'
+            )
+
+    def close(self, timeout=homework.SHUTDOWN_TIMEOUT):
+        """Отменяет ожидающие опросы и ждёт начатые не дольше timeout.
+        Возвращает число опросов, не завершившихся за это время.
+        """
+        for future in self.pending.values():
+            future.cancel()
+        self.executor.shutdown(wait=False)
+        _, unfinished = wait(list(self.pending.values()), timeout)
+        if unfinished:
+            logger.warning(
+                f'Опрос {len(unfinished)} подписок не завершился '
+                f'за {timeout:g} с'
+            )
+        return len(unfinished)
@@ -0,0 +1,217 @@
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import signal
+import urllib.request
+from http import HTTPStatus
+
+import checkpoint
+import history
+import homework
+import metrics
+import outbox
+from config import CONFIG
+from exceptions import ResponseIsNone
+from response_cache import ResponseCache
+from scheduler import AdaptiveScheduler
+
+WEBHOOK_HOST = CONFIG.webhook_host
+WEBHOOK_PORT = CONFIG.webhook_port
+WEBHOOK_SECRET = CONFIG.webhook_secret
+EVENTS_PATH = '/events/'
+MAX_BODY_SIZE = 1024 * 1024
+SECRET_HEADER = 'x-webhook-secret'
+REQUEST_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookReceiver:
+    """HTTP приёмник событий об изменении статусов работ.
+
+    Принимает POST /events/<ключ подписки> с телом в том же формате,
+    что и ответ API Практикума, и передаёт его в общий конвейер
+    check_response → parse_status → очередь отправки. События подписок
+    на паузе не меняют их состояние: после /resume опрос догонит статусы
+    с сохранённой даты.
+    """
+
+    def __init__(self, subscriptions, sender, caches=None, secret=None,
+                 store=None):
+        """Сохраняет подписки, очередь отправки и секрет запросов."""
+        self.subscriptions = {item.key: item for item in subscriptions}
+        self.sender = sender
+        self.caches = caches or {
+            key: ResponseCache() for key in self.subscriptions
+        }
+        self.secret = secret
+        self.store = store
+        self.server = None
+
+    def is_authorized(self, secret):
+        """Сверяет секрет запроса за постоянное время."""
+        if self.secret is None:
+            return True
+        return secret is not None and hmac.compare_digest(
+            secret.encode(), self.secret.encode()
+        )
+
+    def handle(self, method, path, headers, body):
+        """Обрабатывает событие. Возвращает HTTP статус и ответ."""
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'POST only'}
+        if not self.is_authorized(headers.get(SECRET_HEADER)):
+            return HTTPStatus.UNAUTHORIZED, {'error': 'bad secret'}
+        if not path.startswith(EVENTS_PATH):
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown path'}
+        subscription = self.subscriptions.get(path[len(EVENTS_PATH):])
+        if subscription is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown subscription'}
+        if subscription.paused:
+            logger.info(f'Подписка {subscription.key} на паузе, событие '
+                        'пропущено')
+            return HTTPStatus.ACCEPTED, {'messages': 0, 'paused': True}
+        try:
+            payload = json.loads(body)
+            messages = homework.handle_response(
+                subscription, payload, self.caches[subscription.key]
+            )
+        except (ValueError, TypeError, KeyError, ResponseIsNone) as error:
+            metrics.POLL_FAILURES.inc(exception=type(error).__name__)
+            logger.error(
+                f'Некорректное событие для {subscription.key}: {error}'
+            )
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        for message in messages:
+            self.sender.put(subscription.chat_id, message)
+        if self.store is not None:
+            checkpoint.save(self.store, [subscription], self.caches)
+        return HTTPStatus.ACCEPTED, {'messages': len(messages)}
+
+    async def handle_connection(self, reader, writer):
+        """Читает один HTTP запрос из соединения и отвечает на него."""
+        try:
+            status, answer = await asyncio.wait_for(
+                self.read_request(reader), REQUEST_TIMEOUT
+            )
+        except (
+            asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError
+        ) as error:
+            status, answer = HTTPStatus.BAD_REQUEST, {'error': repr(error)}
+        body = json.dumps(answer).encode()
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: close\r\n\r\n'.encode() + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Разбирает запрос и передаёт его в handle()."""
+        request_line = await reader.readline()
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_SIZE:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'too large'}
+        body = await reader.readexactly(length)
+        return self.handle(method, path, headers, body)
+
+    async def start(self, host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+        """Запускает HTTP сервер. Возвращает фактический порт."""
+        self.server = await asyncio.start_server(
+            self.handle_connection, host, port
+        )
+        port = self.server.sockets[0].getsockname()[1]
+        logger.info(f'Приём событий запущен на {host}:{port}')
+        return port
+
+    async def close(self):
+        """Останавливает HTTP сервер."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+def post_event(url, payload, secret=None, timeout=5):
+    """Отправляет событие в приёмник. Заглушка источника для тестов."""
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), method='POST',
+        headers={'Content-Type': 'application/json'}
+    )
+    if secret is not None:
+        request.add_header('X-Webhook-Secret', secret)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, json.loads(response.read())
+
+
+async def serve():
+    """Запускает приём событий до сигнала остановки."""
+    import telegram
+
+    bot = telegram.Bot(token=homework.TELEGRAM_TOKEN)
+    sender = outbox.Outbox(bot).start()
+    subscriptions = homework.get_subscriptions()
+    caches = {item.key: ResponseCache() for item in subscriptions}
+    store = homework.open_checkpoints(subscriptions, caches)
+    scheduler = AdaptiveScheduler()
+    homework.restore_pauses(subscriptions, scheduler)
+    listener = homework.start_commands(bot, subscriptions, caches, scheduler)
+    receiver = WebhookReceiver(
+        subscriptions, sender, caches, WEBHOOK_SECRET, store
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    history.configure()
+    await receiver.start()
+    metrics_server = metrics.start_server()
+    try:
+        await stop.wait()
+    finally:
+        metrics.stop_server(metrics_server)
+        await receiver.close()
+        if listener is not None:
+            listener.stop(homework.COMMANDS_STOP_TIMEOUT)
+        sender.stop(homework.SHUTDOWN_TIMEOUT)
+        if store is not None:
+            store.close()
+        history.close()
+
+
+def is_local(host):
+    """Проверяет, что приёмник слушает только локальный интерфейс."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    """Точка входа режима приёма событий.
+    Без WEBHOOK_SECRET приёмник запускается только на локальном адресе:
+    иначе кто угодно мог бы прислать подписчикам поддельный статус.
+    """
+    if not homework.check_tokens():
+        return
+    if WEBHOOK_SECRET is None and not is_local(WEBHOOK_HOST):
+        logger.error(
+            f'Приём событий на {WEBHOOK_HOST} требует WEBHOOK_SECRET'
+        )
+        return
+    asyncio.run(serve())